@@ -0,0 +1,83 @@
+"""Load test coalescing of concurrent web service data requests.
+
+Many clients request the same recent window at the same time,
+some asking for the whole day and some for the last hour.
+Compares backend requests to a fake wave server with and without
+the SingleFlight layer used by geomagio.api.ws.data.get_timeseries.
+
+Usage:
+    python -m benchmarks.coalescing
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
+import time
+
+from obspy import UTCDateTime
+
+from geomagio.api.ws import data
+from geomagio.api.ws.DataApiQuery import DataApiQuery
+from geomagio.api.ws.SingleFlight import SingleFlight
+
+from .waveserver import FakeWaveServer
+
+
+def create_queries(clients, now):
+    """Every third client asks for the last hour, others for the whole day."""
+    starttime = UTCDateTime(now.year, now.month, now.day)
+    endtime = starttime + 86400 - 60
+    queries = []
+    for i in range(clients):
+        queries.append(
+            DataApiQuery(
+                id="BOU",
+                starttime=endtime - 3600 if i % 3 == 0 else starttime,
+                endtime=endtime,
+                elements=["H", "E", "Z", "F"],
+                sampling_period=60,
+                data_type="variation",
+            )
+        )
+    return queries
+
+
+def run(queries, get_timeseries):
+    """Request all queries at once, return elapsed seconds."""
+    barrier = threading.Barrier(len(queries))
+
+    def request(query):
+        barrier.wait()
+        return get_timeseries(data.get_data_factory(query), query)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        results = list(executor.map(request, queries))
+    elapsed = time.perf_counter() - start
+    assert all(len(result) == 4 for result in results)
+    return elapsed
+
+
+def main(clients=30, delay=0.2):
+    queries = create_queries(clients, UTCDateTime())
+    with FakeWaveServer(delay=delay) as server:
+        os.environ["DATA_HOST"] = "127.0.0.1"
+        os.environ["DATA_EARTHWORM_PORT"] = str(server.port)
+        print(f"{clients} concurrent clients, {delay}s wave server delay")
+        print(f"{'':<16}{'edge requests':>16}{'seconds':>10}")
+        elapsed = run(queries, data.fetch_timeseries)
+        print(f"{'direct':<16}{server.requests:>16}{elapsed:>10.2f}")
+        server.requests = 0
+        single_flight = SingleFlight()
+
+        def coalesced(data_factory, query):
+            return single_flight.get_timeseries(
+                query, lambda query: data.fetch_timeseries(data_factory, query)
+            )
+
+        elapsed = run(queries, coalesced)
+        print(f"{'single flight':<16}{server.requests:>16}{elapsed:>10.2f}")
+        print(single_flight.get_metrics())
+
+
+if __name__ == "__main__":
+    main()
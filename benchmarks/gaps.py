@@ -0,0 +1,79 @@
+"""Benchmark gap detection for a day of data.
+
+Compares TimeseriesUtility.get_trace_gaps with the previous
+per sample implementation, at 1 Hz and 10 Hz day lengths.
+
+Usage:
+    python -m benchmarks.gaps
+"""
+import timeit
+
+import numpy
+from obspy.core import Stats, Trace, UTCDateTime
+
+from geomagio import TimeseriesUtility
+
+
+def get_trace_gaps_loop(trace):
+    """Previous implementation of TimeseriesUtility.get_trace_gaps."""
+    gaps = []
+    gap = None
+    data = trace.data
+    stats = trace.stats
+    starttime = stats.starttime
+    length = len(data)
+    delta = stats.delta
+    for i in range(0, length):
+        if numpy.isnan(data[i]):
+            if gap is None:
+                gap = [starttime + i * delta]
+        else:
+            if gap is not None:
+                gap.extend([starttime + (i - 1) * delta, starttime + i * delta])
+                gaps.append(gap)
+                gap = None
+    if gap is not None:
+        gap.extend([starttime + (length - 1) * delta, starttime + length * delta])
+        gaps.append(gap)
+    return gaps
+
+
+def create_trace(delta, gap_count=100, seed=0):
+    """Create one day of random data with gaps of random length."""
+    npts = int(86400 / delta)
+    random = numpy.random.default_rng(seed)
+    data = random.normal(size=npts)
+    for start in random.integers(0, npts, size=gap_count):
+        data[start : start + random.integers(1, 600)] = numpy.nan
+    stats = Stats()
+    stats.channel = "H"
+    stats.delta = delta
+    stats.starttime = UTCDateTime("2022-01-01T00:00:00Z")
+    stats.npts = npts
+    return Trace(data, stats)
+
+
+def main(repeat=3):
+    for interval, delta in (("second", 1.0), ("tenhertz", 0.1)):
+        trace = create_trace(delta)
+        assert TimeseriesUtility.get_trace_gaps(trace) == get_trace_gaps_loop(trace)
+        loop = min(
+            timeit.repeat(lambda: get_trace_gaps_loop(trace), number=1, repeat=repeat)
+        )
+        vectorized = min(
+            timeit.repeat(
+                lambda: TimeseriesUtility.get_trace_gaps(trace),
+                number=1,
+                repeat=repeat,
+            )
+        )
+        print(
+            f"{interval:>9} {trace.stats.npts:>7} samples:"
+            f" loop {loop * 1000:9.2f} ms,"
+            f" vectorized {vectorized * 1000:7.2f} ms,"
+            f" speedup {loop / vectorized:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
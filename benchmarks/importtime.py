@@ -0,0 +1,86 @@
+"""Benchmark command line startup time.
+
+Imports geomagio.Controller in a new interpreter with python -X importtime,
+and reports total import time and the slowest imported packages.
+Fails when packages that should only be imported when used are imported
+at startup, or when import time is over an optional limit.
+
+Usage:
+    python -m benchmarks.importtime [--limit MILLISECONDS]
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict
+
+# packages imported only when their factory or algorithm is selected
+LAZY_MODULES = [
+    "geomagio.adjusted",
+    "geomagio.binlog",
+    "geomagio.edge",
+    "geomagio.iaga2002",
+    "geomagio.imfjson",
+    "geomagio.imfv122",
+    "geomagio.imfv283",
+    "geomagio.pcdcp",
+    "geomagio.temperature",
+    "geomagio.vbf",
+    "scipy.optimize",
+    "scipy.signal",
+]
+
+
+def get_import_times(module: str) -> Dict[str, int]:
+    """Import module in a new interpreter.
+
+    Returns
+    -------
+    dict of imported module name to cumulative import time in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main(module="geomagio.Controller", repeat=5, limit=None, top=10):
+    runs = [get_import_times(module) for _ in range(repeat)]
+    fastest = min(runs, key=lambda times: times[module])
+    total = fastest[module] / 1000
+    print(f"import {module}: {total:.1f} ms (best of {repeat})")
+    # slowest top level packages, other than module itself
+    packages = [
+        (name, cumulative)
+        for name, cumulative in fastest.items()
+        if "." not in name and not module.startswith(name)
+    ]
+    packages.sort(key=lambda package: package[1], reverse=True)
+    for name, cumulative in packages[:top]:
+        print(f"{name:>30} {cumulative / 1000:9.1f} ms")
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in fastest]
+    if eager:
+        print(f"imported at startup: {', '.join(eager)}")
+        failed = True
+    if limit is not None and total > limit:
+        print(f"import time is over limit of {limit} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--limit", type=float, help="maximum import milliseconds")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(main(repeat=args.repeat, limit=args.limit))
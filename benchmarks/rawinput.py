@@ -0,0 +1,124 @@
+"""Benchmark RawInputClient packet encoding and sending.
+
+Sends a day of one second data to a local socket sink,
+and compares RawInputClient with the previous implementation,
+that packed each sample into the packet with struct.
+
+Usage:
+    python -m benchmarks.rawinput
+"""
+import socket
+import struct
+import threading
+import timeit
+
+import numpy
+from obspy.core import Stats, Trace, UTCDateTime
+
+from geomagio.edge import RawInputClient
+from geomagio.edge.RawInputClient import HOURSECONDS, PACKSTR, PACKETHEAD
+
+
+class PreviousRawInputClient(RawInputClient):
+    """Previous implementation of RawInputClient.send_trace encoding."""
+
+    def send_trace(self, interval, trace):
+        totalsamps = len(trace.data)
+        starttime = trace.stats.starttime
+        nsamp = HOURSECONDS
+        timeoffset = 1
+        samplerate = 1.0
+        for i in range(0, totalsamps, nsamp):
+            if totalsamps - i < nsamp:
+                endsample = totalsamps
+            else:
+                endsample = i + nsamp
+            nsamp = endsample - i
+            endtime = starttime + (nsamp - 1) * timeoffset
+            trace_send = trace.slice(starttime, endtime)
+            buf = self._get_data(trace_send.data, starttime, samplerate)
+            self._send(buf)
+            starttime += nsamp * timeoffset
+
+    def _get_data(self, samples, time, rate):
+        nsamp = len(samples)
+        yr, doy, secs, usecs = self._get_time_values(time)
+        ratemantissa, ratedivisor = self._get_mantissa_divisor(rate)
+        packStr = "%s%d%s" % (PACKSTR, nsamp, "i")
+        bpackStr = str(packStr).encode()
+        return struct.pack(
+            bpackStr,
+            PACKETHEAD,
+            nsamp,
+            self.seedname,
+            yr,
+            doy,
+            ratemantissa,
+            ratedivisor,
+            self.activity,
+            self.ioclock,
+            self.quality,
+            self.timingquality,
+            secs,
+            usecs,
+            self.sequence,
+            *samples,
+        )
+
+
+def create_trace():
+    """One day of one second integer data, like EdgeFactory sends."""
+    npts = 86400
+    stats = Stats()
+    stats.channel = "H"
+    stats.delta = 1
+    stats.starttime = UTCDateTime("2022-01-01T00:00:00Z")
+    stats.npts = npts
+    data = numpy.random.default_rng(0).integers(-(10**8), 10**8, size=npts)
+    return Trace(data, stats)
+
+
+def start_sink():
+    """Socket that reads and discards everything sent to it."""
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def read():
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                while connection.recv(1 << 20):
+                    pass
+
+    threading.Thread(target=read, daemon=True).start()
+    return server
+
+
+def main(repeat=5):
+    trace = create_trace()
+    sink = start_sink()
+    port = sink.getsockname()[1]
+    results = {}
+    for name, client_class in (
+        ("struct", PreviousRawInputClient),
+        ("sendmsg", RawInputClient),
+    ):
+        client = client_class(
+            tag="bench", host="127.0.0.1", port=port, station="BOU", channel="SVH"
+        )
+        client._open_socket()
+        results[name] = min(
+            timeit.repeat(
+                lambda: client.send_trace("second", trace), number=1, repeat=repeat
+            )
+        )
+        client.close()
+    for name, elapsed in results.items():
+        print(
+            f"{name:>8}: {elapsed * 1000:8.2f} ms per day,"
+            f" {trace.stats.npts / elapsed / 1e6:7.2f} million samples/s"
+        )
+    print(f" speedup: {results['struct'] / results['sendmsg']:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Fake earthworm wave server for benchmarks.
+
+Answers GETSCNLRAW requests with one tracebuf of generated int32 data,
+for any channel, after an optional delay to simulate a remote Edge server.
+"""
+import socketserver
+import struct
+import threading
+import time
+
+import numpy
+
+# tracebuf2 header, see obspy.clients.earthworm.waveserver
+TRACEBUF_HEADER = "<2i3d7s9s4s3s2s3s2s2s"
+# sampling rate by channel interval code, legacy and FDSN style
+SAMPLING_RATES = {
+    "S": 1.0,
+    "M": 1.0 / 60,
+    "H": 1.0 / 3600,
+    "D": 1.0 / 86400,
+    "B": 10.0,
+    "L": 1.0,
+    "U": 1.0 / 60,
+    "R": 1.0 / 3600,
+    "P": 1.0 / 86400,
+}
+
+
+class FakeWaveServer(socketserver.ThreadingTCPServer):
+    """Wave server listening on localhost.
+
+    Parameters
+    ----------
+    delay: seconds to wait before answering each request
+
+    Attributes
+    ----------
+    port: port server is listening on
+    requests: number of requests answered
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, delay=0.05):
+        super().__init__(("127.0.0.1", 0), FakeWaveServerHandler)
+        self.delay = delay
+        self.port = self.server_address[1]
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+
+class FakeWaveServerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        tokens = self.rfile.readline().decode().split()
+        if len(tokens) < 8 or tokens[0] != "GETSCNLRAW:":
+            return
+        self.server.count_request()
+        time.sleep(self.server.delay)
+        request_id, station, channel, network, location = tokens[1:6]
+        start, end = float(tokens[6]), float(tokens[7])
+        rate = SAMPLING_RATES.get(channel[0], 1.0)
+        first = numpy.ceil(start * rate)
+        data = numpy.arange(first, numpy.floor(end * rate) + 1, dtype="<i4")
+        header = struct.pack(
+            TRACEBUF_HEADER,
+            0,
+            len(data),
+            first / rate,
+            (first + len(data) - 1) / rate,
+            rate,
+            station.encode(),
+            network.encode(),
+            channel.encode(),
+            location.encode(),
+            b"20",
+            b"i4",
+            b"",
+            b"",
+        )
+        body = header + data.tobytes()
+        self.wfile.write(
+            (
+                f"{request_id} 0 {station} {channel} {network} {location} F i4"
+                f" {start} {end} {len(body)}\n"
+            ).encode()
+        )
+        self.wfile.write(body)
@@ -1,28 +1,49 @@
 """Controller class for geomag algorithms"""
 
 import argparse
-from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stderr
+import copy
+from io import BytesIO, StringIO
+import json
+import queue
+import signal
 import sys
-from typing import List, Optional, Tuple, Union
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 
+import numpy
 from obspy.core import Stream, UTCDateTime
 
 from .algorithm import Algorithm, algorithms, AlgorithmException
 from .DerivedTimeseriesFactory import DerivedTimeseriesFactory
 from .PlotTimeseriesFactory import PlotTimeseriesFactory
 from .StreamTimeseriesFactory import StreamTimeseriesFactory
-from . import TimeseriesUtility, Util
-
-# factory packages
-from . import binlog
-from . import edge
-from . import iaga2002
-from . import imfjson
-from . import pcdcp
-from . import imfv122
-from . import imfv283
-from . import temperature
-from . import vbf
+from .LazyRegistry import LazyRegistry
+from . import IntervalUtility, TimeseriesUtility, Util
+
+# factory classes by input and output type,
+# packages are imported when their type is used
+factories = LazyRegistry(
+    {
+        "binlog": "geomagio.binlog:BinLogFactory",
+        "edge": "geomagio.edge:EdgeFactory",
+        "goes": "geomagio.imfv283:GOESIMFV283Factory",
+        "iaga2002": "geomagio.iaga2002:IAGA2002Factory",
+        "imfjson": "geomagio.imfjson:IMFJSONFactory",
+        "imfv122": "geomagio.imfv122:IMFV122Factory",
+        "imfv283": "geomagio.imfv283:IMFV283Factory",
+        "miniseed": "geomagio.edge:MiniSeedFactory",
+        "pcdcp": "geomagio.pcdcp:PCDCPFactory",
+        "temperature": "geomagio.temperature:TEMPFactory",
+        "vbf": "geomagio.vbf:VBFFactory",
+    }
+)
+
+
+# number of windows run_as_update checks at once, when there is no update limit
+UNLIMITED_UPDATE_BLOCK = 10
 
 
 class Controller(object):
@@ -36,6 +57,12 @@ class Controller(object):
         the factory that will output the timeseries data
     algorithm: Algorithm
         the algorithm(s) that will procees the timeseries data
+    fetchWorkers: int
+        number of observatories to read at once,
+        reads are serial when 1
+    pipelineDepth: int
+        when updating, number of gaps that may be read or processed
+        while earlier gaps are written, gaps are run serially when 0
 
     Notes
     -----
@@ -55,12 +82,91 @@ class Controller(object):
         algorithm: Optional[Algorithm] = None,
         inputInterval: Optional[str] = None,
         outputInterval: Optional[str] = None,
+        fetchWorkers: int = 1,
+        pipelineDepth: int = 0,
     ):
         self._algorithm = algorithm
         self._inputFactory = inputFactory
         self._inputInterval = inputInterval
         self._outputFactory = outputFactory
         self._outputInterval = outputInterval
+        self._fetchWorkers = fetchWorkers
+        self._pipelineDepth = pipelineDepth
+        # input shared by run_targets, by observatory
+        self._inputCache: Optional[Dict[str, Stream]] = None
+
+    def _get_observatories_timeseries(
+        self, observatory, get_timeseries: Callable[[str], Optional[Stream]]
+    ) -> Stream:
+        """Get timeseries for each observatory, using up to fetchWorkers threads.
+
+        Parameters
+        ----------
+        observatory : array_like
+            observatories to request.
+        get_timeseries : callable
+            called with each observatory, returns timeseries or None.
+
+        Returns
+        -------
+        timeseries : obspy.core.Stream
+            traces in observatory order.
+
+        Raises
+        ------
+        Exception
+            see _map_observatories.
+        """
+        timeseries = Stream()
+        for result in self._map_observatories(observatory, get_timeseries):
+            if result is not None:
+                timeseries += result
+        return timeseries
+
+    def _map_observatories(
+        self, observatory, get_timeseries: Callable[[str], Optional[Stream]]
+    ) -> List[Optional[Stream]]:
+        """Call get_timeseries for each observatory, using up to fetchWorkers threads.
+
+        Parameters
+        ----------
+        observatory : array_like
+            observatories to request.
+        get_timeseries : callable
+            called with each observatory, returns timeseries or None.
+
+        Returns
+        -------
+        list of results, in observatory order.
+
+        Raises
+        ------
+        Exception
+            first exception, in observatory order,
+            after all other observatories have completed.
+            Other exceptions are reported to stderr.
+        """
+        workers = min(self._fetchWorkers, len(observatory))
+        if workers <= 1:
+            results = [get_timeseries(obs) for obs in observatory]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(get_timeseries, obs) for obs in observatory]
+            errors = [
+                (obs, future.exception())
+                for obs, future in zip(observatory, futures)
+                if future.exception() is not None
+            ]
+            for obs, error in errors[1:]:
+                print(
+                    "Exception getting observatory {}".format(obs),
+                    str(error),
+                    file=sys.stderr,
+                )
+            if errors:
+                raise errors[0][1]
+            results = [future.result() for future in futures]
+        return results
 
     def _get_input_timeseries(
         self,
@@ -94,8 +200,8 @@ class Controller(object):
         timeseries : obspy.core.Stream
         """
         algorithm = algorithm or self._algorithm
-        timeseries = Stream()
-        for obs in observatory:
+
+        def get_timeseries(obs):
             # get input interval for observatory
             # do this per observatory in case an
             # algorithm needs different amounts of data
@@ -103,14 +209,143 @@ class Controller(object):
                 start=starttime, end=endtime, observatory=obs, channels=channels
             )
             if input_start is None or input_end is None:
-                continue
-            timeseries += self._inputFactory.get_timeseries(
+                return None
+            return self._read_input(
                 observatory=obs,
                 starttime=input_start,
                 endtime=input_end,
                 channels=channels,
                 interval=interval or self._inputInterval,
             )
+
+        return self._get_observatories_timeseries(observatory, get_timeseries)
+
+    def _read_input(
+        self,
+        observatory: str,
+        starttime: UTCDateTime,
+        endtime: UTCDateTime,
+        channels: List[str],
+        interval: str,
+    ) -> Stream:
+        """Read input for one observatory.
+
+        Uses input shared by run_targets when it covers the request,
+        otherwise reads from the input factory.
+        """
+        cached = (self._inputCache or {}).get(observatory)
+        if cached is not None:
+            timeseries = Stream()
+            for channel in channels:
+                timeseries += cached.select(channel=channel)
+            if len(timeseries) == len(channels) and all(
+                trace.stats.starttime <= starttime and trace.stats.endtime >= endtime
+                for trace in timeseries
+            ):
+                return timeseries.slice(
+                    starttime=starttime, endtime=endtime, nearest_sample=False
+                )
+        return self._inputFactory.get_timeseries(
+            observatory=observatory,
+            starttime=starttime,
+            endtime=endtime,
+            channels=channels,
+            interval=interval,
+        )
+
+    def _prefetch_input_timeseries(
+        self,
+        observatory,
+        channels,
+        intervals: List[Tuple[UTCDateTime, UTCDateTime]],
+        algorithm=None,
+        interval=None,
+    ) -> Dict[str, Optional[Stream]]:
+        """Get input for several time ranges, with one read per observatory.
+
+        Parameters
+        ----------
+        observatory : array_like
+            observatories to request.
+        channels : array_like
+            channels to request.
+        intervals : list of (starttime, endtime)
+            time ranges that will be processed.
+
+        Returns
+        -------
+        dictionary of observatory to timeseries,
+        covering the input intervals for every time range,
+        or None when the algorithm needs no input for an observatory.
+        Use _slice_input_timeseries to get input for one time range.
+        """
+        algorithm = algorithm or self._algorithm
+
+        def get_timeseries(obs):
+            # superset of input intervals, so overlapping input is read once
+            input_start, input_end = None, None
+            for starttime, endtime in intervals:
+                start, end = algorithm.get_input_interval(
+                    start=starttime, end=endtime, observatory=obs, channels=channels
+                )
+                if start is None or end is None:
+                    continue
+                input_start = start if input_start is None else min(input_start, start)
+                input_end = end if input_end is None else max(input_end, end)
+            if input_start is None:
+                return None
+            return self._read_input(
+                observatory=obs,
+                starttime=input_start,
+                endtime=input_end,
+                channels=channels,
+                interval=interval or self._inputInterval,
+            )
+
+        return dict(
+            zip(observatory, self._map_observatories(observatory, get_timeseries))
+        )
+
+    def _slice_input_timeseries(
+        self,
+        prefetched: Dict[str, Optional[Stream]],
+        channels,
+        starttime,
+        endtime,
+        algorithm=None,
+    ) -> Stream:
+        """Get input for one time range from _prefetch_input_timeseries.
+
+        Parameters
+        ----------
+        prefetched : dict
+            result of _prefetch_input_timeseries.
+        channels : array_like
+            channels that were requested.
+        starttime : obspy.core.UTCDateTime
+            time of first sample to process.
+        endtime : obspy.core.UTCDateTime
+            time of last sample to process.
+
+        Returns
+        -------
+        timeseries : obspy.core.Stream
+            same as _get_input_timeseries would read.
+            Trace data are views of prefetched data, stats are copies.
+        """
+        algorithm = algorithm or self._algorithm
+        timeseries = Stream()
+        for obs, obs_timeseries in prefetched.items():
+            if obs_timeseries is None:
+                continue
+            input_start, input_end = algorithm.get_input_interval(
+                start=starttime, end=endtime, observatory=obs, channels=channels
+            )
+            if input_start is None or input_end is None:
+                continue
+            timeseries += obs_timeseries.slice(
+                starttime=input_start, endtime=input_end, nearest_sample=False
+            )
         return timeseries
 
     def _rename_channels(self, timeseries, renames):
@@ -161,16 +396,16 @@ class Controller(object):
         -------
         timeseries : obspy.core.Stream
         """
-        timeseries = Stream()
-        for obs in observatory:
-            timeseries += self._outputFactory.get_timeseries(
+        return self._get_observatories_timeseries(
+            observatory,
+            lambda obs: self._outputFactory.get_timeseries(
                 observatory=obs,
                 starttime=starttime,
                 endtime=endtime,
                 channels=channels,
                 interval=interval or self._outputInterval,
-            )
-        return timeseries
+            ),
+        )
 
     def _run(self, options, input_timeseries=None):
         """run controller
@@ -196,6 +431,7 @@ class Controller(object):
             rename_input_channel=options.rename_input_channel,
             rename_output_channel=options.rename_output_channel,
             realtime=options.realtime,
+            chunk_size=options.chunk_size,
         )
 
     def _run_as_update(self, options, update_count=0):
@@ -233,6 +469,177 @@ class Controller(object):
             update_limit=options.update_limit,
         )
 
+    def _run_daemon(self, options):
+        """Run as a daemon until SIGINT or SIGTERM.
+
+        Parameters
+        ----------
+        options: dictionary
+            The dictionary of all the command line arguments.
+        """
+        stop = threading.Event()
+
+        def handle_signal(signum, frame):
+            print("stopping after current run", file=sys.stderr)
+            stop.set()
+
+        handlers = {
+            signum: signal.signal(signum, handle_signal)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            self.run_daemon(
+                observatory=options.observatory,
+                output_observatory=options.output_observatory,
+                realtime=options.realtime,
+                cadence=options.daemon_cadence,
+                input_channels=options.inchannels,
+                output_channels=options.outchannels,
+                input_interval=options.input_interval or options.interval,
+                output_interval=options.output_interval or options.interval,
+                no_trim=options.no_trim,
+                rename_input_channel=options.rename_input_channel,
+                rename_output_channel=options.rename_output_channel,
+                update=options.update,
+                update_limit=options.update_limit,
+                chunk_size=options.chunk_size,
+                save_interval=options.daemon_save_interval,
+                stop=stop,
+            )
+        finally:
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+    def _plan(self, options):
+        """Print planned reads and writes, without reading or writing data.
+
+        Parameters
+        ----------
+        options: dictionary
+            The dictionary of all the command line arguments.
+        """
+        plan = self.plan(
+            observatory=options.observatory,
+            output_observatory=options.output_observatory,
+            starttime=options.starttime,
+            endtime=options.endtime,
+            input_channels=options.inchannels,
+            output_channels=options.outchannels,
+            input_interval=options.input_interval or options.interval,
+            output_interval=options.output_interval or options.interval,
+            update=options.update,
+            update_limit=options.update_limit,
+            chunk_size=options.chunk_size,
+        )
+        if options.update:
+            print("update plan, assuming all output is missing")
+        for action, observatory, channels, starttime, endtime, interval in plan:
+            delta = TimeseriesUtility.get_delta_from_interval(interval)
+            samples = delta and (int((endtime - starttime) / delta) + 1) * len(channels)
+            print(
+                action,
+                observatory,
+                ",".join(channels),
+                interval,
+                starttime,
+                endtime,
+                samples is None and "unknown samples" or f"{samples} samples",
+            )
+
+    def plan(
+        self,
+        observatory: List[str],
+        output_observatory: List[str],
+        starttime: UTCDateTime,
+        endtime: UTCDateTime,
+        algorithm: Optional[Algorithm] = None,
+        input_channels: Optional[List[str]] = None,
+        output_channels: Optional[List[str]] = None,
+        input_interval: Optional[str] = None,
+        output_interval: Optional[str] = None,
+        update: bool = False,
+        update_limit: int = 1,
+        chunk_size: int = 0,
+    ) -> List[Tuple[str, str, List[str], UTCDateTime, UTCDateTime, str]]:
+        """Plan reads and writes for run or run_as_update.
+
+        Parameters are the same as run and run_as_update.
+
+        Returns
+        -------
+        list of (action, observatory, channels, starttime, endtime, interval),
+        where action is one of "read input", "read output", or "write output".
+        When update is True, input reads and output writes are the most that
+        may happen, if all output is missing; and when update_limit is 0,
+        only the first block of windows is planned.
+        """
+        algorithm = algorithm or self._algorithm
+        input_channels = input_channels or algorithm.get_input_channels()
+        output_channels = output_channels or algorithm.get_output_channels()
+        input_interval = input_interval or self._inputInterval
+        output_interval = output_interval or self._outputInterval
+        plan = []
+        if update:
+            windows = get_update_windows(
+                starttime, endtime, update_limit or UNLIMITED_UPDATE_BLOCK
+            )
+            starttime = windows[-1][0]
+            for obs in output_observatory:
+                plan.append(
+                    (
+                        "read output",
+                        obs,
+                        output_channels,
+                        starttime,
+                        endtime,
+                        output_interval,
+                    )
+                )
+            ranges = [(starttime, endtime)]
+        else:
+            starttime = algorithm.get_next_starttime() or starttime
+            if chunk_size > 0:
+                ranges = get_run_chunks(
+                    starttime=starttime,
+                    endtime=endtime,
+                    size=chunk_size,
+                    delta=TimeseriesUtility.get_delta_from_interval(output_interval),
+                )
+            else:
+                ranges = [(starttime, endtime)]
+        for starttime, endtime in ranges:
+            for obs in observatory:
+                input_start, input_end = algorithm.get_input_interval(
+                    start=starttime,
+                    end=endtime,
+                    observatory=obs,
+                    channels=input_channels,
+                )
+                if input_start is None or input_end is None:
+                    continue
+                plan.append(
+                    (
+                        "read input",
+                        obs,
+                        input_channels,
+                        input_start,
+                        input_end,
+                        input_interval,
+                    )
+                )
+            for obs in output_observatory:
+                plan.append(
+                    (
+                        "write output",
+                        obs,
+                        output_channels,
+                        starttime,
+                        endtime,
+                        output_interval,
+                    )
+                )
+        return plan
+
     def run(
         self,
         observatory: List[str],
@@ -248,6 +655,8 @@ class Controller(object):
         realtime: Union[bool, int] = False,
         rename_input_channel: Optional[List[List[str]]] = None,
         rename_output_channel: Optional[List[List[str]]] = None,
+        chunk_size: int = 0,
+        flush: bool = True,
     ):
         """Run algorithm for a specific time range.
 
@@ -265,6 +674,11 @@ class Controller(object):
         realtime: number of seconds in realtime interval
         rename_input_channel: list of input channel renames
         rename_output_channel: list of output channel renames
+        chunk_size: when more than 0 and input_timeseries is not set,
+            process in aligned chunks of this many seconds,
+            so memory use depends on chunk size instead of time range.
+        flush: whether to wait for output to be written before returning,
+            callers that run several intervals flush once when done.
         """
         # ensure realtime is a valid value:
         if realtime <= 0:
@@ -274,6 +688,30 @@ class Controller(object):
         output_channels = output_channels or algorithm.get_output_channels()
         input_interval = input_interval or self._inputInterval
         output_interval = output_interval or self._outputInterval
+        if chunk_size > 0 and input_timeseries is None:
+            chunks = get_run_chunks(
+                starttime=starttime,
+                endtime=endtime,
+                size=chunk_size,
+                delta=TimeseriesUtility.get_delta_from_interval(output_interval),
+            )
+            if len(chunks) > 1:
+                self._run_chunks(
+                    chunks=chunks,
+                    algorithm=algorithm,
+                    observatory=observatory,
+                    input_channels=input_channels,
+                    output_channels=output_channels,
+                    input_interval=input_interval,
+                    output_interval=output_interval,
+                    no_trim=no_trim,
+                    realtime=realtime,
+                    rename_input_channel=rename_input_channel,
+                    rename_output_channel=rename_output_channel,
+                )
+                if flush:
+                    self._outputFactory.flush()
+                return
         next_starttime = algorithm.get_next_starttime()
         starttime = next_starttime or starttime
         # input
@@ -285,9 +723,385 @@ class Controller(object):
             channels=input_channels,
             interval=input_interval,
         )
-        if timeseries.count() == 0:
-            # no data to process
+        processed = self._process_timeseries(
+            timeseries=timeseries,
+            algorithm=algorithm,
+            starttime=starttime,
+            endtime=endtime,
+            next_starttime=next_starttime,
+            no_trim=no_trim,
+            realtime=realtime,
+            rename_input_channel=rename_input_channel,
+            rename_output_channel=rename_output_channel,
+        )
+        if processed is not None:
+            self._outputFactory.put_timeseries(
+                timeseries=processed,
+                starttime=starttime,
+                endtime=endtime,
+                channels=output_channels,
+                interval=output_interval,
+            )
+        if flush:
+            # factories may write in the background, wait so errors are reported
+            self._outputFactory.flush()
+
+    def run_targets(
+        self,
+        targets: List["ControllerTarget"],
+        observatory: List[str],
+        output_observatory: List[str],
+        starttime: UTCDateTime,
+        endtime: UTCDateTime,
+        input_interval: Optional[str] = None,
+        no_trim: bool = False,
+        realtime: Union[bool, int] = False,
+        rename_input_channel: Optional[List[List[str]]] = None,
+        update: bool = False,
+        update_limit: int = 1,
+        workers: int = 1,
+    ):
+        """Run several algorithms and outputs, reading input once.
+
+        Parameters
+        ----------
+        targets: algorithms and outputs to run
+        workers: number of targets to run at once, in separate threads
+        other parameters are the same as run and run_as_update
+
+        Raises
+        ------
+        Exception
+            first exception, in target order,
+            after all other targets have completed.
+            Other exceptions are reported to stderr.
+
+        Notes
+        -----
+        Input is read once for each observatory, with every channel and
+            time range that targets need. Targets that need other input,
+            such as stateful algorithms starting before starttime,
+            read it from the input factory.
+        """
+        input_interval = input_interval or self._inputInterval
+        if update:
+            windows = get_update_windows(
+                starttime, endtime, update_limit or UNLIMITED_UPDATE_BLOCK
+            )
+            span_start = windows[-1][0]
+        else:
+            span_start = starttime
+        channels = []
+        for target in targets:
+            for channel in target.get_input_channels():
+                if channel not in channels:
+                    channels.append(channel)
+
+        def get_timeseries(obs):
+            input_start, input_end = None, None
+            for target in targets:
+                start, end = target.algorithm.get_input_interval(
+                    start=span_start,
+                    end=endtime,
+                    observatory=obs,
+                    channels=target.get_input_channels(),
+                )
+                if start is None or end is None:
+                    continue
+                input_start = start if input_start is None else min(input_start, start)
+                input_end = end if input_end is None else max(input_end, end)
+            if input_start is None:
+                return None
+            return self._inputFactory.get_timeseries(
+                observatory=obs,
+                starttime=input_start,
+                endtime=input_end,
+                channels=channels,
+                interval=input_interval,
+            )
+
+        cache = dict(
+            zip(observatory, self._map_observatories(observatory, get_timeseries))
+        )
+
+        def run_target(target):
+            controller = Controller(
+                inputFactory=self._inputFactory,
+                outputFactory=target.output_factory,
+                algorithm=target.algorithm,
+                inputInterval=input_interval,
+                outputInterval=target.output_interval or self._outputInterval,
+                fetchWorkers=self._fetchWorkers,
+                pipelineDepth=self._pipelineDepth,
+            )
+            controller._inputCache = cache
+            if update:
+                controller.run_as_update(
+                    observatory=observatory,
+                    output_observatory=output_observatory,
+                    starttime=starttime,
+                    endtime=endtime,
+                    input_channels=target.input_channels,
+                    output_channels=target.output_channels,
+                    no_trim=no_trim,
+                    realtime=realtime,
+                    rename_input_channel=rename_input_channel,
+                    rename_output_channel=target.rename_output_channel,
+                    update_limit=update_limit,
+                )
+            else:
+                controller.run(
+                    observatory=observatory,
+                    starttime=starttime,
+                    endtime=endtime,
+                    input_channels=target.input_channels,
+                    output_channels=target.output_channels,
+                    no_trim=no_trim,
+                    realtime=realtime,
+                    rename_input_channel=rename_input_channel,
+                    rename_output_channel=target.rename_output_channel,
+                )
+
+        workers = min(workers, len(targets))
+        if workers <= 1:
+            for target in targets:
+                run_target(target)
             return
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(run_target, target) for target in targets]
+        errors = [
+            (target, future.exception())
+            for target, future in zip(targets, futures)
+            if future.exception() is not None
+        ]
+        for target, error in errors[1:]:
+            print(
+                "Exception processing target {}".format(target.name),
+                str(error),
+                file=sys.stderr,
+            )
+        if errors:
+            raise errors[0][1]
+
+    def run_daemon(
+        self,
+        observatory: List[str],
+        output_observatory: List[str],
+        realtime: int,
+        cadence: int = 60,
+        algorithm: Optional[Algorithm] = None,
+        input_channels: Optional[List[str]] = None,
+        output_channels: Optional[List[str]] = None,
+        input_interval: Optional[str] = None,
+        output_interval: Optional[str] = None,
+        no_trim: bool = False,
+        rename_input_channel: Optional[List[List[str]]] = None,
+        rename_output_channel: Optional[List[List[str]]] = None,
+        update: bool = False,
+        update_limit: int = 0,
+        chunk_size: int = 0,
+        save_interval: int = 3600,
+        stop: Optional[threading.Event] = None,
+    ):
+        """Process realtime data until stopped.
+
+        Factories and algorithm state stay in memory between runs,
+        instead of being created each time a process starts.
+
+        Parameters
+        ----------
+        realtime: seconds processed by the first run,
+            and checked for gaps by each update run
+        cadence: seconds between runs, runs start at multiples of cadence
+        update: whether to use run_as_update instead of run
+        save_interval: seconds between calls to algorithm.save_state
+        stop: event that stops processing after the current run
+        other parameters are the same as run and run_as_update
+
+        Notes
+        -----
+        After the first run, runs start one sample after the end of
+            the last successful run, so only new samples are read
+            and processing catches up after a stall or error.
+        Errors are reported to stderr, and the failed interval is
+            run again at the next wake.
+        Algorithm state is saved every save_interval, and when stopped.
+        """
+        algorithm = algorithm or self._algorithm
+        output_interval = output_interval or self._outputInterval
+        delta = TimeseriesUtility.get_delta_from_interval(output_interval) or 1
+        stop = stop or threading.Event()
+        last_endtime = None
+        last_save = time.monotonic()
+        while not stop.is_set():
+            starttime, endtime = get_daemon_interval(
+                now=UTCDateTime(),
+                cadence=cadence,
+                realtime=realtime,
+                delta=delta,
+                last_endtime=last_endtime,
+                update=update,
+            )
+            try:
+                if starttime <= endtime:
+                    self._run_daemon_interval(
+                        starttime=starttime,
+                        endtime=endtime,
+                        algorithm=algorithm,
+                        observatory=observatory,
+                        output_observatory=output_observatory,
+                        input_channels=input_channels,
+                        output_channels=output_channels,
+                        input_interval=input_interval,
+                        output_interval=output_interval,
+                        no_trim=no_trim,
+                        realtime=realtime,
+                        rename_input_channel=rename_input_channel,
+                        rename_output_channel=rename_output_channel,
+                        update=update,
+                        update_limit=update_limit,
+                        chunk_size=chunk_size,
+                    )
+                last_endtime = endtime
+            except Exception as e:
+                print(
+                    "Exception processing", starttime, endtime, str(e), file=sys.stderr
+                )
+            if time.monotonic() - last_save >= save_interval:
+                _save_daemon_state(algorithm)
+                last_save = time.monotonic()
+            # wake at the next multiple of cadence
+            stop.wait(max(0, endtime + cadence - UTCDateTime()))
+        _save_daemon_state(algorithm)
+
+    def _run_daemon_interval(
+        self,
+        starttime: UTCDateTime,
+        endtime: UTCDateTime,
+        algorithm: Algorithm,
+        observatory: List[str],
+        output_observatory: List[str],
+        update: bool = False,
+        update_limit: int = 0,
+        chunk_size: int = 0,
+        **kwargs,
+    ):
+        """Run one daemon interval, parameters are the same as run_daemon."""
+        print("daemon run", starttime, endtime, file=sys.stderr)
+        if update:
+            self.run_as_update(
+                algorithm=algorithm,
+                observatory=observatory,
+                output_observatory=output_observatory,
+                starttime=starttime,
+                endtime=endtime,
+                update_limit=update_limit,
+                **kwargs,
+            )
+        else:
+            self.run(
+                algorithm=algorithm,
+                observatory=observatory,
+                starttime=starttime,
+                endtime=endtime,
+                chunk_size=chunk_size,
+                **kwargs,
+            )
+
+    def _run_chunks(
+        self,
+        chunks: List[Tuple[UTCDateTime, UTCDateTime]],
+        algorithm: Algorithm,
+        observatory: List[str],
+        input_channels: List[str],
+        output_channels: List[str],
+        input_interval: str,
+        output_interval: str,
+        no_trim: bool = False,
+        realtime: Union[bool, int] = False,
+        rename_input_channel: Optional[List[List[str]]] = None,
+        rename_output_channel: Optional[List[List[str]]] = None,
+    ):
+        """Run each chunk of a time range, oldest first.
+
+        Each chunk is read, processed, and written before the next chunk
+        is read, or pipelined when pipelineDepth is more than 0
+        and the algorithm is stateless.
+        Stateful algorithms carry state from one chunk to the next,
+        and chunks that end before the algorithm next starttime are skipped.
+
+        Parameters
+        ----------
+        chunks: list of (starttime, endtime), from get_run_chunks
+        other parameters are the same as run
+        """
+        if self._pipelineDepth > 0 and algorithm.get_next_starttime() is None:
+            self._run_pipelined(
+                runs=[(starttime, endtime, None) for starttime, endtime in chunks],
+                algorithm=algorithm,
+                observatory=observatory,
+                output_observatory=observatory,
+                input_channels=input_channels,
+                output_channels=output_channels,
+                input_interval=input_interval,
+                output_interval=output_interval,
+                no_trim=no_trim,
+                realtime=realtime,
+                rename_input_channel=rename_input_channel,
+                rename_output_channel=rename_output_channel,
+            )
+            return
+        for starttime, endtime in chunks:
+            next_starttime = algorithm.get_next_starttime()
+            if next_starttime is not None and next_starttime > endtime:
+                continue
+            print(
+                "processing",
+                next_starttime or starttime,
+                endtime,
+                observatory,
+                output_channels,
+                file=sys.stderr,
+            )
+            self.run(
+                algorithm=algorithm,
+                observatory=observatory,
+                starttime=starttime,
+                endtime=endtime,
+                input_channels=input_channels,
+                output_channels=output_channels,
+                input_interval=input_interval,
+                output_interval=output_interval,
+                no_trim=no_trim,
+                realtime=realtime,
+                rename_input_channel=rename_input_channel,
+                rename_output_channel=rename_output_channel,
+                flush=False,
+            )
+
+    def _process_timeseries(
+        self,
+        timeseries: Stream,
+        algorithm: Algorithm,
+        starttime: UTCDateTime,
+        endtime: UTCDateTime,
+        next_starttime: Optional[UTCDateTime] = None,
+        no_trim: bool = False,
+        realtime: Union[bool, int] = False,
+        rename_input_channel: Optional[List[List[str]]] = None,
+        rename_output_channel: Optional[List[List[str]]] = None,
+    ) -> Optional[Stream]:
+        """Process input for run.
+
+        Parameters are the same as run, and next_starttime is
+        the algorithm next starttime before processing.
+
+        Returns
+        -------
+        processed timeseries, or None if there is no input to process.
+        """
+        if timeseries.count() == 0:
+            return None
         # pre-process
         if next_starttime and realtime:
             # when running a stateful algorithms with the realtime option
@@ -314,14 +1128,7 @@ class Controller(object):
             processed = self._rename_channels(
                 timeseries=processed, renames=rename_output_channel
             )
-        # output
-        self._outputFactory.put_timeseries(
-            timeseries=processed,
-            starttime=starttime,
-            endtime=endtime,
-            channels=output_channels,
-            interval=output_interval,
-        )
+        return processed
 
     def run_as_update(
         self,
@@ -359,16 +1166,20 @@ class Controller(object):
         rename_input_channel: list of input channel renames
         rename_output_channel: list of output channel renames
 
+        update_limit: number of windows to check, 0 for no limit
+        update_count: number of windows already checked
+
         Notes
         -----
         Finds gaps in the target data, and if there's new data in the input
             source, calls run with the start/end time of a given gap to fill
             in.
-        It checks the start of the target data, and if it's missing, and
-            there's new data available, it backs up the starttime/endtime,
-            and recursively calls itself, to check the previous period, to see
-            if new data is available there as well. Calls run for each new
-            period, oldest to newest.
+        When there is a fillable gap at the start of a window, the previous
+            window (of the same length) is also checked, up to update_limit
+            windows. Output is read once for all windows being checked,
+            input is read once covering every gap, and run is called
+            with a slice of that input for each fillable gap,
+            oldest to newest.
         """
         # If an update_limit is set, make certain we don't step past it.
         if update_limit > 0 and update_count >= update_limit:
@@ -380,6 +1191,189 @@ class Controller(object):
         output_channels = output_channels or algorithm.get_output_channels()
         input_interval = input_interval or self._inputInterval
         output_interval = output_interval or self._outputInterval
+        # plan windows in blocks, when there is no limit
+        if update_limit > 0:
+            block_size = update_limit - update_count
+        else:
+            block_size = UNLIMITED_UPDATE_BLOCK
+        windows = get_update_windows(starttime, endtime, block_size)
+        runs = []
+        while True:
+            block_runs, more = self._get_update_runs(
+                algorithm=algorithm,
+                observatory=observatory,
+                output_observatory=output_observatory,
+                windows=windows,
+                input_channels=input_channels,
+                output_channels=output_channels,
+                input_interval=input_interval,
+                output_interval=output_interval,
+            )
+            runs = block_runs + runs
+            if not more or update_limit > 0:
+                break
+            # continue before oldest window
+            window_start, window_end = windows[-1]
+            windows = get_update_windows(
+                window_start - (window_end - window_start + 1),
+                window_start - 1,
+                block_size,
+            )
+        if self._pipelineDepth > 0 and len(runs) > 1:
+            self._run_pipelined(
+                runs=runs,
+                algorithm=algorithm,
+                observatory=observatory,
+                output_observatory=output_observatory,
+                input_channels=input_channels,
+                output_channels=output_channels,
+                input_interval=input_interval,
+                output_interval=output_interval,
+                no_trim=no_trim,
+                realtime=realtime,
+                rename_input_channel=rename_input_channel,
+                rename_output_channel=rename_output_channel,
+            )
+        else:
+            for run_starttime, run_endtime, input_timeseries in runs:
+                print(
+                    "processing",
+                    run_starttime,
+                    run_endtime,
+                    output_observatory,
+                    output_channels,
+                    file=sys.stderr,
+                )
+                self.run(
+                    algorithm=algorithm,
+                    observatory=observatory,
+                    starttime=run_starttime,
+                    endtime=run_endtime,
+                    input_channels=input_channels,
+                    input_timeseries=input_timeseries,
+                    output_channels=output_channels,
+                    input_interval=input_interval,
+                    output_interval=output_interval,
+                    no_trim=no_trim,
+                    realtime=realtime,
+                    rename_input_channel=rename_input_channel,
+                    rename_output_channel=rename_output_channel,
+                    flush=False,
+                )
+        # factories may write in the background, flush once for all runs
+        self._outputFactory.flush()
+
+    def _run_pipelined(
+        self,
+        runs: List[Tuple[UTCDateTime, UTCDateTime, Optional[Stream]]],
+        algorithm: Algorithm,
+        observatory: List[str],
+        output_observatory: List[str],
+        input_channels: List[str],
+        output_channels: List[str],
+        input_interval: str,
+        output_interval: str,
+        no_trim: bool = False,
+        realtime: Union[bool, int] = False,
+        rename_input_channel: Optional[List[List[str]]] = None,
+        rename_output_channel: Optional[List[List[str]]] = None,
+    ):
+        """Run several time ranges, overlapping reads, processing, and writes.
+
+        Input for a run is read in one thread, and processed in another,
+        while earlier runs are written in the calling thread.
+        Up to pipelineDepth runs wait between each step,
+        and output is written in the same order as runs.
+
+        Parameters
+        ----------
+        runs: list of (starttime, endtime, input timeseries),
+            input is read when input timeseries is None
+        other parameters are the same as run_as_update
+
+        Notes
+        -----
+        Algorithm state is not carried between runs, so stateful algorithms
+            must call run for each time range instead.
+        """
+        if algorithm.get_next_starttime() is not None:
+            raise AlgorithmException("Stateful algorithms cannot be pipelined")
+
+        def read(run):
+            starttime, endtime, input_timeseries = run
+            timeseries = input_timeseries or self._get_input_timeseries(
+                algorithm=algorithm,
+                observatory=observatory,
+                starttime=starttime,
+                endtime=endtime,
+                channels=input_channels,
+                interval=input_interval,
+            )
+            return starttime, endtime, timeseries
+
+        def process(run):
+            starttime, endtime, timeseries = run
+            print(
+                "processing",
+                starttime,
+                endtime,
+                output_observatory,
+                output_channels,
+                file=sys.stderr,
+            )
+            processed = self._process_timeseries(
+                timeseries=timeseries,
+                algorithm=algorithm,
+                starttime=starttime,
+                endtime=endtime,
+                no_trim=no_trim,
+                realtime=realtime,
+                rename_input_channel=rename_input_channel,
+                rename_output_channel=rename_output_channel,
+            )
+            return starttime, endtime, processed
+
+        def write(run):
+            starttime, endtime, processed = run
+            if processed is None:
+                return
+            self._outputFactory.put_timeseries(
+                timeseries=processed,
+                starttime=starttime,
+                endtime=endtime,
+                channels=output_channels,
+                interval=output_interval,
+            )
+
+        run_pipeline(runs, [read, process, write], depth=self._pipelineDepth)
+
+    def _get_update_runs(
+        self,
+        algorithm: Algorithm,
+        observatory: List[str],
+        output_observatory: List[str],
+        windows: List[Tuple[UTCDateTime, UTCDateTime]],
+        input_channels: List[str],
+        output_channels: List[str],
+        input_interval: str,
+        output_interval: str,
+    ) -> Tuple[List[Tuple[UTCDateTime, UTCDateTime, Stream]], bool]:
+        """Find fillable gaps in output for a block of update windows.
+
+        Parameters
+        ----------
+        windows: list of (starttime, endtime), newest first,
+            from get_update_windows
+        other parameters are the same as run_as_update
+
+        Returns
+        -------
+        runs: list of (starttime, endtime, input timeseries) to process,
+            oldest first
+        more: whether the oldest window starts with a fillable gap,
+            and the window before it should also be checked.
+        """
+        starttime, endtime = windows[-1][0], windows[0][1]
         print(
             "checking gaps",
             starttime,
@@ -396,82 +1390,325 @@ class Controller(object):
             channels=output_channels,
             interval=output_interval,
         )
-        if len(output_timeseries) > 0:
-            # find gaps in output, so they can be updated
-            output_gaps = TimeseriesUtility.get_merged_gaps(
-                TimeseriesUtility.get_stream_gaps(output_timeseries)
-            )
-        else:
-            output_gaps = [
-                [
-                    starttime,
-                    endtime,
-                    # next sample time not used
-                    None,
-                ]
-            ]
-        for output_gap in output_gaps:
-            input_timeseries = self._get_input_timeseries(
-                algorithm=algorithm,
-                observatory=observatory,
-                starttime=output_gap[0],
-                endtime=output_gap[1],
-                channels=input_channels,
-                interval=input_interval,
+        if len(output_timeseries) > 0:
+            # find gaps in output, so they can be updated
+            gaps = IntervalUtility.union(
+                *TimeseriesUtility.get_stream_gap_intervals(output_timeseries).values()
             )
-            if not algorithm.can_produce_data(
-                starttime=output_gap[0], endtime=output_gap[1], stream=input_timeseries
-            ):
-                continue
-            # check for fillable gap at start
-            if output_gap[0] == starttime:
-                # found fillable gap at start, recurse to previous interval
-                interval = endtime - starttime
-                recurse_starttime = starttime - interval
-                recurse_endtime = starttime - 1
-                self.run_as_update(
-                    algorithm=algorithm,
-                    observatory=observatory,
-                    output_observatory=output_observatory,
-                    starttime=recurse_starttime,
-                    endtime=recurse_endtime,
-                    input_channels=input_channels,
-                    output_channels=output_channels,
-                    input_interval=input_interval,
-                    output_interval=output_interval,
-                    no_trim=no_trim,
-                    realtime=realtime,
-                    rename_input_channel=rename_input_channel,
-                    rename_output_channel=rename_output_channel,
-                    update_limit=update_limit,
-                    update_count=update_count + 1,
-                )
-            # fill gap
-            gap_starttime = output_gap[0]
-            gap_endtime = output_gap[1]
-            print(
-                "processing",
-                gap_starttime,
-                gap_endtime,
-                output_observatory,
-                output_channels,
-                file=sys.stderr,
+        else:
+            gaps = IntervalUtility.create_intervals(
+                # next sample time not used
+                starts=[starttime.ns],
+                ends=[endtime.ns],
+                nexts=[endtime.ns + 1],
             )
-            self.run(
-                algorithm=algorithm,
-                observatory=observatory,
-                starttime=gap_starttime,
-                endtime=gap_endtime,
-                input_channels=input_channels,
-                input_timeseries=input_timeseries,
-                output_channels=output_channels,
-                input_interval=input_interval,
-                output_interval=output_interval,
-                no_trim=no_trim,
-                realtime=realtime,
-                rename_input_channel=rename_input_channel,
-                rename_output_channel=rename_output_channel,
+        # gaps in each window the walk can reach, older windows are only
+        # checked when the newer window starts with a gap
+        reachable = []
+        for window_start, window_end in windows:
+            window_gaps = IntervalUtility.intersection(
+                gaps,
+                IntervalUtility.create_intervals(
+                    starts=[window_start.ns],
+                    ends=[window_end.ns],
+                    nexts=[window_end.ns + 1],
+                ),
+            )
+            reachable.append(window_gaps)
+            if not numpy.any(window_gaps[:, 0] == window_start.ns):
+                break
+        # input for gaps in reachable windows, read when first needed
+        prefetched = None
+        # list of [gap group, starttime, endtime], newest first
+        pieces = []
+        more = True
+        for (window_start, window_end), window_gaps in zip(windows, reachable):
+            groups = numpy.searchsorted(gaps[:, 0], window_gaps[:, 0], side="right") - 1
+            fillable_start = False
+            # newest first within window
+            for group, gap in reversed(list(zip(groups.tolist(), window_gaps))):
+                if prefetched is None:
+                    prefetched = self._prefetch_input_timeseries(
+                        algorithm=algorithm,
+                        observatory=observatory,
+                        intervals=[
+                            (UTCDateTime(ns=int(start)), UTCDateTime(ns=int(end)))
+                            for start, end in numpy.concatenate(reachable)[:, :2]
+                        ],
+                        channels=input_channels,
+                        interval=input_interval,
+                    )
+                gap_starttime = UTCDateTime(ns=int(gap[0]))
+                gap_endtime = UTCDateTime(ns=int(gap[1]))
+                if not algorithm.can_produce_data(
+                    starttime=gap_starttime,
+                    endtime=gap_endtime,
+                    stream=self._slice_input_timeseries(
+                        algorithm=algorithm,
+                        prefetched=prefetched,
+                        starttime=gap_starttime,
+                        endtime=gap_endtime,
+                        channels=input_channels,
+                    ),
+                ):
+                    continue
+                pieces.append([group, gap_starttime, gap_endtime])
+                if gap_starttime == window_start:
+                    fillable_start = True
+            if not fillable_start:
+                # no fillable gap at start, previous window is not checked
+                more = False
+                break
+        # combine pieces of the same gap group in adjacent windows
+        runs = []
+        for group, gap_starttime, gap_endtime in reversed(pieces):
+            if runs and runs[-1][0] == group:
+                runs[-1][2] = gap_endtime
+            else:
+                runs.append([group, gap_starttime, gap_endtime])
+        return [
+            (
+                start,
+                end,
+                self._slice_input_timeseries(
+                    algorithm=algorithm,
+                    prefetched=prefetched,
+                    starttime=start,
+                    endtime=end,
+                    channels=input_channels,
+                ),
             )
+            for group, start, end in runs
+        ], more
+
+
+class ControllerTarget(object):
+    """Algorithm and output for Controller.run_targets.
+
+    Parameters
+    ----------
+    algorithm: algorithm to run
+    output_factory: factory to write output
+    input_channels: channels to read, default from algorithm
+    output_channels: channels to write, default from algorithm
+    output_interval: output data interval, default from controller
+    rename_output_channel: list of output channel renames
+    name: name used in error messages, default algorithm class name
+    """
+
+    def __init__(
+        self,
+        algorithm: Algorithm,
+        output_factory,
+        input_channels: Optional[List[str]] = None,
+        output_channels: Optional[List[str]] = None,
+        output_interval: Optional[str] = None,
+        rename_output_channel: Optional[List[List[str]]] = None,
+        name: Optional[str] = None,
+    ):
+        self.algorithm = algorithm
+        self.output_factory = output_factory
+        self.input_channels = input_channels
+        self.output_channels = output_channels
+        self.output_interval = output_interval
+        self.rename_output_channel = rename_output_channel
+        self.name = name or algorithm.__class__.__name__
+
+    def get_input_channels(self) -> List[str]:
+        return self.input_channels or self.algorithm.get_input_channels()
+
+
+def get_daemon_interval(
+    now: UTCDateTime,
+    cadence: int,
+    realtime: int,
+    delta: float,
+    last_endtime: Optional[UTCDateTime] = None,
+    update: bool = False,
+) -> Tuple[UTCDateTime, UTCDateTime]:
+    """Get interval for a daemon run.
+
+    Parameters
+    ----------
+    now: current time
+    cadence: seconds between runs
+    realtime: seconds in realtime interval
+    delta: seconds between output samples
+    last_endtime: end of last successful run, None for the first run
+    update: whether run checks for gaps
+
+    Returns
+    -------
+    (starttime, endtime) to run.
+    endtime is now, rounded down to a multiple of cadence.
+    starttime is endtime - realtime for the first run, otherwise
+    one sample after last_endtime, and no later than endtime - realtime
+    for update runs, so late data in the realtime interval is filled.
+    starttime is after endtime when there are no new samples.
+    """
+    endtime = UTCDateTime(ns=now.ns - now.ns % int(cadence * 1e9))
+    starttime = endtime - realtime
+    if last_endtime is not None:
+        if update:
+            starttime = min(starttime, last_endtime + delta)
+        else:
+            starttime = last_endtime + delta
+    return starttime, endtime
+
+
+def _save_daemon_state(algorithm: Algorithm):
+    """Save algorithm state, reporting errors so the daemon keeps running."""
+    try:
+        algorithm.save_state()
+    except Exception as e:
+        print("Exception saving algorithm state", str(e), file=sys.stderr)
+
+
+def get_run_chunks(
+    starttime: UTCDateTime,
+    endtime: UTCDateTime,
+    size: int,
+    delta: Optional[float] = None,
+) -> List[Tuple[UTCDateTime, UTCDateTime]]:
+    """Divide a run into chunks aligned to size.
+
+    Parameters
+    ----------
+    starttime: time of first sample
+    endtime: time of last sample
+    size: seconds in each chunk
+    delta: seconds between samples, default 1
+
+    Returns
+    -------
+    list of (starttime, endtime), oldest first.
+    First and last chunks are trimmed to starttime and endtime,
+    and other chunks end one sample before the next chunk starts.
+    """
+    delta = delta or 1
+    chunks = []
+    for interval in Util.get_intervals(
+        starttime=starttime, endtime=endtime, size=size, align=True, trim=True
+    ):
+        start, end = interval["start"], interval["end"]
+        chunks.append((start, endtime if end >= endtime else end - delta))
+    return chunks
+
+
+def run_pipeline(items: Iterable, stages: List[Callable], depth: int = 1) -> List:
+    """Pass items through stages, running each stage in its own thread.
+
+    Parameters
+    ----------
+    items: items to pass to first stage
+    stages: callables, each called with the result of the previous stage
+    depth: number of results that may wait for each following stage,
+        stages block until there is room, so memory use is bounded
+
+    Returns
+    -------
+    list of results from last stage, in the same order as items.
+    The last stage is called in the calling thread, in item order.
+
+    Raises
+    ------
+    Exception
+        first exception raised by a stage, after all threads stop.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=depth) for stage in stages[:-1]]
+
+    def put(output, item):
+        # wait for room, unless pipeline is stopping
+        while not stop.is_set():
+            try:
+                output.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def get_items(input):
+        # wait for items, unless pipeline is stopping
+        while not stop.is_set():
+            try:
+                item = input.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _PIPELINE_DONE:
+                return
+            yield item
+
+    def run_stage(stage, input, output):
+        try:
+            for item in get_items(input) if input else items:
+                if stop.is_set():
+                    return
+                if isinstance(item, _PipelineError):
+                    put(output, item)
+                    return
+                put(output, stage(item))
+        except Exception as e:
+            put(output, _PipelineError(e))
+            return
+        put(output, _PIPELINE_DONE)
+
+    threads = [
+        threading.Thread(
+            target=run_stage,
+            args=(stage, queues[i - 1] if i > 0 else None, queues[i]),
+            daemon=True,
+        )
+        for i, stage in enumerate(stages[:-1])
+    ]
+    for thread in threads:
+        thread.start()
+    results = []
+    try:
+        for item in get_items(queues[-1]) if queues else items:
+            if isinstance(item, _PipelineError):
+                raise item.error
+            results.append(stages[-1](item))
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+    return results
+
+
+class _PipelineError(object):
+    """Exception raised by a pipeline stage, passed to following stages."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+# marks the end of items in a pipeline queue
+_PIPELINE_DONE = object()
+
+
+def get_update_windows(
+    starttime: UTCDateTime, endtime: UTCDateTime, count: int
+) -> List[Tuple[UTCDateTime, UTCDateTime]]:
+    """Get windows checked by run_as_update.
+
+    Parameters
+    ----------
+    starttime: start of newest window
+    endtime: end of newest window
+    count: number of windows
+
+    Returns
+    -------
+    list of (starttime, endtime), newest first.
+    Each earlier window has the same length as the newest,
+    and ends one second before the start of the next window.
+    """
+    length = endtime - starttime
+    windows = [(starttime, endtime)]
+    for i in range(1, count):
+        window_end = windows[-1][0] - 1
+        windows.append((window_end - length + 1, window_end))
+    return windows
 
 
 def get_input_factory(args):
@@ -509,40 +1746,42 @@ def get_input_factory(args):
             input_stream = BytesIO(Util.read_url(args.input_url))
     input_type = args.input
     if input_type == "edge":
-        input_factory = edge.EdgeFactory(
+        input_factory = factories["edge"](
             host=args.input_host,
             port=args.input_port,
             locationCode=args.locationcode,
-            **input_factory_args
+            max_concurrent_reads=args.input_concurrent_reads,
+            **input_factory_args,
         )
     elif input_type == "miniseed":
-        input_factory = edge.MiniSeedFactory(
+        input_factory = factories["miniseed"](
             host=args.input_host,
             port=args.input_port,
             locationCode=args.locationcode,
             convert_channels=args.convert_voltbin,
-            **input_factory_args
+            max_concurrent_reads=args.input_concurrent_reads,
+            **input_factory_args,
         )
     elif input_type == "goes":
         # TODO: deal with other goes arguments
-        input_factory = imfv283.GOESIMFV283Factory(
+        input_factory = factories["goes"](
             directory=args.input_goes_directory,
             getdcpmessages=args.input_goes_getdcpmessages,
             password=args.input_goes_password,
             server=args.input_goes_server,
             user=args.input_goes_user,
-            **input_factory_args
+            **input_factory_args,
         )
     else:
         # stream compatible factories
         if input_type == "iaga2002":
-            input_factory = iaga2002.IAGA2002Factory(**input_factory_args)
+            input_factory = factories["iaga2002"](**input_factory_args)
         elif input_type == "imfv122":
-            input_factory = imfv122.IMFV122Factory(**input_factory_args)
+            input_factory = factories["imfv122"](**input_factory_args)
         elif input_type == "imfv283":
-            input_factory = imfv283.IMFV283Factory(**input_factory_args)
+            input_factory = factories["imfv283"](**input_factory_args)
         elif input_type == "pcdcp":
-            input_factory = pcdcp.PCDCPFactory(**input_factory_args)
+            input_factory = factories["pcdcp"](**input_factory_args)
         # wrap stream
         if input_stream is not None:
             input_factory = StreamTimeseriesFactory(
@@ -593,41 +1832,41 @@ def get_output_factory(args):
     if output_type == "edge":
         # TODO: deal with other edge arguments
         locationcode = args.outlocationcode or args.locationcode or None
-        output_factory = edge.EdgeFactory(
+        output_factory = factories["edge"](
             host=args.output_host,
             port=args.output_read_port,
             write_port=args.output_port,
             locationCode=locationcode,
             tag=args.output_edge_tag,
             forceout=args.output_edge_forceout,
-            **output_factory_args
+            **output_factory_args,
         )
     elif output_type == "miniseed":
         # TODO: deal with other miniseed arguments
         locationcode = args.outlocationcode or args.locationcode or None
-        output_factory = edge.MiniSeedFactory(
+        output_factory = factories["miniseed"](
             host=args.output_host,
             port=args.output_read_port,
             write_port=args.output_port,
             locationCode=locationcode,
-            **output_factory_args
+            **output_factory_args,
         )
     elif output_type == "plot":
         output_factory = PlotTimeseriesFactory()
     else:
         # stream compatible factories
         if output_type == "binlog":
-            output_factory = binlog.BinLogFactory(**output_factory_args)
+            output_factory = factories["binlog"](**output_factory_args)
         elif output_type == "iaga2002":
-            output_factory = iaga2002.IAGA2002Factory(**output_factory_args)
+            output_factory = factories["iaga2002"](**output_factory_args)
         elif output_type == "imfjson":
-            output_factory = imfjson.IMFJSONFactory(**output_factory_args)
+            output_factory = factories["imfjson"](**output_factory_args)
         elif output_type == "pcdcp":
-            output_factory = pcdcp.PCDCPFactory(**output_factory_args)
+            output_factory = factories["pcdcp"](**output_factory_args)
         elif output_type == "temperature":
-            output_factory = temperature.TEMPFactory(**output_factory_args)
+            output_factory = factories["temperature"](**output_factory_args)
         elif output_type == "vbf":
-            output_factory = vbf.VBFFactory(**output_factory_args)
+            output_factory = factories["vbf"](**output_factory_args)
         # wrap stream
         if output_stream is not None:
             output_factory = StreamTimeseriesFactory(
@@ -636,6 +1875,13 @@ def get_output_factory(args):
     return output_factory
 
 
+def _location_code(code: str) -> str:
+    """Validate location code arguments, importing edge only when used."""
+    from .edge.LocationCode import LocationCode
+
+    return LocationCode(code)
+
+
 def get_realtime_interval(interval_seconds: int) -> Tuple[UTCDateTime, UTCDateTime]:
     # calculate endtime/starttime
     now = UTCDateTime()
@@ -678,6 +1924,19 @@ def main(args: Optional[List[str]] = None):
     if args.output_stdout and args.update:
         raise Exception("Cannot combine" + " --output-stdout and --update")
 
+    if args.output_stdout and args.jobs > 1:
+        raise Exception("Cannot combine" + " --output-stdout and --jobs")
+
+    if args.targets and (args.daemon or args.plan):
+        raise Exception("Cannot combine" + " --targets and --daemon or --plan")
+
+    if args.daemon and args.observatory_foreach:
+        raise Exception("Cannot combine" + " --daemon and --observatory-foreach")
+
+    # realtime interval is used for first daemon run
+    if args.daemon and not args.realtime:
+        args.realtime = True
+
     # translate realtime into start/end times
     if args.realtime:
         if args.realtime is True:
@@ -694,20 +1953,8 @@ def main(args: Optional[List[str]] = None):
         args.starttime, args.endtime = get_realtime_interval(args.realtime)
 
     if args.observatory_foreach:
-        observatory = args.observatory
-        observatory_exception = None
-        for obs in observatory:
-            args.observatory = (obs,)
-            args.output_observatory = (obs,)
-            try:
-                _main(args)
-            except Exception as e:
-                print(
-                    "Exception processing observatory {}".format(obs),
-                    str(e),
-                    file=sys.stderr,
-                )
-        if observatory_exception:
+        errors = _main_foreach(args)
+        if errors:
             print("Exceptions occurred during processing", file=sys.stderr)
             sys.exit(1)
 
@@ -715,6 +1962,239 @@ def main(args: Optional[List[str]] = None):
         _main(args)
 
 
+def _main_foreach(args) -> List[str]:
+    """Run _main for each observatory, in a process pool when args.jobs > 1.
+
+    Each line written to stderr is prefixed with the observatory.
+    Worker processes return their stderr output, which is written
+    in observatory order instead of interleaved.
+    Exceptions are reported, in observatory order,
+    without stopping processing of other observatories.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        command line arguments
+
+    Returns
+    -------
+    list of observatories where exceptions occurred.
+    """
+    observatories = args.observatory
+    if args.jobs > 1:
+        executor = ProcessPoolExecutor(max_workers=args.jobs)
+        futures = [
+            executor.submit(_main_observatory, args, obs, capture=True)
+            for obs in observatories
+        ]
+    else:
+        executor = None
+        futures = None
+    errors = []
+    try:
+        for i, obs in enumerate(observatories):
+            if futures:
+                try:
+                    error, output = futures[i].result()
+                except Exception as e:
+                    # worker process failed
+                    error, output = str(e) or repr(e), ""
+                sys.stderr.write(output)
+            else:
+                error, output = _main_observatory(args, obs)
+            if error is not None:
+                print(
+                    "Exception processing observatory {}".format(obs),
+                    error,
+                    file=sys.stderr,
+                )
+                errors.append(obs)
+    finally:
+        if executor:
+            executor.shutdown()
+    return errors
+
+
+def _main_observatory(
+    args, observatory: str, capture: bool = False
+) -> Tuple[Optional[str], str]:
+    """Run _main for one observatory.
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        command line arguments, not modified
+    observatory : str
+        observatory to process
+    capture : bool
+        whether to return stderr output instead of writing it.
+
+    Returns
+    -------
+    exception message if an exception occurred, otherwise None,
+    and stderr output when capture is True, otherwise "".
+    Lines written to stderr are prefixed with the observatory.
+    """
+    args = copy.copy(args)
+    args.observatory = (observatory,)
+    args.output_observatory = (observatory,)
+    stderr = StringIO() if capture else sys.stderr
+    error = None
+    with redirect_stderr(_PrefixWriter(stderr, f"{observatory}: ")):
+        try:
+            _main(args)
+        except Exception as e:
+            error = str(e) or repr(e)
+    return error, stderr.getvalue() if capture else ""
+
+
+class _PrefixWriter(object):
+    """Text file that writes a prefix at the start of each line.
+
+    Parameters
+    ----------
+    out: file where prefixed text is written
+    prefix: written before each line
+    """
+
+    def __init__(self, out, prefix: str):
+        self.out = out
+        self.prefix = prefix
+        self._line_start = True
+
+    def flush(self):
+        self.out.flush()
+
+    def write(self, text: str) -> int:
+        for line in text.splitlines(keepends=True):
+            if self._line_start:
+                self.out.write(self.prefix)
+            self.out.write(line)
+            self._line_start = line.endswith("\n")
+        return len(text)
+
+
+def get_targets(args) -> List[ControllerTarget]:
+    """Parse targets file.
+
+    The file contains a JSON list with one object for each target.
+    Object keys are command line option names, without leading dashes,
+    and values replace the command line value for that target.
+    Values are converted and checked like command line values,
+    flags use true or false, and options with several values use lists,
+    for example::
+
+        [
+            {"algorithm": "xyz", "outchannels": ["X", "Y", "Z", "F"]},
+            {"algorithm": "dbdt", "output-port": 7981}
+        ]
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        arguments
+
+    Returns
+    -------
+    list of ControllerTarget, with algorithm and output factory
+    configured from arguments.
+
+    Raises
+    ------
+    ValueError
+        if an option is unknown, or a value is not valid for the option.
+    """
+    with open(args.targets, "r") as f:
+        configs = json.load(f)
+    actions = {
+        option: action
+        for action in get_parser()._actions
+        for option in action.option_strings
+    }
+    targets = []
+    for config in configs:
+        target_args = copy.copy(args)
+        for key, value in config.items():
+            option = "--" + key.lstrip("-")
+            if option not in actions or option in ("--help", "--targets"):
+                raise ValueError(f"Unknown target option {key}")
+            action = actions[option]
+            setattr(target_args, action.dest, _get_target_value(action, key, value))
+        algorithm = algorithms[target_args.algorithm]()
+        algorithm.configure(target_args)
+        targets.append(
+            ControllerTarget(
+                algorithm=algorithm,
+                output_factory=get_output_factory(target_args),
+                input_channels=target_args.inchannels,
+                output_channels=target_args.outchannels,
+                output_interval=target_args.output_interval or target_args.interval,
+                rename_output_channel=target_args.rename_output_channel,
+                name=target_args.algorithm,
+            )
+        )
+    return targets
+
+
+def _get_target_value(action: argparse.Action, key: str, value):
+    """Convert a targets file value, like argparse converts command line values.
+
+    Parameters
+    ----------
+    action : argparse.Action
+        parser action for the option
+    key : str
+        option name in targets file, used in error messages
+    value
+        value from targets file
+
+    Returns
+    -------
+    value to set in arguments.
+
+    Raises
+    ------
+    ValueError
+        if value is not valid for the option.
+    """
+    if action.nargs == 0:
+        # flags
+        if not isinstance(value, bool):
+            raise ValueError(f"Target option {key} must be true or false")
+        return action.const if value else action.default
+    if action.nargs == "?" and value is None:
+        return action.const
+    if isinstance(action, argparse._AppendAction):
+        if not isinstance(value, list):
+            raise ValueError(f"Target option {key} must be a list")
+        return [_convert_target_values(action, key, item) for item in value]
+    return _convert_target_values(action, key, value)
+
+
+def _convert_target_values(action: argparse.Action, key: str, value):
+    """Apply action type and choices to one occurrence of an option."""
+    several = action.nargs in ("*", "+") or isinstance(action.nargs, int)
+    if several != isinstance(value, list):
+        kind = "a list" if several else "a single value"
+        raise ValueError(f"Target option {key} must be {kind}")
+    converted = []
+    for item in value if several else [value]:
+        try:
+            item = action.type(str(item)) if action.type else str(item)
+        except (TypeError, ValueError, argparse.ArgumentTypeError) as e:
+            raise ValueError(f"Invalid value for target option {key}: {e}")
+        if action.choices is not None and item not in action.choices:
+            choices = ", ".join(map(repr, action.choices))
+            raise ValueError(
+                f"Invalid value for target option {key}: {item!r}"
+                + f" (choose from {choices})"
+            )
+        converted.append(item)
+    if isinstance(action.nargs, int) and len(converted) != action.nargs:
+        raise ValueError(f"Target option {key} must have {action.nargs} values")
+    return converted if several else converted[0]
+
+
 def _main(args):
     """Actual main method logic, called by main
 
@@ -730,9 +2210,34 @@ def _main(args):
     output_factory = get_output_factory(args)
     algorithm = algorithms[args.algorithm]()
     algorithm.configure(args)
-    controller = Controller(input_factory, output_factory, algorithm)
-
-    if args.update:
+    controller = Controller(
+        input_factory,
+        output_factory,
+        algorithm,
+        fetchWorkers=args.fetch_workers,
+        pipelineDepth=args.pipeline_depth,
+    )
+
+    if args.targets:
+        controller.run_targets(
+            targets=get_targets(args),
+            observatory=args.observatory,
+            output_observatory=args.output_observatory,
+            starttime=args.starttime,
+            endtime=args.endtime,
+            input_interval=args.input_interval or args.interval,
+            no_trim=args.no_trim,
+            realtime=args.realtime,
+            rename_input_channel=args.rename_input_channel,
+            update=args.update,
+            update_limit=args.update_limit,
+            workers=args.target_workers,
+        )
+    elif args.plan:
+        controller._plan(args)
+    elif args.daemon:
+        controller._run_daemon(args)
+    elif args.update:
         controller._run_as_update(args)
     else:
         controller._run(args)
@@ -750,6 +2255,23 @@ def parse_args(args):
     argparse.Namespace
         dictionary like object containing arguments.
     """
+    return get_parser(args).parse_args(args)
+
+
+def get_parser(args: Optional[List[str]] = None) -> argparse.ArgumentParser:
+    """Create command line argument parser.
+
+    Parameters
+    ----------
+    args : list of strings
+        deprecated arguments are added when args
+        include "--enable-deprecated-arguments".
+
+    Returns
+    -------
+    argparse.ArgumentParser
+    """
+    args = args or []
     parser = argparse.ArgumentParser(
         description="""
             Read, optionally process, and Write Geomag Timeseries data.
@@ -768,6 +2290,13 @@ def parse_args(args):
         help='Input format (Default "edge")',
     )
 
+    input_group.add_argument(
+        "--input-concurrent-reads",
+        default=1,
+        help="Channels read at once from edge or miniseed input (Default 1)",
+        metavar="N",
+        type=int,
+    )
     input_group.add_argument(
         "--input-derived",
         action="store_true",
@@ -835,7 +2364,7 @@ def parse_args(args):
                 instead of "--type"
                 """,
         metavar="CODE",
-        type=edge.LocationCode,
+        type=_location_code,
     )
     input_group.add_argument(
         "--observatory",
@@ -858,6 +2387,22 @@ def parse_args(args):
         help="When specifying multiple observatories, process"
         " each observatory separately",
     )
+    input_group.add_argument(
+        "--jobs",
+        default=1,
+        help="With --observatory-foreach, number of observatories"
+        " to process at once in separate processes (Default 1)",
+        metavar="N",
+        type=int,
+    )
+    input_group.add_argument(
+        "--fetch-workers",
+        default=1,
+        help="When specifying multiple observatories, number of observatories"
+        " to read at once in separate threads (Default 1)",
+        metavar="N",
+        type=int,
+    )
     input_group.add_argument(
         "--rename-input-channel",
         action="append",
@@ -1024,7 +2569,7 @@ def parse_args(args):
         "--outlocationcode",
         help="Defaults to --locationcode",
         metavar="CODE",
-        type=edge.LocationCode,
+        type=_location_code,
     )
     output_group.add_argument(
         "--output-edge-forceout",
@@ -1069,6 +2614,82 @@ def parse_args(args):
                 """,
         metavar="N",
     )
+    processing_group.add_argument(
+        "--chunk-size",
+        type=int,
+        default=0,
+        help="""
+                Read, process, and write data in chunks of N seconds,
+                aligned to N, so memory use depends on N instead of
+                the time range. Not used in update mode (Default 0, no chunks).
+                """,
+        metavar="N",
+    )
+    processing_group.add_argument(
+        "--pipeline-depth",
+        type=int,
+        default=0,
+        help="""
+                Update mode reads and processes up to N gaps,
+                and chunk mode up to N chunks of stateless algorithms,
+                while earlier ones are written, in separate threads.
+                One at a time when 0 (Default 0).
+                """,
+        metavar="N",
+    )
+    processing_group.add_argument(
+        "--targets",
+        default=None,
+        help="""
+                JSON file with a list of targets, to run several algorithms
+                and outputs while reading input once. Each target is an
+                object with command line option names, without leading
+                dashes, and values that replace the command line value,
+                for example [{"algorithm": "xyz"}, {"algorithm": "dbdt"}].
+                """,
+        metavar="FILE",
+    )
+    processing_group.add_argument(
+        "--target-workers",
+        type=int,
+        default=1,
+        help="Number of targets to run at once, in separate threads (Default 1)",
+        metavar="N",
+    )
+    processing_group.add_argument(
+        "--daemon",
+        action="store_true",
+        default=False,
+        help="""
+                Keep running, and process new data every --daemon-cadence
+                seconds, until interrupted. The first run processes
+                the --realtime interval, later runs only new samples,
+                or the --realtime interval in update mode.
+                """,
+    )
+    processing_group.add_argument(
+        "--daemon-cadence",
+        type=int,
+        default=60,
+        help="Seconds between daemon runs (Default 60)",
+        metavar="N",
+    )
+    processing_group.add_argument(
+        "--daemon-save-interval",
+        type=int,
+        default=3600,
+        help="Seconds between saving algorithm state in daemon mode (Default 3600)",
+        metavar="N",
+    )
+    processing_group.add_argument(
+        "--plan",
+        action="store_true",
+        default=False,
+        help="""
+                Print planned reads, writes, and sample counts,
+                without reading or writing data.
+                """,
+    )
     processing_group.add_argument(
         "--no-trim",
         action="store_true",
@@ -1136,7 +2757,7 @@ def parse_args(args):
         help="(Deprecated, Unused) Conversion factor (nT/bin) for bins",
     )
 
-    return parser.parse_args(args)
+    return parser
 
 
 def add_deprecated_args(parser, input_group, output_group):
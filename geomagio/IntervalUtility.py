@@ -0,0 +1,188 @@
+"""Interval Utilities
+
+Gaps are stored as int64 numpy arrays with shape (number of gaps, 3),
+where each row is [start of gap, end of gap, next sample],
+in nanoseconds since the epoch.
+"""
+import numpy
+from obspy.core import UTCDateTime
+
+
+def create_intervals(starts=(), ends=(), nexts=()):
+    """Create an intervals array.
+
+    Parameters
+    ----------
+    starts: array_like
+        nanosecond times of first missing sample in each gap
+    ends: array_like
+        nanosecond times of last missing sample in each gap
+    nexts: array_like
+        nanosecond times of next sample after each gap
+
+    Returns
+    -------
+    numpy.ndarray
+        int64 array with shape (number of gaps, 3).
+    """
+    intervals = numpy.empty((len(starts), 3), dtype=numpy.int64)
+    intervals[:, 0] = starts
+    intervals[:, 1] = ends
+    intervals[:, 2] = nexts
+    return intervals
+
+
+def from_gaps(gaps):
+    """Convert a list of gaps to an intervals array.
+
+    Parameters
+    ----------
+    gaps: array_like
+        list of [start of gap, end of gap, next sample] UTCDateTime values.
+
+    Returns
+    -------
+    numpy.ndarray
+        intervals array.
+    """
+    return create_intervals(
+        starts=[gap[0].ns for gap in gaps],
+        ends=[gap[1].ns for gap in gaps],
+        nexts=[gap[2].ns for gap in gaps],
+    )
+
+
+def to_gaps(intervals):
+    """Convert an intervals array to a list of gaps.
+
+    Parameters
+    ----------
+    intervals: numpy.ndarray
+        intervals array.
+
+    Returns
+    -------
+    array_like
+        list of [start of gap, end of gap, next sample] UTCDateTime values.
+    """
+    return [[UTCDateTime(ns=int(time)) for time in row] for row in intervals.tolist()]
+
+
+def union(*intervals):
+    """Merge intervals that overlap or touch.
+
+    Parameters
+    ----------
+    *intervals: numpy.ndarray
+        zero or more intervals arrays.
+
+    Returns
+    -------
+    numpy.ndarray
+        sorted intervals array, where no interval starts at or before
+        the next sample of the previous interval.
+    """
+    if len(intervals) == 0:
+        return create_intervals()
+    merged = numpy.concatenate(intervals)
+    if len(merged) == 0:
+        return merged
+    merged = merged[numpy.argsort(merged[:, 0], kind="stable")]
+    # an interval starts a new group when it starts after the next sample
+    # of every earlier interval
+    max_next = numpy.maximum.accumulate(merged[:, 2])
+    group_starts = numpy.flatnonzero(
+        numpy.concatenate(([True], merged[1:, 0] > max_next[:-1]))
+    )
+    return create_intervals(
+        starts=merged[group_starts, 0],
+        ends=numpy.maximum.reduceat(merged[:, 1], group_starts),
+        nexts=numpy.maximum.reduceat(merged[:, 2], group_starts),
+    )
+
+
+def intersection(*intervals):
+    """Find times that are inside an interval in every intervals array.
+
+    Parameters
+    ----------
+    *intervals: numpy.ndarray
+        one or more intervals arrays.
+
+    Returns
+    -------
+    numpy.ndarray
+        sorted intervals array.
+    """
+    result = union(intervals[0])
+    for other in intervals[1:]:
+        other = union(other)
+        # range of intervals in other that overlap each interval in result
+        first = numpy.searchsorted(other[:, 1], result[:, 0], side="left")
+        last = numpy.searchsorted(other[:, 0], result[:, 1], side="right")
+        counts = numpy.maximum(last - first, 0)
+        a = numpy.repeat(numpy.arange(len(result)), counts)
+        # index into other for each pair
+        offsets = numpy.arange(counts.sum()) - numpy.repeat(
+            numpy.cumsum(counts) - counts, counts
+        )
+        b = numpy.repeat(first, counts) + offsets
+        result = create_intervals(
+            starts=numpy.maximum(result[a, 0], other[b, 0]),
+            ends=numpy.minimum(result[a, 1], other[b, 1]),
+            nexts=numpy.minimum(result[a, 2], other[b, 2]),
+        )
+    return result
+
+
+def get_coverage(intervals, starttime, endtime):
+    """Get length of time in a range that is inside intervals.
+
+    Parameters
+    ----------
+    intervals: numpy.ndarray
+        intervals array.
+    starttime: UTCDateTime
+        start of range.
+    endtime: UTCDateTime
+        end of range.
+
+    Returns
+    -------
+    int
+        number of nanoseconds in [starttime, endtime) that are inside
+        [start of gap, next sample) for any interval.
+    """
+    merged = union(intervals)
+    overlap = numpy.minimum(merged[:, 2], endtime.ns) - numpy.maximum(
+        merged[:, 0], starttime.ns
+    )
+    return int(numpy.maximum(overlap, 0).sum())
+
+
+def is_covered(intervals, starttime, endtime):
+    """Check whether a single interval spans a range.
+
+    Parameters
+    ----------
+    intervals: numpy.ndarray
+        intervals array.
+    starttime: UTCDateTime
+        start of range.
+    endtime: UTCDateTime
+        end of range.
+
+    Returns
+    -------
+    bool
+        True if starttime is inside an interval,
+        and endtime is before the next sample of that interval.
+    """
+    start = starttime.ns
+    return bool(
+        numpy.any(
+            (start >= intervals[:, 0])
+            & (start <= intervals[:, 1])
+            & (endtime.ns < intervals[:, 2])
+        )
+    )
@@ -0,0 +1,41 @@
+"""Registry of classes that are imported when first used."""
+
+from collections.abc import Mapping
+import importlib
+from typing import Any, Dict, Iterator
+
+
+class LazyRegistry(Mapping):
+    """Map names to classes, importing each module when its name is used.
+
+    Importing every factory package makes short command line runs
+    spend most of their time importing modules they never use.
+
+    Parameters
+    ----------
+    paths: map of name to "module:attribute" path
+
+    Example
+    -------
+    >>> registry = LazyRegistry({"pcdcp": "geomagio.pcdcp:PCDCPFactory"})
+    >>> "pcdcp" in registry
+    True
+    >>> registry["pcdcp"].__name__
+    'PCDCPFactory'
+    """
+
+    def __init__(self, paths: Dict[str, str]):
+        self.paths = dict(paths)
+        self._loaded: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._loaded:
+            module, attribute = self.paths[name].split(":")
+            self._loaded[name] = getattr(importlib.import_module(module), attribute)
+        return self._loaded[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
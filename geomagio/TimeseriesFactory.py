@@ -63,6 +63,14 @@ class TimeseriesFactory(object):
         self.urlTemplate = urlTemplate
         self.urlInterval = urlInterval
 
+    def flush(self):
+        """Wait until data from put_timeseries is written.
+
+        Factories that write in the background override this,
+        other factories have written data when put_timeseries returns.
+        """
+        pass
+
     def get_timeseries(
         self,
         starttime: UTCDateTime,
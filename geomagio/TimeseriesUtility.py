@@ -6,6 +6,7 @@ import sys
 import numpy
 from obspy.core import Stats, Stream, Trace, UTCDateTime
 
+from . import IntervalUtility
 from .Util import get_intervals
 
 
@@ -79,11 +80,13 @@ def encode_stream(stream: Stream, encoding: str) -> Stream:
     """
     out_stream = Stream()
     for trace in stream:
-        trace_out = trace.copy()
-        if trace_out.data.dtype != encoding:
-            trace_out.data = trace_out.data.astype(encoding)
-            if "mseed" in trace_out.stats:
-                trace_out.stats.mseed.encoding = encoding.upper()
+        if trace.data.dtype == encoding:
+            out_stream += trace.copy()
+            continue
+        # astype already copies, avoid copying data twice
+        trace_out = Trace(trace.data.astype(encoding), trace.stats.copy())
+        if "mseed" in trace_out.stats:
+            trace_out.stats.mseed.encoding = encoding.upper()
         out_stream += trace_out
     return out_stream
 
@@ -144,6 +147,41 @@ def get_interval_from_delta(delta):
     return data_interval
 
 
+def get_sample_times(starttime, delta, start, end):
+    """Get times of samples as datetime64 values.
+
+    Times match ``datetime.utcfromtimestamp(starttime + i * delta)``,
+    truncated to milliseconds, which is how writers format sample times.
+
+    Parameters
+    ----------
+    starttime: UTCDateTime
+        time of first sample
+    delta: float
+        seconds between samples
+    start: int
+        index of first sample
+    end: int
+        index after last sample
+
+    Returns
+    -------
+    numpy.ndarray
+        datetime64[ms] array of sample times for indices [start, end).
+    """
+    timestamps = float(starttime) + numpy.arange(start, end) * delta
+    fraction, seconds = numpy.modf(timestamps)
+    # utcfromtimestamp rounds to the nearest microsecond
+    microseconds = numpy.round(fraction * 1e6).astype(numpy.int64)
+    seconds = seconds.astype(numpy.int64)
+    # carry rounded or negative microseconds into seconds
+    seconds += numpy.floor_divide(microseconds, 1000000)
+    microseconds = numpy.mod(microseconds, 1000000)
+    return seconds.astype("datetime64[s]").astype("datetime64[ms]") + (
+        microseconds // 1000
+    )
+
+
 def get_stream_start_end_times(timeseries, without_gaps=False):
     """get start and end times from a stream.
             Traverses all traces, and find the earliest starttime, and
@@ -209,6 +247,54 @@ def get_stream_gaps(stream, channels=None):
     return gaps
 
 
+def get_stream_gap_intervals(stream, channels=None):
+    """Get gaps in a given stream as intervals arrays.
+
+    Parameters
+    ----------
+    stream: Stream
+        the stream to check for gaps
+    channels: array_like
+        list of channels to check for gaps
+        Default is None (check all channels).
+
+    Returns
+    -------
+    dictionary of channel intervals arrays,
+        see IntervalUtility for the array format.
+    """
+    gaps = {}
+    for trace in stream:
+        channel = trace.stats.channel
+        if channels is not None and channel not in channels:
+            continue
+        gaps[channel] = get_trace_gap_intervals(trace)
+    return gaps
+
+
+def get_trace_gap_intervals(trace):
+    """Gets gaps in a trace as an intervals array.
+
+    Parameters
+    ----------
+    trace: Trace
+        a stream containing a single channel of data.
+
+    Returns
+    -------
+    numpy.ndarray
+        intervals array, see IntervalUtility for the format.
+    """
+    indices = get_trace_gap_indices(trace)
+    starttime = trace.stats.starttime.ns
+    delta = int(round(trace.stats.delta * 1e9))
+    return IntervalUtility.create_intervals(
+        starts=starttime + indices[:, 0] * delta,
+        ends=starttime + indices[:, 1] * delta,
+        nexts=starttime + (indices[:, 1] + 1) * delta,
+    )
+
+
 def get_trace_gaps(trace):
     """Gets gaps in a trace representing a single channel
     Parameters
@@ -221,29 +307,47 @@ def get_trace_gaps(trace):
     array of gaps, which is empty when there are no gaps.
     each gap is an array [start of gap, end of gap, next sample]
     """
-    gaps = []
-    gap = None
-    data = trace.data
     stats = trace.stats
     starttime = stats.starttime
-    length = len(data)
     delta = stats.delta
-    for i in range(0, length):
-        if numpy.isnan(data[i]):
-            if gap is None:
-                # start of a gap
-                gap = [starttime + i * delta]
-        else:
-            if gap is not None:
-                # end of a gap
-                gap.extend([starttime + (i - 1) * delta, starttime + i * delta])
-                gaps.append(gap)
-                gap = None
-    # check for gap at end
-    if gap is not None:
-        gap.extend([starttime + (length - 1) * delta, starttime + length * delta])
-        gaps.append(gap)
-    return gaps
+    return [
+        [
+            starttime + start * delta,
+            starttime + end * delta,
+            starttime + (end + 1) * delta,
+        ]
+        for start, end in get_trace_gap_indices(trace).tolist()
+    ]
+
+
+def get_trace_gap_indices(trace):
+    """Gets gaps in a trace as sample indices.
+
+    Parameters
+    ----------
+    trace: Trace
+        a stream containing a single channel of data.
+
+    Returns
+    -------
+    numpy.ndarray
+        int64 array with shape (number of gaps, 2).
+        each row is [index of first missing sample, index of last missing sample].
+
+    Notes
+    -----
+    Gap boundaries are found using transitions in the isnan mask of the data,
+    so no per sample python objects are created.
+    Masked samples are not considered gaps.
+    """
+    missing = numpy.ma.filled(numpy.isnan(trace.data), False)
+    if not missing.any():
+        return numpy.empty((0, 2), dtype=numpy.int64)
+    # +1 where a gap starts, -1 after a gap ends
+    transitions = numpy.diff(missing.astype(numpy.int8), prepend=0, append=0)
+    starts = numpy.flatnonzero(transitions == 1)
+    ends = numpy.flatnonzero(transitions == -1) - 1
+    return numpy.column_stack((starts, ends)).astype(numpy.int64)
 
 
 def get_merged_gaps(gaps):
@@ -263,31 +367,11 @@ def get_merged_gaps(gaps):
     Takes an dictionary of gaps, and merges those gaps across channels,
         returning an array of the merged gaps.
     """
-    merged_gaps = []
-    for key in gaps:
-        merged_gaps.extend(gaps[key])
-    # sort gaps so earlier gaps are before later gaps
-    sorted_gaps = sorted(merged_gaps, key=lambda gap: gap[0])
-    # merge gaps that overlap
-    merged_gaps = []
-    merged_gap = None
-    for gap in sorted_gaps:
-        if merged_gap is None:
-            # start of gap
-            merged_gap = gap
-        elif gap[0] > merged_gap[2]:
-            # next gap starts after current gap ends
-            merged_gaps.append(merged_gap)
-            merged_gap = gap
-        elif gap[0] <= merged_gap[2]:
-            # next gap starts at or before next data
-            if gap[1] > merged_gap[1]:
-                # next gap ends after current gap ends, extend current
-                merged_gap[1] = gap[1]
-                merged_gap[2] = gap[2]
-    if merged_gap is not None:
-        merged_gaps.append(merged_gap)
-    return merged_gaps
+    return IntervalUtility.to_gaps(
+        IntervalUtility.union(
+            *[IntervalUtility.from_gaps(gaps[key]) for key in gaps],
+        )
+    )
 
 
 def get_channels(stream):
@@ -322,18 +406,49 @@ def get_trace_value(traces, time, default=None):
     nearest time in trace
     value from trace at nearest time, or None
     """
-    # array of UTCDateTime values corresponding
+    value = get_trace_values(traces, [time])[0]
+    if numpy.isnan(value):
+        return default
+    return value
+
+
+def get_trace_values(traces, times):
+    """Get values at many specific times.
+
+    Sample indices are computed from each trace starttime and delta,
+    instead of comparing against every sample time.
+
+    Parameters
+    ----------
+    traces : array_like
+        traces to search, in order.
+        the first trace with a sample at a time is used for that time.
+    times : array_like
+        list of UTCDateTime.
+
+    Returns
+    -------
+    numpy.ndarray
+        float64 array with one value for each time,
+        numpy.nan where no trace has a value at that time.
+    """
+    times = numpy.array([time.ns for time in times], dtype=numpy.int64)
+    values = numpy.full(len(times), numpy.nan, dtype=numpy.float64)
+    found = numpy.zeros(len(times), dtype=bool)
     for trace in traces:
-        times = trace.times("utcdatetime")
-        index = times.searchsorted(time)
-        trace_time = times[index]
-        trace_value = trace.data[index]
-        if trace_time == time:
-            if numpy.isnan(trace_value):
-                return default
-            else:
-                return trace_value
-    return default
+        delta = int(round(trace.stats.delta * 1e9))
+        offsets = times - trace.stats.starttime.ns
+        indices = numpy.round(offsets / delta).astype(numpy.int64)
+        # UTCDateTime comparisons use microsecond precision
+        matches = (
+            ~found
+            & (indices >= 0)
+            & (indices < len(trace.data))
+            & (numpy.abs(offsets - indices * delta) < 500)
+        )
+        values[matches] = trace.data[indices[matches]]
+        found |= matches
+    return values
 
 
 def has_all_channels(stream, channels, starttime, endtime):
@@ -354,16 +469,11 @@ def has_all_channels(stream, channels, starttime, endtime):
     -------
     bool: True if data found across all channels between starttime/endtime
     """
-    input_gaps = get_merged_gaps(get_stream_gaps(stream=stream, channels=channels))
-    for input_gap in input_gaps:
-        # Check for gaps that include the entire range
-        if (
-            starttime >= input_gap[0]
-            and starttime <= input_gap[1]
-            and endtime < input_gap[2]
-        ):
-            return False
-    return True
+    input_gaps = IntervalUtility.union(
+        *get_stream_gap_intervals(stream=stream, channels=channels).values()
+    )
+    # check for gaps that include the entire range
+    return not IntervalUtility.is_covered(input_gaps, starttime, endtime)
 
 
 def has_any_channels(stream, channels, starttime, endtime):
@@ -384,21 +494,13 @@ def has_any_channels(stream, channels, starttime, endtime):
     -------
     bool: True if any data found between starttime/endtime
     """
-    # process if any channels have data not covering the time range
-    input_gaps = get_stream_gaps(stream=stream, channels=channels)
-    for channel in channels:
-        if channel not in input_gaps:
-            continue
-        channel_gaps = input_gaps[channel]
-        if len(channel_gaps) == 0:
-            # no gaps in channel
-            return True
-        for gap in channel_gaps:
-            if not (starttime >= gap[0] and starttime <= gap[1] and endtime < gap[2]):
-                # gap doesn't span channel
-                return True
-    # didn't find any data
-    return False
+    input_gaps = get_stream_gap_intervals(stream=stream, channels=channels)
+    if len(input_gaps) == 0:
+        # none of the channels are in stream
+        return False
+    # times where every channel is missing data
+    missing = IntervalUtility.intersection(*input_gaps.values())
+    return not IntervalUtility.is_covered(missing, starttime, endtime)
 
 
 def mask_stream(stream):
@@ -457,6 +559,12 @@ def merge_streams(*streams):
     -------
     Stream
         stream with contiguous traces merged, and gaps filled with numpy.nan
+
+    Notes
+    -----
+    Traces with the same id, delta and sample alignment are merged directly
+    into one array covering all traces, see _merge_aligned_traces.
+    Other traces are merged using obspy, see _merge_traces.
     """
     merged = Stream()
 
@@ -464,6 +572,109 @@ def merge_streams(*streams):
     for stream in streams:
         merged += stream
 
+    # group traces by id, in order of first appearance
+    traces_by_id = {}
+    for trace in merged:
+        traces_by_id.setdefault(trace.id, []).append(trace)
+
+    merged = Stream()
+    for traces in traces_by_id.values():
+        trace = _merge_aligned_traces(traces)
+        if trace is not None:
+            merged += trace
+        else:
+            merged += _merge_traces(Stream(traces))
+    return merged
+
+
+def _merge_aligned_traces(traces):
+    """Merge traces that have the same id, delta and sample alignment.
+
+    When traces overlap, data from the trace with the last endtime is used.
+    Missing (NaN) samples never replace data from another trace.
+
+    Parameters
+    ----------
+    traces : list of Trace
+        traces with the same id.
+
+    Returns
+    -------
+    Trace
+        one trace from the first to the last sample with data,
+        with gaps filled with numpy.nan,
+        or None if traces do not have the same delta and sample alignment,
+        or have no data.
+    """
+    first = min(traces, key=lambda trace: trace.stats.starttime)
+    delta = first.stats.delta
+    delta_ns = int(round(delta * 1e9))
+    starttime_ns = first.stats.starttime.ns
+    offsets = []
+    for trace in traces:
+        if (
+            trace.stats.delta != delta
+            or trace.stats.npts == 0
+            or isinstance(trace.data, numpy.ma.MaskedArray)
+            or trace.data.dtype != numpy.float64
+        ):
+            return None
+        offset, remainder = divmod(trace.stats.starttime.ns - starttime_ns, delta_ns)
+        if remainder != 0:
+            return None
+        offsets.append(offset)
+    npts = max(offset + len(trace.data) for offset, trace in zip(offsets, traces))
+    if len(traces) == 1:
+        data = first.data.copy()
+    else:
+        data = numpy.full(npts, numpy.nan, dtype=numpy.float64)
+        # contiguous runs of data in each trace, as output indices
+        segment_traces, segment_starts, segment_ends = [], [], []
+        for i, (trace, offset) in enumerate(zip(traces, offsets)):
+            gaps = get_trace_gap_indices(trace)
+            starts = numpy.concatenate(([0], gaps[:, 1] + 1))
+            ends = numpy.concatenate((gaps[:, 0] - 1, [len(trace.data) - 1]))
+            keep = starts <= ends
+            segment_traces.append(numpy.full(keep.sum(), i))
+            segment_starts.append(starts[keep] + offset)
+            segment_ends.append(ends[keep] + offset)
+        segment_traces = numpy.concatenate(segment_traces)
+        segment_starts = numpy.concatenate(segment_starts)
+        segment_ends = numpy.concatenate(segment_ends)
+        # copy segments so the last endtime is copied last,
+        # when endtimes match the earlier start (then earlier trace) is used
+        order = numpy.lexsort((-segment_traces, -segment_starts, segment_ends))
+        for i in order:
+            start, end = segment_starts[i], segment_ends[i] + 1
+            offset = offsets[segment_traces[i]]
+            data[start:end] = traces[segment_traces[i]].data[
+                start - offset : end - offset
+            ]
+    # trim missing samples at start and end, like obspy split and merge
+    valid = numpy.flatnonzero(~numpy.isnan(data))
+    if len(valid) == 0:
+        # obspy keeps traces without data, see _merge_traces
+        return None
+    stats = first.stats.copy()
+    stats.starttime = first.stats.starttime + valid[0] * delta
+    data = data[valid[0] : valid[-1] + 1]
+    stats.npts = len(data)
+    return Trace(data, stats)
+
+
+def _merge_traces(merged):
+    """Merge traces using obspy.
+
+    Parameters
+    ----------
+    merged : Stream
+        stream to merge
+
+    Returns
+    -------
+    Stream
+        stream with contiguous traces merged, and gaps filled with numpy.nan
+    """
     split = mask_stream(merged)
 
     # split traces that contain gaps
@@ -595,17 +806,18 @@ def round_usecs(time):
     return time
 
 
-def split_stream(stream: Stream, size: int = 86400) -> Stream:
+def split_stream(stream: Stream, size: int = 86400, copy: bool = True) -> Stream:
     out_stream = Stream()
     for trace in stream:
-        out_stream += split_trace(trace, size)
+        out_stream += split_trace(trace, size, copy)
     return out_stream
 
 
-def split_trace(trace: Trace, size: int = 86400) -> Stream:
-    # copy in case original trace changes later
+def split_trace(trace: Trace, size: int = 86400, copy: bool = True) -> Stream:
+    # copy in case original trace changes later,
+    # callers that own trace can skip the copy
     stream = Stream()
-    out_trace = trace.copy()
+    out_trace = trace.copy() if copy else trace
     for interval in get_intervals(
         starttime=out_trace.stats.starttime,
         endtime=out_trace.stats.endtime,
@@ -1,5 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import numpy
 import os
+import sys
+import threading
 from obspy.core import Stats, Trace
 from io import BytesIO
 
@@ -199,3 +203,83 @@ def create_empty_trace(trace, channel):
     count = len(trace.data)
     numpy_data = numpy.full((count), numpy.nan)
     return Trace(numpy_data, stats)
+
+
+def map_concurrent(func, items, max_workers=1):
+    """Call func for each item, using up to max_workers threads.
+
+    Parameters
+    ----------
+    func: callable
+        called with each item.
+    items: iterable
+        items to process.
+    max_workers: int
+        maximum number of calls running at once, calls are serial when 1.
+
+    Returns
+    -------
+    list
+        results, in item order.
+
+    Raises
+    ------
+    Exception
+        first exception, in item order, after all calls have completed.
+    """
+    items = list(items)
+    workers = min(max_workers, len(items))
+    if workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, item) for item in items]
+    return [future.result() for future in futures]
+
+
+class _StdoutRedirect(object):
+    """Replacement for sys.stdout, that writes to sys.stderr in threads
+    inside stdout_to_stderr().
+
+    Parameters
+    ----------
+    stdout: file
+        where other threads write, and restored when no thread redirects.
+    """
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.local = threading.local()
+        # number of threads inside stdout_to_stderr, use with _stdout_lock
+        self.active = 0
+
+    def __getattr__(self, name):
+        redirected = getattr(self.local, "depth", 0) > 0
+        return getattr(sys.stderr if redirected else self.stdout, name)
+
+
+_stdout_lock = threading.Lock()
+
+
+@contextmanager
+def stdout_to_stderr():
+    """Send stdout to stderr, only in the current thread.
+
+    Some obspy clients write to stdout, which is also used for output.
+    Unlike swapping sys.stdout, other threads still write to stdout,
+    and concurrent callers do not restore each other's stdout.
+    The original sys.stdout is restored when the last caller exits.
+    """
+    with _stdout_lock:
+        if not isinstance(sys.stdout, _StdoutRedirect):
+            sys.stdout = _StdoutRedirect(sys.stdout)
+        redirect = sys.stdout
+        redirect.active += 1
+    redirect.local.depth = getattr(redirect.local, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        redirect.local.depth -= 1
+        with _stdout_lock:
+            redirect.active -= 1
+            if redirect.active == 0 and sys.stdout is redirect:
+                sys.stdout = redirect.stdout
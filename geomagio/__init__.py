@@ -3,6 +3,7 @@ Geomag Algorithm Module
 """
 
 from . import ChannelConverter
+from . import IntervalUtility
 from . import StreamConverter
 from . import TimeseriesUtility
 from . import Util
@@ -19,6 +20,7 @@ __all__ = [
     "Controller",
     "DeltaFAlgorithm",
     "DerivedTimeseriesFactory",
+    "IntervalUtility",
     "ObservatoryMetadata",
     "PlotTimeseriesFactory",
     "StreamConverter",
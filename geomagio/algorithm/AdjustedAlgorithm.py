@@ -1,12 +1,15 @@
 import sys
+from typing import TYPE_CHECKING
 
 import json
 import numpy as np
 from obspy.core import Stream, Stats
 
-from ..adjusted import AdjustedMatrix
 from .Algorithm import Algorithm
 
+if TYPE_CHECKING:
+    from ..adjusted import AdjustedMatrix
+
 
 class AdjustedAlgorithm(Algorithm):
     """Algorithm that converts from one geomagnetic coordinate system to a
@@ -16,7 +19,7 @@ class AdjustedAlgorithm(Algorithm):
 
     def __init__(
         self,
-        matrix: AdjustedMatrix = None,
+        matrix: "AdjustedMatrix" = None,
         statefile=None,
         data_type=None,
         location=None,
@@ -43,6 +46,9 @@ class AdjustedAlgorithm(Algorithm):
         """Load algorithm state from a file.
         File name is self.statefile.
         """
+        # adjusted imports scipy and openpyxl, only import when used
+        from ..adjusted import AdjustedMatrix
+
         # Adjusted matrix defaults to identity matrix
         matrix_size = len([c for c in self.get_input_channels() if c != "F"]) + 1
         matrix = np.eye(matrix_size).tolist()
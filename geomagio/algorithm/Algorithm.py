@@ -120,6 +120,14 @@ class Algorithm(object):
         """
         return None
 
+    def save_state(self):
+        """Save algorithm state, if any.
+
+        Stateful algorithms that load state when configured
+        should save it here, so long running processes can persist it.
+        """
+        pass
+
     @classmethod
     def add_arguments(cls, parser):
         """Add command line arguments to argparse parser.
@@ -1,24 +1,24 @@
+import functools
 import json
 import sys
-from typing import Dict
+from typing import Dict, List
 
 import numpy as np
 from numpy.lib import stride_tricks as npls
 from obspy.core import Stream, Stats
-import scipy.signal as sps
 
 from .Algorithm import Algorithm
 from .. import TimeseriesUtility
 
 
-STEPS = [
+# default filter steps, windows are added by get_default_steps
+_STEPS = [
     {  # 10 Hz to one second filter
         "name": "10Hz",
         "data_interval": "second",
         "data_interval_type": "1-second",
         "input_sample_period": 0.1,
         "output_sample_period": 1.0,
-        "window": sps.firwin(123, 0.25, window="blackman", fs=10.0),
         "type": "firfilter",
         "filter_comments": [
             "Vector 1-second values are computed from 10 Hz values using a Blackman filter (123 taps, cutoff 0.25Hz) centered on the start of the second."
@@ -30,7 +30,6 @@ STEPS = [
         "data_interval_type": "1-minute",
         "input_sample_period": 1.0,
         "output_sample_period": 60.0,
-        "window": sps.get_window(window=("gaussian", 15.8734), Nx=91),
         "type": "firfilter",
         "filter_comments": [
             "Scalar and Vector 1-minute values are computed from 1 Hz values using an INTERMAGNET gaussian filter centered on the start of the minute (00:30-01:30)."
@@ -42,7 +41,6 @@ STEPS = [
         "data_interval_type": "1-hour (00-59)",
         "input_sample_period": 60.0,
         "output_sample_period": 3600.0,
-        "window": sps.windows.boxcar(60),
         "type": "average",
         "filter_comments": [
             "Scalar and Vector 1-hour values are computed from average of 1-minute values in the hour (00-59)",
@@ -54,7 +52,6 @@ STEPS = [
         "data_interval_type": "1-day (00:00-23:59)",
         "input_sample_period": 60.0,
         "output_sample_period": 86400,
-        "window": sps.windows.boxcar(1440),
         "type": "average",
         "filter_comments": [
             "Scalar and Vector 1-day values are computed from average of 1-minute values in the day (00:00-23:59)",
@@ -63,6 +60,39 @@ STEPS = [
 ]
 
 
+def _get_windows() -> Dict[str, np.ndarray]:
+    """Filter windows for default steps, by step name."""
+    # scipy.signal is slow to import, only import when filtering
+    import scipy.signal as sps
+
+    return {
+        "10Hz": sps.firwin(123, 0.25, window="blackman", fs=10.0),
+        "Intermagnet One Minute": sps.get_window(window=("gaussian", 15.8734), Nx=91),
+        "One Hour": sps.windows.boxcar(60),
+        "One Day": sps.windows.boxcar(1440),
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def get_default_steps() -> List[Dict]:
+    """Default filter steps, windows are computed on first call.
+
+    Returns
+    -------
+    list
+        filter steps, the same list is returned by every call.
+    """
+    windows = _get_windows()
+    return [dict(step, window=windows[step["name"]]) for step in _STEPS]
+
+
+def __getattr__(name):
+    # STEPS is computed when first used
+    if name == "STEPS":
+        return get_default_steps()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def get_nearest_time(step, output_time, left=True):
     interval_start = output_time - (
         output_time.timestamp % step["output_sample_period"]
@@ -166,17 +196,15 @@ class FilterAlgorithm(Algorithm):
         ]
 
     def save_state(self):
-        """Save algorithm state to a file.
-        File name is self.statefile.
+        """Filters do not have state to save.
+
+        Coefficients in self.coeff_filename are configuration,
+        and are not overwritten.
         """
-        if self.coeff_filename is None:
-            return
-        data = {"window": list(self.window), "type": self.type}
-        with open(self.coeff_filename, "w") as f:
-            f.write(json.dumps(data))
+        pass
 
     def get_filter_steps(self):
-        """Method to gather necessary filtering steps from STEPS constant.
+        """Method to gather necessary filtering steps from default steps.
         Returns
         -------
         list
@@ -188,7 +216,7 @@ class FilterAlgorithm(Algorithm):
             return self.steps
 
         steps = []
-        for step in STEPS:
+        for step in get_default_steps():
             if (
                 self.input_sample_period <= step["input_sample_period"]
                 and self.output_sample_period >= step["output_sample_period"]
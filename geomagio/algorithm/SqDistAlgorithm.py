@@ -19,7 +19,6 @@ from .AlgorithmException import AlgorithmException
 import json
 import numpy as np
 from obspy.core import Stream, UTCDateTime
-from scipy.optimize import fmin_l_bfgs_b
 
 
 class SqDistAlgorithm(Algorithm):
@@ -736,6 +735,9 @@ class SqDistAlgorithm(Algorithm):
             error = np.sqrt(np.nanmean(np.square(np.subtract(yobs, yhat))))
             return error
 
+        # scipy.optimize is slow to import, only import when estimating
+        from scipy.optimize import fmin_l_bfgs_b
+
         parameters = fmin_l_bfgs_b(
             func, x0=initial_values, args=(), bounds=boundaries, approx_grad=True
         )
@@ -0,0 +1,120 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import os
+from typing import Any, Callable
+
+
+class ServiceUnavailable(Exception):
+    """Request could not be processed now, and should be retried later.
+
+    Parameters
+    ----------
+    message: reason request was not processed
+    retry_after: seconds client should wait before retrying
+    """
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class BoundedExecutor(object):
+    """Run blocking calls off the event loop, with limited concurrency.
+
+    Calls wait up to queue_timeout for one of max_concurrent slots,
+    then up to timeout for the call to complete.
+    A slot is released when the call completes, even after a timeout,
+    so backend concurrency stays bounded while slow calls finish.
+
+    Parameters
+    ----------
+    max_concurrent: maximum number of calls running at once
+    queue_timeout: seconds to wait for a slot
+    timeout: seconds to wait for a call to complete
+    retry_after: seconds clients should wait when calls are rejected
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 10,
+        queue_timeout: float = 5,
+        timeout: float = 60,
+        retry_after: int = 10,
+    ):
+        self.max_concurrent = max_concurrent
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrent, thread_name_prefix="BoundedExecutor"
+        )
+        self._loop = None
+        self._semaphore = None
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Call func in a worker thread.
+
+        Returns
+        -------
+        result of func.
+
+        Raises
+        ------
+        ServiceUnavailable
+            if no slot is available within queue_timeout,
+            or func does not complete within timeout.
+        Exception raised by func.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(loop)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise ServiceUnavailable(
+                "Too many concurrent requests, try again later",
+                retry_after=self.retry_after,
+            )
+        future = loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+        def release(future):
+            semaphore.release()
+            # avoid unretrieved exception warnings after timeouts
+            if not future.cancelled():
+                future.exception()
+
+        future.add_done_callback(release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise ServiceUnavailable(
+                f"Request did not complete within {self.timeout} seconds",
+                retry_after=self.retry_after,
+            )
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        """Semaphores belong to an event loop, create one for each loop."""
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+
+def create_bounded_executor() -> BoundedExecutor:
+    """Create executor for backend requests from environment variables."""
+    return BoundedExecutor(
+        max_concurrent=int(os.getenv("DATA_CONCURRENCY", "10")),
+        queue_timeout=float(os.getenv("DATA_QUEUE_TIMEOUT", "5")),
+        timeout=float(os.getenv("DATA_TIMEOUT", "60")),
+        retry_after=int(os.getenv("DATA_RETRY_AFTER", "10")),
+    )
+
+
+bounded_executor = create_bounded_executor()
+
+
+def get_bounded_executor() -> BoundedExecutor:
+    """Dependency for the configured backend executor."""
+    return bounded_executor
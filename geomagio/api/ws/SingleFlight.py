@@ -0,0 +1,224 @@
+import asyncio
+from concurrent.futures import Future
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from obspy import Stream
+
+from .DataApiQuery import DataApiQuery
+
+
+class Flight(object):
+    """A backend fetch that is in progress.
+
+    Parameters
+    ----------
+    query: query being fetched
+
+    Attributes
+    ----------
+    future: completed with the fetched timeseries, or the fetch error.
+        Threads wait using result(), and async code using asyncio.wrap_future,
+        so waiting requests do not use a thread.
+    """
+
+    def __init__(self, query: DataApiQuery):
+        self.query = query
+        self.future = Future()
+
+    def contains(self, query: DataApiQuery) -> bool:
+        """Whether the result of this flight includes all data for query."""
+        fetching = self.query
+        return (
+            fetching.id == query.id
+            and fetching.sampling_period == query.sampling_period
+            and fetching.data_type == query.data_type
+            and set(query.elements).issubset(fetching.elements)
+            and fetching.starttime <= query.starttime
+            and query.endtime <= fetching.endtime
+        )
+
+
+class SingleFlight(object):
+    """Coalesce concurrent timeseries requests.
+
+    Requests that are the same as, or contained by, a fetch already
+    in progress wait for that fetch and share its result,
+    instead of making another backend request.
+
+    get_timeseries joins, fetches and waits in the calling thread.
+    Callers that limit concurrent fetches call join, then only the
+    leader fetches, so waiting requests do not use up the limit.
+
+    Attributes
+    ----------
+    coalesced: number of requests that waited for another fetch
+    fetched: number of requests that fetched from the backend
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self.fetched = 0
+        self._flights: List[Flight] = []
+        self._lock = threading.Lock()
+
+    def fetch(self, flight: Flight, fetch: Callable[[DataApiQuery], Stream]):
+        """Fetch data for a flight started by join, and finish it.
+
+        Parameters
+        ----------
+        flight: flight to fetch, when join returned leader
+        fetch: called to get timeseries for flight query,
+            exceptions are stored for every request waiting on the flight
+        """
+        try:
+            result = fetch(flight.query)
+        except Exception as e:
+            self.finish(flight, error=e)
+        else:
+            self.finish(flight, result=result)
+
+    def finish(
+        self,
+        flight: Flight,
+        result: Optional[Stream] = None,
+        error: Optional[Exception] = None,
+    ):
+        """Complete a flight, and wake requests waiting on it.
+
+        Only the first call has an effect, so a leader that stops waiting
+        can fail the flight while its fetch is still running.
+
+        Parameters
+        ----------
+        flight: flight to complete
+        result: fetched timeseries
+        error: raised for every request waiting on the flight
+        """
+        with self._lock:
+            if flight.future.done():
+                return
+            self._flights.remove(flight)
+            if error is not None:
+                flight.future.set_exception(error)
+            else:
+                flight.future.set_result(result)
+
+    def get_metrics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "coalesced": self.coalesced,
+                "fetched": self.fetched,
+                "in_flight": len(self._flights),
+            }
+
+    def get_timeseries(
+        self, query: DataApiQuery, fetch: Callable[[DataApiQuery], Stream]
+    ) -> Stream:
+        """Get timeseries for query.
+
+        Parameters
+        ----------
+        query: data to get
+        fetch: called to get timeseries when no fetch in progress contains query
+
+        Returns
+        -------
+        timeseries for query, see wait.
+
+        Raises
+        ------
+        Exception raised by fetch, for every request waiting on it.
+        """
+        flight, leader = self.join(query)
+        if leader:
+            self.fetch(flight, fetch)
+        return self.wait(flight, query)
+
+    def join(self, query: DataApiQuery) -> Tuple[Flight, bool]:
+        """Find a flight in progress that contains query, or start one.
+
+        Parameters
+        ----------
+        query: data to get
+
+        Returns
+        -------
+        flight for query, and whether the caller is the leader.
+        The leader must call fetch or finish,
+        other callers only wait for the flight.
+        """
+        with self._lock:
+            flight = next((f for f in self._flights if f.contains(query)), None)
+            if flight is not None:
+                self.coalesced += 1
+                return flight, False
+            flight = Flight(query)
+            self._flights.append(flight)
+            self.fetched += 1
+            return flight, True
+
+    def wait(
+        self, flight: Flight, query: DataApiQuery, timeout: Optional[float] = None
+    ) -> Stream:
+        """Wait for a flight, and get the part of its result for query.
+
+        Parameters
+        ----------
+        flight: flight returned by join
+        query: data to get
+        timeout: seconds to wait, or None to wait until the flight finishes
+
+        Returns
+        -------
+        timeseries for query.
+        Traces share data with other requests, but have separate stats,
+        so callers may modify stats and add or remove traces.
+
+        Raises
+        ------
+        concurrent.futures.TimeoutError
+            if the flight does not finish within timeout.
+        Exception raised by fetch, for every request waiting on it.
+        """
+        return get_query_timeseries(flight.future.result(timeout), query)
+
+    async def wait_async(
+        self, flight: Flight, query: DataApiQuery, timeout: Optional[float] = None
+    ) -> Stream:
+        """Wait for a flight without blocking a thread, see wait.
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            if the flight does not finish within timeout.
+        Exception raised by fetch, for every request waiting on it.
+        """
+        # shield, so a timeout does not cancel the flight for other requests
+        result = await asyncio.wait_for(
+            asyncio.shield(asyncio.wrap_future(flight.future)), timeout
+        )
+        return get_query_timeseries(result, query)
+
+
+def get_query_timeseries(timeseries: Stream, query: DataApiQuery) -> Stream:
+    """Get the part of a timeseries for a query.
+
+    Parameters
+    ----------
+    timeseries: fetched timeseries that contains query
+    query: elements and time range to get
+
+    Returns
+    -------
+    new stream with query elements between query starttime and endtime.
+    Trace data are views of data in timeseries.
+    """
+    return Stream(
+        [trace for trace in timeseries if trace.stats.channel in query.elements]
+    ).slice(
+        starttime=query.starttime,
+        endtime=query.endtime,
+        keep_empty_traces=True,
+        nearest_sample=False,
+    )
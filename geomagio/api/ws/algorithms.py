@@ -1,6 +1,7 @@
 import json
 
 from fastapi import APIRouter, Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
 from starlette.responses import Response
 
 from ...algorithm import DbDtAlgorithm
@@ -8,6 +9,8 @@ from ...residual import (
     calculate,
     Reading,
 )
+from .BoundedExecutor import BoundedExecutor, get_bounded_executor
+from .cache import get_cache_control, get_max_age
 from .DataApiQuery import DataApiQuery
 from .data import format_timeseries, get_data_factory, get_data_query, get_timeseries
 
@@ -20,19 +23,24 @@ router = APIRouter()
     description="First order derivative at requested interval",
     name="Dbdt Algorithm",
 )
-def get_dbdt(
+async def get_dbdt(
     query: DataApiQuery = Depends(get_data_query),
+    executor: BoundedExecutor = Depends(get_bounded_executor),
 ) -> Response:
     dbdt = DbDtAlgorithm(period=query.sampling_period)
     data_factory = get_data_factory(query=query)
+
     # read data
-    raw = get_timeseries(data_factory, query)
+    raw = await get_timeseries(data_factory, query, executor)
     # run dbdt
-    timeseries = dbdt.process(raw)
+    timeseries = await run_in_threadpool(dbdt.process, raw)
     elements = [f"{element}_DT" for element in query.elements]
     # output response
     return format_timeseries(
-        timeseries=timeseries, format=query.format, elements=elements
+        timeseries=timeseries,
+        format=query.format,
+        elements=elements,
+        headers={"Cache-Control": get_cache_control(get_max_age(query, raw))},
     )
 
 
@@ -6,6 +6,7 @@ from fastapi.responses import JSONResponse, PlainTextResponse, RedirectResponse
 from obspy import UTCDateTime
 
 from . import algorithms, data, elements, metadata, observatories
+from .BoundedExecutor import ServiceUnavailable
 
 
 ERROR_CODE_MESSAGES = {
@@ -47,7 +48,8 @@ async def add_headers(request: Request, call_next):
     ] = "accept, origin, authorization, content-type"
     response.headers["Access-Control-Allow-Methods"] = "*"
     response.headers["Access-Control-Allow-Origin"] = "*"
-    response.headers["Cache-Control"] = "max-age=60"
+    # data endpoints set max-age based on age of data
+    response.headers.setdefault("Cache-Control", "max-age=60")
     return response
 
 
@@ -67,6 +69,20 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     return format_error(400, str(exc), data_format, request)
 
 
+@app.exception_handler(ServiceUnavailable)
+async def service_unavailable_handler(request: Request, exc: ServiceUnavailable):
+    """Overloaded or slow backend, client should retry later."""
+    data_format = (
+        "format" in request.query_params
+        and str(request.query_params["format"])
+        or "text"
+    )
+    response = format_error(503, str(exc), data_format, request)
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["Retry-After"] = str(exc.retry_after)
+    return response
+
+
 @app.exception_handler(Exception)
 async def server_exception_handler(request: Request, exc: Exception):
     """Other exceptions are server errors."""
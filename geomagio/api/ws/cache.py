@@ -0,0 +1,481 @@
+"""Cache for data responses.
+
+Responses are keyed on the normalized DataApiQuery.
+How long a response is cached depends on the age of the requested data:
+recent data changes as it arrives, while older definitive data does not.
+
+The cache is configured using environment variables:
+
+    DATA_CACHE_BYTES: size of the in-process cache, 0 to disable.
+    DATA_CACHE_DIRECTORY: optional directory for a cache shared by processes.
+    DATA_CACHE_DIRECTORY_BYTES: size of the directory cache.
+"""
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from obspy import Stream, UTCDateTime
+
+from ... import TimeseriesUtility
+from .DataApiQuery import DataApiQuery, DataType
+
+
+# max age of responses that include data from the last day
+RECENT_MAX_AGE = 60
+# max age of older responses, by minimum age of data in seconds
+AGE_MAX_AGES = ((30 * 86400, 86400), (86400, 3600))
+# max age of complete definitive and quasi-definitive responses
+IMMUTABLE_MAX_AGE = 365 * 86400
+IMMUTABLE_DATA_TYPES = [DataType.DEFINITIVE, DataType.QUASI_DEFINITIVE]
+
+
+class CacheEntry(object):
+    """A cached response.
+
+    Parameters
+    ----------
+    etag: hash of response content
+    last_modified: time response content last changed, seconds since the epoch
+    max_age: how long response may be cached, in seconds
+    media_type: content type of response
+    body: response content, set once response is complete
+    created: time response was generated, seconds since the epoch,
+        default last_modified. max_age is counted from created.
+    """
+
+    def __init__(
+        self,
+        etag: str,
+        last_modified: float,
+        max_age: int,
+        media_type: str,
+        body: bytes = None,
+        created: float = None,
+    ):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.max_age = max_age
+        self.media_type = media_type
+        self.body = body
+        self.created = created or last_modified
+
+    @property
+    def expires(self) -> float:
+        return self.created + self.max_age
+
+    def get_headers(self, now: float = None) -> Dict[str, str]:
+        """Get caching headers for response.
+
+        Cache-Control max-age is the time remaining before entry expires.
+        """
+        now = now or time.time()
+        if self.max_age >= IMMUTABLE_MAX_AGE:
+            max_age = self.max_age
+        else:
+            max_age = max(0, math.ceil(self.expires - now))
+        return {
+            "Cache-Control": get_cache_control(max_age),
+            "ETag": f'"{self.etag}"',
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+        }
+
+    def is_expired(self, now: float = None) -> bool:
+        return self.expires <= (now or time.time())
+
+    def is_not_modified(self, headers: Dict[str, str]) -> bool:
+        """Check conditional request headers.
+
+        Parameters
+        ----------
+        headers: request headers
+
+        Returns
+        -------
+        True if the client copy is current and 304 should be returned.
+        """
+        if "if-none-match" in headers:
+            etags = [etag.strip() for etag in headers["if-none-match"].split(",")]
+            return "*" in etags or any(
+                etag.replace("W/", "", 1) == f'"{self.etag}"' for etag in etags
+            )
+        if "if-modified-since" in headers:
+            try:
+                since = parsedate_to_datetime(headers["if-modified-since"])
+            except (TypeError, ValueError):
+                return False
+            # http dates have one second resolution
+            return int(self.last_modified) <= since.timestamp()
+        return False
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "etag": self.etag,
+                "last_modified": self.last_modified,
+                "created": self.created,
+                "max_age": self.max_age,
+                "media_type": self.media_type,
+            }
+        )
+
+    @classmethod
+    def from_json(cls, data: str, body: bytes = None) -> "CacheEntry":
+        return cls(**json.loads(data), body=body)
+
+
+class ResponseCache(object):
+    """Base class for response caches.
+
+    Does not store responses, and is used when caching is disabled.
+    """
+
+    def get(self, key: str, include_expired: bool = False) -> Optional[CacheEntry]:
+        """Get a cached response.
+
+        Parameters
+        ----------
+        key: cache key, from get_cache_key
+        include_expired: return expired responses instead of removing them,
+            so a new response can keep last_modified when content is the same
+
+        Returns
+        -------
+        cached response, or None if not found or expired.
+        """
+        return None
+
+    def set(self, key: str, entry: CacheEntry):
+        """Store a response.
+
+        Parameters
+        ----------
+        key: cache key, from get_cache_key
+        entry: response to cache, with body
+        """
+        pass
+
+    def store_chunks(
+        self, key: str, entry: CacheEntry, chunks: Iterable[bytes]
+    ) -> Iterator[bytes]:
+        """Store a response while it is streamed.
+
+        Entry is stored after all chunks are generated,
+        and not stored if streaming is interrupted.
+
+        Parameters
+        ----------
+        key: cache key, from get_cache_key
+        entry: response to cache, without body
+        chunks: response content
+
+        Returns
+        -------
+        generator that yields chunks.
+        """
+        body = []
+        for chunk in chunks:
+            body.append(chunk)
+            yield chunk
+        if entry.max_age > 0:
+            entry.body = b"".join(body)
+            self.set(key, entry)
+
+
+class MemoryResponseCache(ResponseCache):
+    """Least recently used response cache with a size limit.
+
+    Parameters
+    ----------
+    max_bytes: maximum total size of cached response bodies
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, include_expired: bool = False) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.is_expired():
+                if include_expired:
+                    return entry
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self.size += len(entry.body)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        self.size -= len(self._entries.pop(key).body)
+
+
+class FileResponseCache(ResponseCache):
+    """Least recently used response cache stored in a directory.
+
+    Can be shared by processes, or hosts using a shared file system.
+    Each entry is one file, expired entries are removed when read.
+    Reading an entry updates its modification time, and when files
+    exceed max_bytes the least recently used are removed.
+
+    Other processes write to the same directory,
+    so the size is estimated from this process's writes,
+    and the directory is only scanned when the estimate exceeds max_bytes.
+
+    Parameters
+    ----------
+    directory: where entries are stored, created if it does not exist
+    max_bytes: maximum total size of entry files
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.size = sum(size for _, _, size in self._get_files())
+
+    def get(self, key: str, include_expired: bool = False) -> Optional[CacheEntry]:
+        path = self._get_path(key)
+        try:
+            with open(path, "rb") as f:
+                metadata = f.readline()
+                entry = CacheEntry.from_json(metadata.decode("utf8"), body=f.read())
+        except (OSError, ValueError, TypeError):
+            return None
+        if entry.is_expired():
+            if include_expired:
+                return entry
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        try:
+            # most recently used
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def set(self, key: str, entry: CacheEntry):
+        metadata = entry.to_json().encode("utf8") + b"\n"
+        size = len(metadata) + len(entry.body)
+        if size > self.max_bytes:
+            return
+        # write to temporary file, then rename so readers never see partial files
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(metadata)
+                f.write(entry.body)
+            os.replace(temp_path, self._get_path(key))
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return
+        with self._lock:
+            self.size += size
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Remove least recently used files, call while holding _lock.
+
+        Removes files until 90% of max_bytes remain,
+        so the directory is not scanned for every set.
+        """
+        files = sorted(self._get_files())
+        self.size = sum(size for _, _, size in files)
+        for _, path, size in files:
+            if self.size <= self.max_bytes * 0.9:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                # removed by another process
+                pass
+            self.size -= size
+
+    def _get_files(self) -> List[Tuple[float, str, int]]:
+        """Modification time, path and size of entry files.
+
+        Temporary files being written are not included.
+        """
+        files = []
+        with os.scandir(self.directory) as entries:
+            for dir_entry in entries:
+                if dir_entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = dir_entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, dir_entry.path, stat.st_size))
+        return files
+
+    def _get_path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode("utf8")).hexdigest()
+        return os.path.join(self.directory, name)
+
+
+class TieredResponseCache(ResponseCache):
+    """Check several caches in order.
+
+    Entries found in a later cache are copied to earlier caches.
+
+    Parameters
+    ----------
+    caches: caches to check, usually fastest first
+    """
+
+    def __init__(self, caches: List[ResponseCache]):
+        self.caches = caches
+
+    def get(self, key: str, include_expired: bool = False) -> Optional[CacheEntry]:
+        expired = None
+        for i, cache in enumerate(self.caches):
+            entry = cache.get(key, include_expired=include_expired)
+            if entry is None:
+                continue
+            if entry.is_expired():
+                # a later cache may have a current entry
+                expired = expired or entry
+                continue
+            for earlier in self.caches[:i]:
+                earlier.set(key, entry)
+            return entry
+        return expired
+
+    def set(self, key: str, entry: CacheEntry):
+        for cache in self.caches:
+            cache.set(key, entry)
+
+
+def create_response_cache() -> ResponseCache:
+    """Create response cache from environment variables."""
+    caches = []
+    max_bytes = int(os.getenv("DATA_CACHE_BYTES", str(100 * 1024 * 1024)))
+    if max_bytes > 0:
+        caches.append(MemoryResponseCache(max_bytes=max_bytes))
+    directory = os.getenv("DATA_CACHE_DIRECTORY")
+    if directory:
+        caches.append(
+            FileResponseCache(
+                directory=directory,
+                max_bytes=int(
+                    os.getenv("DATA_CACHE_DIRECTORY_BYTES", str(1024 * 1024 * 1024))
+                ),
+            )
+        )
+    if len(caches) == 0:
+        return ResponseCache()
+    if len(caches) == 1:
+        return caches[0]
+    return TieredResponseCache(caches)
+
+
+response_cache = create_response_cache()
+
+
+def get_response_cache() -> ResponseCache:
+    """Dependency for the configured response cache."""
+    return response_cache
+
+
+def get_cache_key(query: DataApiQuery) -> str:
+    """Normalize query as a cache key."""
+
+    def value(v):
+        return getattr(v, "value", v)
+
+    return json.dumps(
+        [
+            query.id,
+            query.starttime.isoformat(),
+            query.endtime.isoformat(),
+            list(query.elements),
+            float(value(query.sampling_period)),
+            str(value(query.data_type)),
+            str(value(query.format)),
+        ],
+        separators=(",", ":"),
+    )
+
+
+def get_cache_control(max_age: int) -> str:
+    """Format Cache-Control header for max_age from get_max_age."""
+    if max_age >= IMMUTABLE_MAX_AGE:
+        return f"max-age={max_age}, immutable"
+    return f"max-age={max_age}"
+
+
+def get_etag(key: str, timeseries: Stream) -> str:
+    """Hash query and data to identify response content."""
+    etag = hashlib.sha1(key.encode("utf8"))
+    for trace in timeseries:
+        stats = trace.stats
+        etag.update(f"{trace.id} {stats.starttime} {stats.delta}".encode("utf8"))
+        etag.update(trace.data.tobytes())
+    return etag.hexdigest()
+
+
+def get_max_age(
+    query: DataApiQuery, timeseries: Stream, now: UTCDateTime = None
+) -> int:
+    """Get how long a response may be cached.
+
+    Parameters
+    ----------
+    query: data query
+    timeseries: data returned for query
+    now: current time, default is UTCDateTime()
+
+    Returns
+    -------
+    number of seconds response may be cached.
+    IMMUTABLE_MAX_AGE for older definitive or quasi-definitive data
+    without gaps, which is not expected to change.
+    """
+    age = (now or UTCDateTime()) - query.endtime
+    if age < 86400:
+        return RECENT_MAX_AGE
+    data_type = getattr(query.data_type, "value", query.data_type)
+    if (
+        data_type in IMMUTABLE_DATA_TYPES
+        or (len(data_type) == 2 and data_type[0] in "DQ")
+    ) and not _has_gaps(timeseries):
+        return IMMUTABLE_MAX_AGE
+    for min_age, max_age in AGE_MAX_AGES:
+        if age >= min_age:
+            return max_age
+    return RECENT_MAX_AGE
+
+
+def _has_gaps(timeseries: Stream) -> bool:
+    if len(timeseries) == 0:
+        return True
+    gaps = TimeseriesUtility.get_stream_gap_intervals(timeseries)
+    return any(len(intervals) > 0 for intervals in gaps.values())
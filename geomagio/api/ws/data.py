@@ -1,14 +1,26 @@
+import asyncio
 import os
-from typing import List, Union
+import time
+from typing import Dict, Iterator, List, Optional, Union
 
 from fastapi import APIRouter, Depends, Query, Request
 from obspy import UTCDateTime, Stream
-from starlette.responses import Response
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response, StreamingResponse
 
 from ... import DerivedTimeseriesFactory, TimeseriesFactory, TimeseriesUtility
 from ...edge import EdgeFactory, MiniSeedFactory
 from ...iaga2002 import IAGA2002Writer
 from ...imfjson import IMFJSONWriter
+from .BoundedExecutor import BoundedExecutor, ServiceUnavailable, get_bounded_executor
+from .cache import (
+    CacheEntry,
+    ResponseCache,
+    get_cache_key,
+    get_etag,
+    get_max_age,
+    get_response_cache,
+)
 from .DataApiQuery import (
     DEFAULT_ELEMENTS,
     DataApiQuery,
@@ -16,6 +28,7 @@ from .DataApiQuery import (
     OutputFormat,
     SamplingPeriod,
 )
+from .SingleFlight import SingleFlight
 
 
 def get_data_factory(
@@ -133,29 +146,97 @@ def get_data_query(
 
 
 def format_timeseries(
-    timeseries: Stream, format: OutputFormat, elements: List[str]
+    timeseries: Stream,
+    format: OutputFormat,
+    elements: List[str],
+    headers: Dict[str, str] = None,
 ) -> Response:
     """Formats timeseries output
 
+    Output is streamed in chunks, headers first then data,
+    so large responses are not built in memory before sending.
+
     Parameters
     ----------
     timeseries: data to format
     format: output format
     obspy.core.Stream
         timeseries object with requested data
+    headers: additional response headers
     """
+    return StreamingResponse(
+        format_chunks(timeseries, format, elements),
+        headers=headers,
+        media_type=get_media_type(format),
+    )
+
+
+def format_chunks(
+    timeseries: Stream, format: OutputFormat, elements: List[str]
+) -> Iterator[bytes]:
+    """Format timeseries output in chunks."""
     if format == OutputFormat.JSON:
-        data = IMFJSONWriter.format(timeseries, elements)
-        media_type = "application/json"
-    else:
-        data = IAGA2002Writer.format(timeseries, elements)
-        media_type = "text/plain"
-    return Response(data, media_type=media_type)
+        return IMFJSONWriter.format_chunks(timeseries, elements)
+    return IAGA2002Writer.format_chunks(timeseries, elements)
 
 
-def get_timeseries(data_factory: TimeseriesFactory, query: DataApiQuery) -> Stream:
+def get_media_type(format: OutputFormat) -> str:
+    if format == OutputFormat.JSON:
+        return "application/json"
+    return "text/plain"
+
+
+async def get_timeseries(
+    data_factory: TimeseriesFactory, query: DataApiQuery, executor: BoundedExecutor
+) -> Stream:
     """Get timeseries data
 
+    Concurrent requests for the same data share one fetch from data_factory.
+    Only the fetch uses an executor slot, requests sharing it wait outside
+    the executor without using a thread,
+    for at most as long as the fetch may take.
+
+    Parameters
+    ----------
+    data_factory: where to read data
+    query: parameters for the data to read
+    executor: runs the fetch
+
+    Raises
+    ------
+    ServiceUnavailable
+        if the fetch could not start or complete in time.
+    """
+    flight, leader = single_flight.join(query)
+    if leader:
+        try:
+            await executor.run(
+                single_flight.fetch,
+                flight,
+                lambda query: fetch_timeseries(data_factory, query),
+            )
+        except BaseException as e:
+            # fetch did not start or finish in time, fail requests sharing it
+            if not isinstance(e, Exception):
+                e = ServiceUnavailable(
+                    "Request was cancelled", retry_after=executor.retry_after
+                )
+            single_flight.finish(flight, error=e)
+            raise
+    try:
+        return await single_flight.wait_async(
+            flight, query, executor.queue_timeout + executor.timeout
+        )
+    except asyncio.TimeoutError:
+        raise ServiceUnavailable(
+            "Request did not complete in time, try again later",
+            retry_after=executor.retry_after,
+        )
+
+
+def fetch_timeseries(data_factory: TimeseriesFactory, query: DataApiQuery) -> Stream:
+    """Fetch timeseries data from data_factory
+
     Parameters
     ----------
     data_factory: where to read data
@@ -174,6 +255,7 @@ def get_timeseries(data_factory: TimeseriesFactory, query: DataApiQuery) -> Stre
 
 
 router = APIRouter()
+single_flight = SingleFlight()
 
 
 @router.get(
@@ -182,13 +264,75 @@ router = APIRouter()
     description="Returns timeseries depending on query parameters\n\n"
     + "Limited to 345600 data points",
 )
-def get_data(
+async def get_data(
+    request: Request,
     query: DataApiQuery = Depends(get_data_query),
+    cache: ResponseCache = Depends(get_response_cache),
+    executor: BoundedExecutor = Depends(get_bounded_executor),
 ) -> Response:
+    key = get_cache_key(query)
+    entry = await run_in_threadpool(cache.get, key, include_expired=True)
+    if entry is not None and not entry.is_expired():
+        return cached_response(request, entry)
     data_factory = get_data_factory(query=query)
+
     # read data
-    timeseries = get_timeseries(data_factory, query)
-    # output response
-    return format_timeseries(
-        timeseries=timeseries, format=query.format, elements=query.elements
+    timeseries = await get_timeseries(data_factory, query, executor)
+    entry = await run_in_threadpool(
+        create_cache_entry, key, query, timeseries, previous=entry
+    )
+    if entry.is_not_modified(request.headers):
+        return Response(status_code=304, headers=entry.get_headers())
+    # output response, and cache once complete
+    # chunks are formatted in a threadpool while streaming
+    chunks = format_chunks(timeseries, query.format, query.elements)
+    return StreamingResponse(
+        cache.store_chunks(key, entry, chunks),
+        headers=entry.get_headers(),
+        media_type=entry.media_type,
     )
+
+
+def create_cache_entry(
+    key: str,
+    query: DataApiQuery,
+    timeseries: Stream,
+    previous: Optional[CacheEntry] = None,
+) -> CacheEntry:
+    """Cache entry for a response, before the body is formatted.
+
+    Parameters
+    ----------
+    key: cache key, from get_cache_key
+    query: data query
+    timeseries: data returned for query
+    previous: expired entry for key, whose last_modified is kept
+        when content has not changed, so If-Modified-Since still matches
+    """
+    etag = get_etag(key, timeseries)
+    now = time.time()
+    return CacheEntry(
+        etag=etag,
+        last_modified=(
+            previous.last_modified
+            if previous is not None and previous.etag == etag
+            else now
+        ),
+        max_age=get_max_age(query, timeseries),
+        media_type=get_media_type(query.format),
+        created=now,
+    )
+
+
+def cached_response(request: Request, entry: CacheEntry) -> Response:
+    """Serve a cached response, or 304 if the client copy is current."""
+    headers = entry.get_headers()
+    if entry.is_not_modified(request.headers):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, headers=headers, media_type=entry.media_type)
+
+
+@router.get("/data/metrics/", include_in_schema=False)
+def get_data_metrics() -> Dict[str, int]:
+    """Counts of backend fetches, and requests that shared another fetch."""
+    return single_flight.get_metrics()
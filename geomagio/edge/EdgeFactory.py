@@ -10,7 +10,6 @@ Edge is the USGS earthquake hazard centers replacement for earthworm.
 """
 from __future__ import absolute_import
 from datetime import datetime
-import sys
 from typing import List, Optional
 
 import numpy
@@ -18,12 +17,13 @@ import numpy.ma
 from obspy import Stream, Trace, UTCDateTime
 from obspy.clients import earthworm
 
-from .. import ChannelConverter, TimeseriesUtility
+from .. import ChannelConverter, TimeseriesUtility, Util
 from ..geomag_types import DataInterval, DataType
 from ..TimeseriesFactory import TimeseriesFactory
 from ..TimeseriesFactoryException import TimeseriesFactoryException
 from ..ObservatoryMetadata import ObservatoryMetadata
 from .RawInputClient import RawInputClient
+from .RawInputConnectionPool import RawInputConnectionPool
 from .LegacySNCL import LegacySNCL
 
 
@@ -64,6 +64,14 @@ class EdgeFactory(TimeseriesFactory):
         in get_timeseries/put_timeseries
     cwbhost: str
         a string represeting the IP number of the cwb host to connect to.
+    max_concurrent_reads: int
+        number of channels read from the waveserver at once,
+        channels are read serially when 1, the default.
+    timeout: float
+        seconds to wait for each waveserver request.
+    write_pool: RawInputConnectionPool
+        sockets used to write, kept open between channels and calls.
+        By default each factory has its own pool.
 
     See Also
     --------
@@ -92,9 +100,12 @@ class EdgeFactory(TimeseriesFactory):
         observatoryMetadata: Optional[ObservatoryMetadata] = None,
         locationCode: Optional[str] = None,
         cwbhost: Optional[str] = None,
+        max_concurrent_reads: int = 1,
+        timeout: float = 30,
+        write_pool: Optional[RawInputConnectionPool] = None,
     ):
         TimeseriesFactory.__init__(self, observatory, channels, type, interval)
-        self.client = earthworm.Client(host, port)
+        self.client = earthworm.Client(host, port, timeout=timeout)
         self.host = host
         self.port = port
         self.write_port = write_port
@@ -105,6 +116,8 @@ class EdgeFactory(TimeseriesFactory):
         self.observatoryMetadata = observatoryMetadata or ObservatoryMetadata()
         self.locationCode = locationCode
         self.cwbhost = cwbhost or ""
+        self.max_concurrent_reads = max_concurrent_reads
+        self.write_pool = write_pool or RawInputConnectionPool()
 
     def get_timeseries(
         self,
@@ -156,15 +169,10 @@ class EdgeFactory(TimeseriesFactory):
                 'Starttime before endtime "%s" "%s"' % (starttime, endtime)
             )
 
-        # obspy factories sometimes write to stdout, instead of stderr
-        original_stdout = sys.stdout
-        try:
-            # send stdout to stderr
-            sys.stdout = sys.stderr
-            # get the timeseries
-            timeseries = Stream()
-            for channel in channels:
-                data = self._get_timeseries(
+        def get_channel(channel: str) -> Stream:
+            # obspy factories sometimes write to stdout, instead of stderr
+            with Util.stdout_to_stderr():
+                return self._get_timeseries(
                     starttime,
                     endtime,
                     observatory,
@@ -173,12 +181,13 @@ class EdgeFactory(TimeseriesFactory):
                     interval,
                     add_empty_channels,
                 )
-                if len(data) == 0:
-                    continue
-                timeseries += data
-        finally:
-            # restore stdout
-            sys.stdout = original_stdout
+
+        # get the timeseries
+        timeseries = Stream()
+        for data in Util.map_concurrent(
+            get_channel, channels, self.max_concurrent_reads
+        ):
+            timeseries += data
         self._post_process(timeseries, starttime, endtime, channels)
 
         return timeseries
@@ -457,6 +466,7 @@ class EdgeFactory(TimeseriesFactory):
             sncl.channel,
             sncl.location,
             sncl.network,
+            pool=self.write_pool,
         )
 
         stream = self._convert_stream_to_masked(timeseries=timeseries, channel=channel)
@@ -465,18 +475,21 @@ class EdgeFactory(TimeseriesFactory):
         if not numpy.ma.any(stream.select(channel=channel)[0].data):
             return
 
-        for trace in stream.select(channel=channel).split():
-            trace_send = trace.copy()
-            trace_send.trim(starttime, endtime)
-            if channel == "D":
-                trace_send.data = ChannelConverter.get_minutes_from_radians(
-                    trace_send.data
-                )
-            trace_send = self._convert_trace_to_int(trace_send)
-            ric.send_trace(interval, trace_send)
-        if self.forceout:
-            ric.forceout()
-        ric.close()
+        try:
+            for trace in stream.select(channel=channel).split():
+                trace_send = trace.copy()
+                trace_send.trim(starttime, endtime)
+                if channel == "D":
+                    trace_send.data = ChannelConverter.get_minutes_from_radians(
+                        trace_send.data
+                    )
+                trace_send = self._convert_trace_to_int(trace_send)
+                ric.send_trace(interval, trace_send)
+            if self.forceout:
+                ric.forceout()
+        finally:
+            # return socket to pool for other channels and calls
+            ric.close()
 
     def _set_metadata(
         self,
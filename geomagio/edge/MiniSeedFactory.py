@@ -9,15 +9,14 @@ to take advantage of it's newer realtime abilities.
 Edge is the USGS earthquake hazard centers replacement for earthworm.
 """
 from __future__ import absolute_import
-import sys
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import numpy
 import numpy.ma
 from obspy.clients.neic import client as miniseed
 from obspy.core import Stats, Stream, Trace, UTCDateTime
 
-from .. import ChannelConverter, TimeseriesUtility
+from .. import ChannelConverter, TimeseriesUtility, Util
 from ..geomag_types import DataInterval, DataType
 from ..Metadata import get_instrument
 from ..TimeseriesFactory import TimeseriesFactory
@@ -54,6 +53,14 @@ class MiniSeedFactory(TimeseriesFactory):
         in get_timeseries/put_timeseries
     convert_channels: array
         list of channels to convert from volt/bin to nT
+    max_concurrent_reads: int
+        number of channels read from the query server at once,
+        channels are read serially when 1, the default.
+    timeout: float
+        seconds to wait for each query server request.
+    write_client: MiniSeedInputClient
+        client used to write, queued records are sent in the background.
+        By default each factory has its own client.
 
     See Also
     --------
@@ -79,10 +86,13 @@ class MiniSeedFactory(TimeseriesFactory):
         observatoryMetadata: Optional[ObservatoryMetadata] = None,
         locationCode: Optional[str] = None,
         convert_channels: Optional[List[str]] = None,
+        max_concurrent_reads: int = 1,
+        timeout: float = 30,
+        write_client: Optional[MiniSeedInputClient] = None,
     ):
         TimeseriesFactory.__init__(self, observatory, channels, type, interval)
 
-        self.client = miniseed.Client(host, port)
+        self.client = miniseed.Client(host, port, timeout=timeout)
         self.observatoryMetadata = observatoryMetadata or ObservatoryMetadata()
         self.locationCode = locationCode
         self.interval = interval
@@ -90,7 +100,25 @@ class MiniSeedFactory(TimeseriesFactory):
         self.port = port
         self.write_port = write_port
         self.convert_channels = convert_channels or []
-        self.write_client = MiniSeedInputClient(self.host, self.write_port)
+        self.max_concurrent_reads = max_concurrent_reads
+        self.write_client = write_client or MiniSeedInputClient(
+            self.host, self.write_port
+        )
+
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until data from put_timeseries is written.
+
+        Parameters
+        ----------
+        timeout: float
+            seconds to wait, or None to wait until written or failed.
+
+        Raises
+        ------
+        TimeseriesFactoryException
+            if data cannot be written.
+        """
+        self.write_client.flush(timeout=timeout)
 
     def get_timeseries(
         self,
@@ -142,34 +170,60 @@ class MiniSeedFactory(TimeseriesFactory):
                 'Starttime before endtime "%s" "%s"' % (starttime, endtime)
             )
 
-        # obspy factories sometimes write to stdout, instead of stderr
-        original_stdout = sys.stdout
-        try:
-            # send stdout to stderr
-            sys.stdout = sys.stderr
-            # get the timeseries
-            timeseries = Stream()
-            for channel in channels:
-                if channel in self.convert_channels:
-                    data = self._convert_timeseries(
-                        starttime, endtime, observatory, channel, type, interval
-                    )
+        convert = [c for c in channels if c in self.convert_channels]
+        conversions = self._get_conversions(starttime, endtime, observatory, convert)
+        # read each channel once, components over the range of every
+        # conversion that uses them, keyed by (channel, add_empty_channels)
+        reads = {}
+        for channel in channels:
+            if channel not in convert:
+                reads[(channel, add_empty_channels)] = (starttime, endtime)
+        for _, start, end, components in conversions:
+            for component in components:
+                key = (component["channel"], True)
+                if key in reads:
+                    read_start, read_end = reads[key]
+                    reads[key] = (min(start, read_start), max(end, read_end))
                 else:
-                    data = self._get_timeseries(
-                        starttime,
-                        endtime,
-                        observatory,
-                        channel,
-                        type,
-                        interval,
-                        add_empty_channels,
+                    reads[key] = (start, end)
+
+        def get_channel(key) -> Stream:
+            channel, add_empty = key
+            read_start, read_end = reads[key]
+            # obspy factories sometimes write to stdout, instead of stderr
+            with Util.stdout_to_stderr():
+                return self._get_timeseries(
+                    read_start,
+                    read_end,
+                    observatory,
+                    channel,
+                    type,
+                    interval,
+                    add_empty,
+                )
+
+        data = dict(
+            zip(
+                reads,
+                Util.map_concurrent(get_channel, reads, self.max_concurrent_reads),
+            )
+        )
+        # get the timeseries
+        timeseries = Stream()
+        for channel in channels:
+            if channel not in convert:
+                timeseries += data[(channel, add_empty_channels)]
+                continue
+            for conversion_channel, start, end, components in conversions:
+                if conversion_channel != channel:
+                    continue
+                traces = [
+                    data[(component["channel"], True)][0].slice(
+                        start, end, nearest_sample=False
                     )
-                    if len(data) == 0:
-                        continue
-                timeseries += data
-        finally:
-            # restore stdout
-            sys.stdout = original_stdout
+                    for component in components
+                ]
+                timeseries += self._calculate_trace(channel, components, traces)
 
         self._post_process(timeseries, starttime, endtime, channels)
         return timeseries
@@ -204,6 +258,7 @@ class MiniSeedFactory(TimeseriesFactory):
         Streams sent to timeseries are expected to have a single trace per
             channel and that trace should have an ndarray, with nan's
             representing gaps.
+        Returns once data is queued, use flush() to wait until it is written.
         """
         stats = timeseries[0].stats
         observatory = observatory or stats.station or self.observatory
@@ -225,8 +280,6 @@ class MiniSeedFactory(TimeseriesFactory):
             self._put_channel(
                 timeseries, observatory, channel, type, interval, starttime, endtime
             )
-        # close socket
-        self.write_client.close()
 
     def get_calculated_timeseries(
         self,
@@ -265,23 +318,55 @@ class MiniSeedFactory(TimeseriesFactory):
         out: Trace
             timeseries trace of the converted channel data
         """
-        # sum channels
-        stats = None
-        converted = None
-        for component in components:
-            # load component
-            data = self._get_timeseries(
+        traces = Util.map_concurrent(
+            lambda component: self._get_timeseries(
                 starttime, endtime, observatory, component["channel"], type, interval
-            )[0]
-            # convert to nT
-            nt = data.data * component["scale"] + component["offset"]
-            # add to converted
+            )[0],
+            components,
+            self.max_concurrent_reads,
+        )
+        return self._calculate_trace(channel, components, traces)
+
+    def _calculate_trace(
+        self, channel: str, components: List[dict], traces: List[Trace]
+    ) -> Trace:
+        """Sum scaled component traces, and offsets, into one channel.
+
+        Parameters
+        ----------
+        channel: str
+            single character channel {U, V, W}
+        components: list
+            component dictionaries, see get_calculated_timeseries.
+        traces: list
+            trace for each component, with the same times.
+
+        Returns
+        -------
+        out: Trace
+            trace of the converted channel data
+        """
+        converted = None
+        scaled = None
+        offset = 0
+        for component, trace in zip(components, traces):
+            data = trace.data
+            if isinstance(data, numpy.ma.MaskedArray):
+                data = data.astype(numpy.float64).filled(numpy.nan)
+            # scale in place, instead of allocating for each component
             if converted is None:
-                converted = nt
-                stats = Stats(data.stats)
+                converted = numpy.multiply(
+                    data, component["scale"], dtype=numpy.float64
+                )
             else:
-                converted += nt
+                if scaled is None:
+                    scaled = numpy.empty_like(converted)
+                numpy.multiply(data, component["scale"], out=scaled)
+                converted += scaled
+            offset += component["offset"]
+        converted += offset
         # set channel parameter to U, V, or W
+        stats = Stats(traces[0].stats)
         stats.channel = channel
         # create empty trace with adapted stats
         out = TimeseriesUtility.create_empty_trace(
@@ -380,19 +465,14 @@ class MiniSeedFactory(TimeseriesFactory):
         self._set_metadata(data, observatory, channel, type, interval)
         return data
 
-    def _convert_timeseries(
+    def _get_conversions(
         self,
         starttime: UTCDateTime,
         endtime: UTCDateTime,
         observatory: str,
-        channel: str,
-        type: DataType,
-        interval: DataInterval,
-    ) -> Trace:
-        """Generate a single channel using multiple components.
-
-        Finds metadata, then calls _get_converted_timeseries for actual
-        conversion.
+        channels: List[str],
+    ) -> List[Tuple[str, UTCDateTime, UTCDateTime, List[dict]]]:
+        """Find components used to convert channels.
 
         Parameters
         ----------
@@ -402,51 +482,41 @@ class MiniSeedFactory(TimeseriesFactory):
             the endtime of the requested data
         observatory : str
             observatory code
-        channel : str
-            single character channel {H, E, D, Z, F}
-        type : {'adjusted', 'definitive', 'quasi-definitive', 'variation'}
-            data type
-        interval : {'tenhertz', 'second', 'minute', 'hour', 'day'}
-            data interval
+        channels : list
+            channels to convert {U, V, W}
 
         Returns
         -------
-        out: Trace
-            timeseries trace of the requested channel data
+        list of (channel, starttime, endtime, components),
+        one for each channel and metadata entry that overlaps the request,
+        in case the request spans different configurations.
+        Channels without metadata are not converted.
         """
-        out = Stream()
+        conversions = []
+        if not channels:
+            return conversions
         metadata = get_instrument(observatory, starttime, endtime)
-        # loop in case request spans different configurations
-        for entry in metadata:
-            entry_endtime = entry["end_time"]
-            entry_starttime = entry["start_time"]
-            instrument = entry["instrument"]
-            instrument_channels = instrument["channels"]
-            if channel not in instrument_channels:
-                # no idea how to convert
-                continue
-            # determine metadata overlap with request
-            start = (
-                starttime
-                if entry_starttime is None or entry_starttime < starttime
-                else entry_starttime
-            )
-            end = (
-                endtime
-                if entry_endtime is None or entry_endtime > endtime
-                else entry_endtime
-            )
-            # now convert
-            out += self.get_calculated_timeseries(
-                start,
-                end,
-                observatory,
-                channel,
-                type,
-                interval,
-                instrument_channels[channel],
-            )
-        return out
+        for channel in channels:
+            for entry in metadata:
+                entry_endtime = entry["end_time"]
+                entry_starttime = entry["start_time"]
+                instrument_channels = entry["instrument"]["channels"]
+                if channel not in instrument_channels:
+                    # no idea how to convert
+                    continue
+                # determine metadata overlap with request
+                start = (
+                    starttime
+                    if entry_starttime is None or entry_starttime < starttime
+                    else entry_starttime
+                )
+                end = (
+                    endtime
+                    if entry_endtime is None or entry_endtime > endtime
+                    else entry_endtime
+                )
+                conversions.append((channel, start, end, instrument_channels[channel]))
+        return conversions
 
     def _post_process(
         self,
@@ -530,7 +600,7 @@ class MiniSeedFactory(TimeseriesFactory):
             trace.stats.location = sncl.location
             trace.stats.network = sncl.network
             trace.stats.channel = sncl.channel
-        # finally, send to edge
+        # finally, queue to send to edge
         self.write_client.send(to_write)
 
     def _set_metadata(
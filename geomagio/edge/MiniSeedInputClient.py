@@ -1,19 +1,53 @@
 from __future__ import absolute_import, print_function
+import atexit
+import collections
 import io
+import select
 import socket
 import sys
-from typing import BinaryIO
+import threading
+import time
+import weakref
+from typing import BinaryIO, Deque, Dict, List, Optional, Tuple
 
 from obspy.core import Stream
 
+from ..TimeseriesFactoryException import TimeseriesFactoryException
 from ..TimeseriesUtility import encode_stream, split_stream
 
+# bytes in each miniseed record
+RECORD_LENGTH = 512
+
+# clients with a sender thread, flushed when the interpreter exits
+_started_clients = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_started_clients():
+    """Send queued records before exit, sender threads are daemon threads."""
+    for client in list(_started_clients):
+        try:
+            client.flush()
+        except Exception as e:
+            print(
+                "Unable to send queued records to %s:%s (%s)"
+                % (client.host, client.port, e),
+                file=sys.stderr,
+            )
+
 
 class MiniSeedInputClient(object):
     """Client to write MiniSeed formatted data to Edge.
 
-    Connects on first call to send().
-    Use close() to disconnect.
+    send() formats records and adds them to a queue,
+    a background thread sends queued records in batches.
+    Use flush() to wait until queued records are sent,
+    and close() to flush, stop the thread and disconnect.
+
+    When a send fails, the thread reconnects and sends the batch again,
+    retrying with exponential backoff. Records stay queued until they are
+    sent, and after retries fail flush() and send() raise an exception.
+    Queued records are also flushed when the interpreter exits.
 
     Parameters
     ----------
@@ -23,21 +57,82 @@ class MiniSeedInputClient(object):
         MiniSeedServer port
     encoding: str
         Floating point precision for output data
+    max_queue_bytes: int
+        send() waits while this many bytes are queued.
+    batch_bytes: int
+        maximum bytes sent in each write, records from
+        several traces and channels are combined.
+    retries: int
+        number of attempts to send each batch, before reporting an error.
+    backoff: float
+        seconds to wait after the first failed attempt,
+        doubled after each later attempt.
+    timeout: float
+        seconds to wait when connecting and sending.
     """
 
-    def __init__(self, host, port=2061, encoding="float32"):
+    def __init__(
+        self,
+        host,
+        port=2061,
+        encoding="float32",
+        max_queue_bytes=16 * 1024 * 1024,
+        batch_bytes=128 * RECORD_LENGTH,
+        retries=4,
+        backoff=1,
+        timeout=30,
+    ):
         self.host = host
         self.port = port
         self.encoding = encoding
+        self.max_queue_bytes = max_queue_bytes
+        # batches end on record boundaries
+        self.batch_bytes = max(RECORD_LENGTH, batch_bytes - batch_bytes % RECORD_LENGTH)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
         self.socket = None
+        # metrics
+        self.sent_records = 0
+        self.sent_batches = 0
+        self.reconnects = 0
+        self.latency = None
+        self.max_latency = 0.0
+        # queued data and time each was queued
+        self._queue: Deque[Tuple[memoryview, float]] = collections.deque()
+        # bytes of first queued item that were already sent
+        self._queue_offset = 0
+        self._queue_bytes = 0
+        self._condition = threading.Condition()
+        self._error: Optional[Exception] = None
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
 
     def close(self):
-        """Close socket if open."""
-        if self.socket is not None:
-            try:
-                self.socket.close()
-            finally:
-                self.socket = None
+        """Send queued records, then stop sending and close socket.
+
+        Raises
+        ------
+        TimeseriesFactoryException
+            if queued records cannot be sent, they are discarded.
+        """
+        try:
+            self.flush()
+        finally:
+            with self._condition:
+                self._closing = True
+                self._condition.notify_all()
+                thread, self._thread = self._thread, None
+            if thread is not None:
+                thread.join()
+            _started_clients.discard(self)
+            with self._condition:
+                self._queue.clear()
+                self._queue_offset = 0
+                self._queue_bytes = 0
+                self._error = None
+                self._closing = False
+            self._close_socket()
 
     def connect(self, max_attempts=2):
         """Connect to socket if not already open.
@@ -55,8 +150,9 @@ class MiniSeedInputClient(object):
         while True:
             attempts += 1
             try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.connect((self.host, self.port))
+                s = socket.create_connection(
+                    (self.host, self.port), timeout=self.timeout
+                )
                 break
             except socket.error as e:
                 if attempts >= max_attempts:
@@ -64,23 +160,102 @@ class MiniSeedInputClient(object):
                 print("Unable to connect (%s), trying again" % e, file=sys.stderr)
         self.socket = s
 
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until queued records are sent.
+
+        Parameters
+        ----------
+        timeout: float
+            seconds to wait, or None to wait until sent or failed.
+
+        Raises
+        ------
+        TimeseriesFactoryException
+            if records cannot be sent after retries,
+            or are not sent before timeout.
+            Records stay queued, and are sent again by
+            the next call to send(), flush() or close().
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._retry()
+            while self._queue:
+                self._raise_error()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeseriesFactoryException(
+                        "Timed out sending %d bytes to %s:%s"
+                        % (self._queue_bytes, self.host, self.port)
+                    )
+                self._condition.wait(remaining)
+
+    def get_metrics(self) -> Dict:
+        """Queue depth, sent counts and latency.
+
+        Returns
+        -------
+        dictionary with keys:
+            queue_bytes: bytes waiting to be sent
+            queue_records: records waiting to be sent
+            sent_records: records sent
+            sent_batches: writes used to send records
+            reconnects: number of failed sends
+            latency: seconds from queueing to sending, for last batch
+            max_latency: largest latency
+        """
+        with self._condition:
+            return {
+                "queue_bytes": self._queue_bytes,
+                "queue_records": self._queue_bytes // RECORD_LENGTH,
+                "sent_records": self.sent_records,
+                "sent_batches": self.sent_batches,
+                "reconnects": self.reconnects,
+                "latency": self.latency,
+                "max_latency": self.max_latency,
+            }
+
     def send(self, stream):
-        """Send traces to EDGE in miniseed format.
+        """Queue traces to send to EDGE in miniseed format.
 
         All traces in stream will be converted to MiniSeed, and sent as-is.
+        Returns once records are queued,
+        waiting while the queue has max_queue_bytes.
 
         Parameters
         ----------
         stream: Stream
             stream with trace(s) to send.
+
+        Raises
+        ------
+        TimeseriesFactoryException
+            if the queue is full and records cannot be sent after retries.
         """
-        # connect if needed
-        if self.socket is None:
-            self.connect()
         buf = io.BytesIO()
         self._format_miniseed(stream=stream, buf=buf)
-        # send data
-        self.socket.sendall(buf.getvalue())
+        data = buf.getbuffer()
+        if len(data) == 0:
+            return
+        with self._condition:
+            self._start()
+            self._retry()
+            # always allow one item, so large items do not wait forever
+            while self._queue and self._queue_bytes + len(data) > self.max_queue_bytes:
+                self._raise_error()
+                self._condition.wait()
+            self._queue.append((data, time.monotonic()))
+            self._queue_bytes += len(data)
+            self._condition.notify_all()
+
+    def _close_socket(self):
+        """Close socket if open."""
+        if self.socket is not None:
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+            finally:
+                self.socket = None
 
     def _format_miniseed(self, stream: Stream, buf: BinaryIO) -> io.BytesIO:
         """Processes and writes stream to buffer as miniseed
@@ -95,7 +270,36 @@ class MiniSeedInputClient(object):
         processed = self._pre_process(stream=stream)
         for trace in processed:
             # convert stream to miniseed
-            trace.write(buf, format="MSEED", reclen=512)
+            trace.write(buf, format="MSEED", reclen=RECORD_LENGTH)
+
+    def _get_batch(self) -> List[memoryview]:
+        """Up to batch_bytes of queued data, oldest first.
+
+        Call while holding _condition.
+        """
+        batch = []
+        size = 0
+        offset = self._queue_offset
+        for data, _ in self._queue:
+            part = data[offset : offset + self.batch_bytes - size]
+            offset = 0
+            batch.append(part)
+            size += len(part)
+            if size >= self.batch_bytes:
+                break
+        return batch
+
+    def _is_alive(self) -> bool:
+        """Whether socket is still connected.
+
+        MiniSeedServers do not send data,
+        so a readable socket was closed by the server or has an error.
+        """
+        try:
+            readable, _, _ = select.select([self.socket], [], [], 0)
+            return not readable
+        except (OSError, ValueError):
+            return False
 
     def _pre_process(self, stream: Stream) -> Stream:
         """Encodes and splits streams at daily intervals
@@ -111,5 +315,97 @@ class MiniSeedInputClient(object):
             list of encoded trace split at daily intervals
         """
         stream = encode_stream(stream=stream, encoding=self.encoding)
-        stream = split_stream(stream=stream, size=86400)
+        # encode_stream already copied
+        stream = split_stream(stream=stream, size=86400, copy=False)
         return stream
+
+    def _raise_error(self):
+        """Raise when the sender failed, call while holding _condition."""
+        if self._error is not None:
+            raise TimeseriesFactoryException(
+                "Unable to send %d bytes to %s:%s (%s)"
+                % (self._queue_bytes, self.host, self.port, self._error)
+            ) from self._error
+
+    def _remove_sent(self, size: int, now: float):
+        """Remove size bytes from queue after they were sent.
+
+        Call while holding _condition.
+        """
+        self._queue_bytes -= size
+        # oldest data in batch
+        latency = now - self._queue[0][1]
+        self.latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.sent_records += size // RECORD_LENGTH
+        self.sent_batches += 1
+        size += self._queue_offset
+        while self._queue and len(self._queue[0][0]) <= size:
+            size -= len(self._queue.popleft()[0])
+        self._queue_offset = size
+
+    def _retry(self):
+        """Clear a previous error, so the sender tries again.
+
+        Call while holding _condition.
+        """
+        if self._error is not None:
+            self._error = None
+            self._condition.notify_all()
+
+    def _run(self):
+        """Send queued batches until closed."""
+        while True:
+            with self._condition:
+                while not self._closing and (
+                    not self._queue or self._error is not None
+                ):
+                    self._condition.wait()
+                if not self._queue or self._error is not None:
+                    # closing
+                    return
+                batch = self._get_batch()
+            error = self._send_batch(batch)
+            with self._condition:
+                if error is None:
+                    self._remove_sent(sum(len(b) for b in batch), time.monotonic())
+                else:
+                    self._error = error
+                self._condition.notify_all()
+
+    def _send_batch(self, batch: List[memoryview]) -> Optional[Exception]:
+        """Send one batch, reconnecting and retrying with exponential backoff.
+
+        Returns
+        -------
+        None if sent, otherwise the last error.
+        """
+        data = b"".join(batch)
+        error = None
+        for attempt in range(max(1, self.retries)):
+            if attempt > 0:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                if self.socket is not None and not self._is_alive():
+                    self._close_socket()
+                self.connect(max_attempts=1)
+                self.socket.sendall(data)
+                return None
+            except OSError as e:
+                # records already sent are sent again, edge replaces them
+                print(
+                    "Unable to send to %s:%s (%s), reconnecting"
+                    % (self.host, self.port, e),
+                    file=sys.stderr,
+                )
+                self._close_socket()
+                self.reconnects += 1
+                error = e
+        return error
+
+    def _start(self):
+        """Start sender thread if needed, call while holding _condition."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            _started_clients.add(self)
@@ -8,6 +8,7 @@ from datetime import datetime
 from ..TimeseriesFactoryException import TimeseriesFactoryException
 from ..TimeseriesUtility import round_usecs
 import logging
+import numpy
 from obspy.core import UTCDateTime
 from time import sleep
 
@@ -32,6 +33,7 @@ PACKEHEAD: The code that leads a packet being sent to Edge.
 PACKSTR = "!1H1h12s4h4B3i"
 TAGSTR = "!1H1h12s6i"
 PACKETHEAD = 0xA1B2
+PACKET_HEADER = struct.Struct(PACKSTR)
 
 """
 TAG, FORCEOUT: Flags that indicate to edge that a "data" packet has a specific
@@ -40,6 +42,13 @@ TAG, FORCEOUT: Flags that indicate to edge that a "data" packet has a specific
 TAG = -1
 FORCEOUT = -2
 
+"""
+INT32, INT32_MIN, INT32_MAX: Edge sample type, and the range of sample values.
+"""
+INT32 = numpy.dtype(">i4")
+INT32_MIN = -(2**31)
+INT32_MAX = 2**31 - 1
+
 
 class RawInputClient:
 
@@ -69,6 +78,9 @@ class RawInputClient:
         The data Quality flags per the SEED manual
     timingQuality: int [0-100]
         The overall timing quality
+    pool: RawInputConnectionPool
+        when set, sockets are taken from and returned to pool,
+        and kept open between clients.
 
     Raises
     ------
@@ -92,6 +104,7 @@ class RawInputClient:
         ioclock=0,
         quality=0,
         timingquality=0,
+        pool=None,
     ):
         self.tag = tag
         self.host = host
@@ -100,6 +113,7 @@ class RawInputClient:
         self.ioclock = ioclock
         self.quality = quality
         self.timingquality = timingquality
+        self.pool = pool
 
         self.socket = None
         self.buf = None
@@ -111,9 +125,12 @@ class RawInputClient:
             raise TimeseriesFactoryException("Tag limited to 10 characters")
 
     def close(self):
-        """close the open sockets"""
+        """close the open sockets, or return them to pool"""
         if self.socket is not None:
-            self.socket.close()
+            if self.pool is not None:
+                self.pool.release(self.host, self.port, self._get_tag(), self.socket)
+            else:
+                self.socket.close()
             self.socket = None
 
     def create_seedname(self, observatory, channel, location="R0", network="NT"):
@@ -194,15 +211,15 @@ class RawInputClient:
         else:
             raise TimeseriesFactoryException("Unsupported interval for RawInputClient")
 
+        # convert once, packets are views of data
+        data = self._get_samples(trace.data)
         for i in range(0, totalsamps, nsamp):
             if totalsamps - i < nsamp:
                 endsample = totalsamps
             else:
                 endsample = i + nsamp
             nsamp = endsample - i
-            endtime = starttime + (nsamp - 1) * timeoffset
-            trace_send = trace.slice(starttime, endtime)
-            buf = self._get_data(trace_send.data, starttime, samplerate)
+            buf = self._get_data(data[i:endsample], starttime, samplerate)
             self._send(buf)
             starttime += nsamp * timeoffset
 
@@ -211,15 +228,8 @@ class RawInputClient:
 
         PARAMETERS
         ----------
-        samples: array like
-            An int array with the samples
-        time: UTCDateTime
-            time of the first sample
-        rate: int
-            The data rate in Hertz
-        forceout: boolean
-            indicates the packet to be sent will have a nsamp value of -2,
-            to tell edge to force the data to be written
+        buf: bytes or list of buffers
+            packet to send, lists are sent in order without joining buffers.
 
         Raises
         ------
@@ -230,13 +240,50 @@ class RawInputClient:
         try:
             if self.socket is None:
                 self._open_socket()
-            self.socket.sendall(buf)
+            try:
+                self._sendall(buf)
+            except socket.error:
+                if self.pool is None:
+                    raise
+                # pooled socket may have been closed by the server,
+                # send once more on a new socket
+                self.pool.discard(self.socket)
+                self.socket = None
+                self._open_socket()
+                self._sendall(buf)
             self.sequence += 1
         except socket.error as v:
-            error = "Socket error %d" % v[0]
+            if self.pool is not None and self.socket is not None:
+                self.pool.discard(self.socket)
+                self.socket = None
+            error = "Socket error %s" % v
             sys.stderr.write(error)
             raise TimeseriesFactoryException(error)
 
+    def _sendall(self, buf):
+        """Send all bytes of a packet.
+
+        Lists of buffers are sent with one sendmsg call when possible,
+        so sample data is not copied into a joined packet.
+        """
+        if not isinstance(buf, list):
+            self.socket.sendall(buf)
+            return
+        if not hasattr(self.socket, "sendmsg"):
+            # sendmsg is not available on all platforms
+            for b in buf:
+                self.socket.sendall(b)
+            return
+        buffers = [memoryview(b).cast("B") for b in buf]
+        while buffers:
+            sent = self.socket.sendmsg(buffers)
+            # drop sent bytes, sendmsg may send part of a packet
+            while buffers and sent >= len(buffers[0]):
+                sent -= len(buffers[0])
+                buffers.pop(0)
+            if buffers:
+                buffers[0] = buffers[0][sent:]
+
     def _get_forceout(self, time, rate):
         """
         PARAMETERS
@@ -308,7 +355,8 @@ class RawInputClient:
 
         RETURNS
         -------
-        str
+        list
+            [header bytes, samples as big endian int32 array].
 
         NOTES
         -----
@@ -332,7 +380,8 @@ class RawInputClient:
 
         Notice that we expect the data to already be ints.
         The nsamp parameter is signed. If it's positive we send a data packet.
-
+        Samples are not copied when already big endian int32,
+        the header and samples are sent without joining them.
         """
         nsamp = len(samples)
         if nsamp > 32767:
@@ -343,10 +392,7 @@ class RawInputClient:
         yr, doy, secs, usecs = self._get_time_values(time)
         ratemantissa, ratedivisor = self._get_mantissa_divisor(rate)
 
-        packStr = "%s%d%s" % (PACKSTR, nsamp, "i")
-        bpackStr = str(packStr).encode()
-        buf = struct.pack(
-            bpackStr,
+        header = PACKET_HEADER.pack(
             PACKETHEAD,
             nsamp,
             self.seedname,
@@ -361,10 +407,8 @@ class RawInputClient:
             secs,
             usecs,
             self.sequence,
-            *samples
         )
-
-        return buf
+        return [header, self._get_samples(samples)]
 
     def _get_mantissa_divisor(self, rate):
         """
@@ -391,6 +435,37 @@ class RawInputClient:
 
         return (ratemantissa, ratedivisor)
 
+    def _get_samples(self, samples):
+        """Convert samples to a big endian int32 array.
+
+        PARAMETERS
+        ----------
+        samples: array like
+            integer samples
+
+        RETURNS
+        -------
+        numpy.ndarray
+            samples, not copied when already big endian int32.
+
+        RAISES
+        ------
+        TimeseriesFactoryException
+            if samples are not integers, or are outside the int32 range.
+        """
+        data = numpy.asarray(samples)
+        if data.dtype == INT32:
+            return data
+        if not numpy.issubdtype(data.dtype, numpy.integer):
+            raise TimeseriesFactoryException(
+                "Edge input must be integers, not %s" % data.dtype
+            )
+        if len(data) > 0 and (data.min() < INT32_MIN or data.max() > INT32_MAX):
+            raise TimeseriesFactoryException(
+                "Edge input must be between %d and %d" % (INT32_MIN, INT32_MAX)
+            )
+        return data.astype(INT32)
+
     def _get_tag(self):
         """Get tag struct
 
@@ -450,7 +525,11 @@ class RawInputClient:
         -----
         Loops until a socket is opened, with a 1 second wait between attempts
         Sends tag.
+        When pool is set, sockets are opened by pool.
         """
+        if self.pool is not None:
+            self.socket = self.pool.acquire(self.host, self.port, self._get_tag())
+            return
         done = False
         newsocket = None
         trys = 0
@@ -0,0 +1,127 @@
+"""Pool of open sockets to Edge RawInputServers."""
+
+import select
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..TimeseriesFactoryException import TimeseriesFactoryException
+
+
+class RawInputConnectionPool(object):
+    """Keep sockets to RawInputServers open between writes.
+
+    Each socket sends its tag packet once, when opened,
+    then carries packets for any channel written with the same tag.
+    Sockets are checked before they are reused,
+    and failed connections are retried with exponential backoff.
+
+    Parameters
+    ----------
+    connect_timeout: float
+        seconds to wait for each connection attempt.
+    retries: int
+        number of connection attempts before giving up.
+    backoff: float
+        seconds to wait after the first failed attempt,
+        doubled after each later attempt.
+    max_idle: float
+        sockets idle longer than this many seconds are closed
+        instead of reused.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = 10,
+        retries: int = 4,
+        backoff: float = 1,
+        max_idle: float = 300,
+    ):
+        self.connect_timeout = connect_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_idle = max_idle
+        self.connects = 0
+        self._idle: Dict[Tuple[str, int, bytes], List[Tuple[socket.socket, float]]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str, port: int, tag: bytes) -> socket.socket:
+        """Get an open socket, that has already sent tag.
+
+        Sockets are not shared while acquired,
+        return them with release() or discard().
+
+        Raises
+        ------
+        TimeseriesFactoryException
+            if a socket cannot be opened after retries.
+        """
+        key = (host, port, tag)
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    break
+                sock, released = idle.pop()
+            if time.monotonic() - released < self.max_idle and self._is_alive(sock):
+                return sock
+            sock.close()
+        return self._connect(host, port, tag)
+
+    def release(self, host: str, port: int, tag: bytes, sock: socket.socket):
+        """Return a socket to the pool after a successful send."""
+        with self._lock:
+            self._idle.setdefault((host, port, tag), []).append(
+                (sock, time.monotonic())
+            )
+
+    def discard(self, sock: socket.socket):
+        """Close a socket that failed, instead of returning it to the pool."""
+        try:
+            sock.close()
+        except OSError:
+            pass
+
+    def close(self):
+        """Close all idle sockets."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for sockets in idle.values():
+            for sock, _ in sockets:
+                self.discard(sock)
+
+    def _connect(self, host: str, port: int, tag: bytes) -> socket.socket:
+        """Open a socket and send tag, retrying with exponential backoff."""
+        for attempt in range(self.retries):
+            if attempt > 0:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                sock = socket.create_connection(
+                    (host, port), timeout=self.connect_timeout
+                )
+            except OSError as e:
+                sys.stderr.write(f"Could not connect to {host}:{port}, {e}\n")
+                continue
+            try:
+                sock.sendall(tag)
+            except OSError as e:
+                sys.stderr.write(f"Could not send tag to {host}:{port}, {e}\n")
+                self.discard(sock)
+                continue
+            self.connects += 1
+            return sock
+        raise TimeseriesFactoryException(f"Could not open socket to {host}:{port}")
+
+    def _is_alive(self, sock: socket.socket) -> bool:
+        """Whether an idle socket is still connected.
+
+        RawInputServers do not send data,
+        so a readable socket was closed by the server or has an error.
+        """
+        try:
+            readable, _, _ = select.select([sock], [], [], 0)
+            return not readable
+        except (OSError, ValueError):
+            return False
@@ -7,6 +7,7 @@ from .LocationCode import LocationCode
 from .MiniSeedFactory import MiniSeedFactory
 from .MiniSeedInputClient import MiniSeedInputClient
 from .RawInputClient import RawInputClient
+from .RawInputConnectionPool import RawInputConnectionPool
 from .SNCL import SNCL
 from .LegacySNCL import LegacySNCL
 
@@ -16,6 +17,7 @@ __all__ = [
     "MiniSeedFactory",
     "MiniSeedInputClient",
     "RawInputClient",
+    "RawInputConnectionPool",
     "LegacySNCL",
     "SNCL",
 ]
@@ -57,8 +57,8 @@ class IAGA2002Factory(TimeseriesFactory):
             # no data parsed
             return stream
         metadata = parser.metadata
-        starttime = obspy.core.UTCDateTime(parser.times[0])
-        endtime = obspy.core.UTCDateTime(parser.times[-1])
+        starttime = obspy.core.UTCDateTime(parser.times[0].item())
+        endtime = obspy.core.UTCDateTime(parser.times[-1].item())
         data = parser.data
         length = len(data[list(data)[0]])
         if starttime != endtime:
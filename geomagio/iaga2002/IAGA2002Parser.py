@@ -11,6 +11,13 @@ NINES = numpy.float64("99999")
 # placeholder channel name used when less than 4 channels are being written.
 EMPTY_CHANNEL = "NUL"
 
+# length of a data line, and columns of each value in a data line.
+DATA_LINE_LENGTH = 70
+DATA_VALUE_COLUMNS = ((31, 40), (41, 50), (51, 60), (61, 70))
+# columns of separators and digits in the time of a data line.
+TIME_SEPARATORS = {4: b"-", 7: b"-", 10: b" ", 13: b":", 16: b":", 19: b"."}
+TIME_DIGITS = [i for i in range(23) if i not in TIME_SEPARATORS]
+
 
 class IAGA2002Parser(object):
     """IAGA2002 parser.
@@ -26,8 +33,8 @@ class IAGA2002Parser(object):
         parsed comments.
     channels : array
         parsed channel names.
-    times : array
-        parsed timeseries times.
+    times : numpy.array
+        parsed timeseries times, as ``numpy.datetime64``.
     data : dict
         keys are channel names (order listed in ``self.channels``).
         values are ``numpy.array`` of timeseries values, array values are
@@ -43,7 +50,7 @@ class IAGA2002Parser(object):
         self.comments = []
         # array of channel names
         self.channels = []
-        # timestamps of data (datetime.datetime)
+        # timestamps of data (numpy.array<datetime64[ms]>)
         self.times = []
         # dictionary of data (channel : numpy.array<float64>)
         self.data = {}
@@ -61,23 +68,92 @@ class IAGA2002Parser(object):
         # create parsing time and data arrays
         self._parsedata = ([], [], [], [], [])
 
-        parsing_headers = True
         lines = data.splitlines()
-        for line in lines:
-            if parsing_headers:
-                if line.startswith(" ") and line.endswith("|"):
-                    # still in headers
-                    if line.startswith(" #"):
-                        self._parse_comment(line)
-                    else:
-                        self._parse_header(line)
+        data_lines = []
+        for i, line in enumerate(lines):
+            if line.startswith(" ") and line.endswith("|"):
+                # still in headers
+                if line.startswith(" #"):
+                    self._parse_comment(line)
                 else:
-                    parsing_headers = False
-                    self._parse_channels(line)
+                    self._parse_header(line)
             else:
+                self._parse_channels(line)
+                data_lines = lines[i + 1 :]
+                break
+        if not self._parse_data_block(data_lines):
+            for line in data_lines:
                 self._parse_data(line)
         self._post_process()
 
+    def _parse_data_block(self, lines):
+        """Parse all data lines at once.
+
+        Lines are decoded as one fixed width byte buffer,
+        using numpy operations instead of per line parsing.
+
+        Parameters
+        ----------
+        lines : array_like
+            data lines.
+
+        Returns
+        -------
+        bool
+            True if lines were parsed,
+            False if lines are not fixed width data lines
+            and should be parsed by ``_parse_data``.
+        """
+        if len(lines) == 0:
+            return False
+        width = len(lines[0])
+        if width < DATA_LINE_LENGTH or any(len(line) != width for line in lines):
+            return False
+        try:
+            block = "".join(lines).encode("ascii")
+        except UnicodeEncodeError:
+            return False
+        chars = numpy.frombuffer(block, dtype=numpy.uint8).reshape(len(lines), width)
+        # validate time columns
+        for column, separator in TIME_SEPARATORS.items():
+            if numpy.any(chars[:, column] != ord(separator)):
+                return False
+        digits = chars[:, TIME_DIGITS].astype(numpy.int64) - ord("0")
+        if numpy.any((digits < 0) | (digits > 9)):
+            return False
+
+        def number(*columns):
+            value = numpy.zeros(len(digits), dtype=numpy.int64)
+            for column in columns:
+                value = value * 10 + digits[:, TIME_DIGITS.index(column)]
+            return value
+
+        year, month, day = number(0, 1, 2, 3), number(5, 6), number(8, 9)
+        if numpy.any((month < 1) | (month > 12) | (day < 1) | (day > 31)):
+            return False
+        months = ((year - 1970) * 12 + month - 1).astype("datetime64[M]")
+        days = months.astype("datetime64[D]") + (day - 1)
+        if numpy.any(days.astype("datetime64[M]") != months):
+            # day is not in month
+            return False
+        hour, minute, second = number(11, 12), number(14, 15), number(17, 18)
+        if numpy.any((hour > 23) | (minute > 59) | (second > 59)):
+            # not a valid time, let _parse_data raise the error
+            return False
+        milliseconds = (
+            hour * 3600000 + minute * 60000 + second * 1000 + number(20, 21, 22)
+        )
+        times = days.astype("datetime64[ms]") + milliseconds
+        # values are converted to float64 by _post_process
+        values = [
+            numpy.ascontiguousarray(chars[:, start:end])
+            .view("S{}".format(end - start))
+            .ravel()
+            for start, end in DATA_VALUE_COLUMNS
+        ]
+        self._parsedata = (times, *values)
+        return True
+
     def _parse_header(self, line):
         """Parse header line.
 
@@ -174,7 +250,7 @@ class IAGA2002Parser(object):
         """
         self.comments = self._merge_comments(self.comments)
         self.parse_comments()
-        self.times = self._parsedata[0]
+        self.times = numpy.array(self._parsedata[0], dtype="datetime64[ms]")
         for channel, data in zip(self.channels, self._parsedata[1:]):
             # ignore "empty" channels
             if channel == EMPTY_CHANNEL:
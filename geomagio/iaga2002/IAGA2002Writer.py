@@ -2,7 +2,7 @@ from __future__ import absolute_import
 from builtins import range
 
 from io import BytesIO
-from datetime import datetime
+import itertools
 import numpy
 from os import linesep
 import textwrap
@@ -11,6 +11,11 @@ from ..TimeseriesFactoryException import TimeseriesFactoryException
 from ..Util import create_empty_trace
 from . import IAGA2002Parser
 
+# format of one data line: date time, day of year, and four values
+DATA_LINE_FORMAT = "%s %03d    %9.2f %9.2f %9.2f %9.2f" + linesep
+# number of data lines formatted at once
+DATA_CHUNK_SIZE = 4096
+
 
 class IAGA2002Writer(object):
     """IAGA2002 writer."""
@@ -35,6 +40,27 @@ class IAGA2002Writer(object):
         channels: array_like
             channels to be written from timeseries object
         """
+        for chunk in self._format_chunks(timeseries, channels):
+            out.write(chunk)
+
+    def _format_chunks(self, timeseries, channels):
+        """Format timeseries as chunks of an iaga file.
+
+        Channels are checked before returning,
+        so errors are raised before any output is generated.
+
+        Parameters
+        ----------
+        timeseries: obspy.core.stream
+            timeseries object with data to be written
+        channels: array_like
+            channels to be written from timeseries object
+
+        Returns
+        -------
+        generator
+            yields utf8 encoded headers, then chunks of data lines.
+        """
         for channel in channels:
             if timeseries.select(channel=channel).count() == 0:
                 raise TimeseriesFactoryException(
@@ -44,10 +70,14 @@ class IAGA2002Writer(object):
         stats = timeseries[0].stats
         if len(channels) != 4:
             channels = self._pad_to_four_channels(timeseries, channels)
-        out.write(self._format_headers(stats, channels).encode("utf8"))
-        out.write(self._format_comments(stats).encode("utf8"))
-        out.write(self._format_channels(channels, stats.station).encode("utf8"))
-        out.write(self._format_data(timeseries, channels).encode("utf8"))
+        headers = (
+            self._format_headers(stats, channels)
+            + self._format_comments(stats)
+            + self._format_channels(channels, stats.station)
+        )
+        return itertools.chain(
+            [headers.encode("utf8")], self._format_data_chunks(timeseries, channels)
+        )
 
     def _format_headers(self, stats, channels):
         """format headers for IAGA2002 file
@@ -229,50 +259,58 @@ class IAGA2002Writer(object):
         channels : sequence
             list and order of channel values to output.
         """
-        buf = []
-        if timeseries.select(channel="D"):
-            d = timeseries.select(channel="D")
-            d[0].data = ChannelConverter.get_minutes_from_radians(d[0].data)
-        traces = [timeseries.select(channel=c)[0] for c in channels]
-        starttime = float(traces[0].stats.starttime)
-        delta = traces[0].stats.delta
-        for i in range(len(traces[0].data)):
-            buf.append(
-                self._format_values(
-                    datetime.utcfromtimestamp(starttime + i * delta),
-                    (t.data[i] for t in traces),
-                )
-            )
-        return "".join(buf)
+        return b"".join(self._format_data_chunks(timeseries, channels)).decode("utf8")
+
+    def _format_data_chunks(self, timeseries, channels, chunk_size=DATA_CHUNK_SIZE):
+        """Format data lines in chunks.
 
-    def _format_values(self, time, values):
-        """Format one line of data values.
+        Times and values are computed for a chunk of lines at once,
+        and formatted with one string formatting operation per chunk.
 
         Parameters
         ----------
-        time : datetime
-            timestamp for values
-        values : sequence
+        timeseries : obspy.core.Stream
+            stream containing traces with channel listed in channels
+        channels : sequence
             list and order of channel values to output.
-            if value is NaN, self.empty_value is output in its place.
+            D is converted from radians to minutes,
+            without modifying the trace in timeseries.
+        chunk_size : int
+            number of lines in each chunk.
 
         Returns
         -------
-        unicode
-            Formatted line containing values.
+        generator
+            yields utf8 encoded chunks of formatted lines.
         """
-        tt = time.timetuple()
-        return (
-            "{0.tm_year:0>4d}-{0.tm_mon:0>2d}-{0.tm_mday:0>2d} "
-            "{0.tm_hour:0>2d}:{0.tm_min:0>2d}:{0.tm_sec:0>2d}.{1:0>3d} "
-            "{0.tm_yday:0>3d}   "
-            " {2:9.2f} {3:9.2f} {4:9.2f} {5:9.2f}".format(
-                tt,
-                int(time.microsecond / 1000),
-                *[self.empty_value if numpy.isnan(val) else val for val in values]
+        values = []
+        for channel in channels:
+            data = timeseries.select(channel=channel)[0].data
+            if channel == "D":
+                data = ChannelConverter.get_minutes_from_radians(data)
+            values.append(data)
+        stats = timeseries.select(channel=channels[0])[0].stats
+        length = len(values[0])
+        for start in range(0, length, chunk_size):
+            end = min(start + chunk_size, length)
+            times = TimeseriesUtility.get_sample_times(
+                stats.starttime, stats.delta, start, end
             )
-            + linesep
-        )
+            days = times.astype("datetime64[D]")
+            day_of_year = (
+                days - days.astype("datetime64[Y]").astype("datetime64[D]") + 1
+            )
+            lines = numpy.empty((end - start, 6), dtype=object)
+            lines[:, 0] = numpy.char.replace(
+                numpy.datetime_as_string(times, unit="ms"), "T", " "
+            )
+            lines[:, 1] = day_of_year.astype(numpy.int64)
+            for i, data in enumerate(values):
+                data = numpy.asarray(data[start:end], dtype=numpy.float64)
+                lines[:, i + 2] = numpy.where(numpy.isnan(data), self.empty_value, data)
+            yield (
+                (DATA_LINE_FORMAT * len(lines)) % tuple(lines.ravel().tolist())
+            ).encode("utf8")
 
     def _pad_to_four_channels(self, timeseries, channels):
         padded = channels[:]
@@ -301,3 +339,19 @@ class IAGA2002Writer(object):
         writer = IAGA2002Writer()
         writer.write(out, timeseries, channels)
         return out.getvalue()
+
+    @classmethod
+    def format_chunks(self, timeseries, channels):
+        """Get an IAGA2002 formatted string in chunks.
+
+        Parameters
+        ----------
+        timeseries : obspy.core.Stream
+        channels : array_like
+
+        Returns
+        -------
+        generator
+          yields IAGA2002 formatted bytes, headers first then data lines.
+        """
+        return IAGA2002Writer()._format_chunks(timeseries, channels)
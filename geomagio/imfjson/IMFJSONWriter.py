@@ -8,6 +8,9 @@ import numpy as np
 from .. import ChannelConverter, TimeseriesUtility
 from ..TimeseriesFactoryException import TimeseriesFactoryException
 
+# number of times or values serialized at once
+DATA_CHUNK_SIZE = 4096
+
 
 class IMFJSONWriter(object):
     """JSON writer."""
@@ -31,73 +34,133 @@ class IMFJSONWriter(object):
         TimeseriesFactoryException
             if there is a missing channel.
         """
-        file_dict = OrderedDict()
+        for chunk in self._format_chunks(timeseries, channels, url=url):
+            out.write(chunk)
+
+    def _check_channels(self, timeseries, channels):
+        """Check that all channels are in timeseries.
+
+        Raises
+        ------
+        TimeseriesFactoryException
+            if there is a missing channel.
+        """
         for channel in channels:
             if timeseries.select(channel=channel).count() == 0:
                 raise TimeseriesFactoryException(
                     'Missing channel "%s" for output, available channels %s'
                     % (channel, str(TimeseriesUtility.get_channels(timeseries)))
                 )
+
+    def _format_chunks(
+        self, timeseries, channels, url=None, chunk_size=DATA_CHUNK_SIZE
+    ):
+        """Format timeseries as chunks of a json document.
+
+        Times and values are serialized in chunks,
+        instead of building the whole document first.
+        Channels are checked before returning,
+        so errors are raised before any output is generated.
+
+        Parameters
+        ----------
+        timeseries: obspy.core.stream
+            timeseries object with data to be written
+        channels: array_like
+            channels to be written from timeseries object
+        url: str
+            string with the requested url
+        chunk_size : int
+            number of times or values in each chunk.
+
+        Returns
+        -------
+        generator
+            yields utf8 encoded chunks of json.
+
+        Raises
+        ------
+        TimeseriesFactoryException
+            if there is a missing channel.
+        """
+        self._check_channels(timeseries, channels)
+        metadata = self._format_metadata(timeseries[0].stats, channels)
+        metadata["url"] = url
+        return self._generate_chunks(timeseries, channels, metadata, chunk_size)
+
+    def _generate_chunks(self, timeseries, channels, metadata, chunk_size):
+        """Generator used by ``_format_chunks``."""
         stats = timeseries[0].stats
-        file_dict["type"] = "Timeseries"
-        file_dict["metadata"] = self._format_metadata(stats, channels)
-        file_dict["metadata"]["url"] = url
-        file_dict["times"] = self._format_times(timeseries, channels)
-        file_dict["values"] = self._format_data(timeseries, channels, stats)
-        formatted_timeseries = json.dumps(
-            file_dict, ensure_ascii=True, separators=(",", ":")
+        yield (
+            '{"type":"Timeseries","metadata":%s,"times":[' % _dumps(metadata)
         ).encode("utf8")
-        out.write(formatted_timeseries)
+        trace = timeseries.select(channel=channels[0])[0]
+        length = len(trace.data)
+        for start in range(0, length, chunk_size):
+            end = min(start + chunk_size, length)
+            times = TimeseriesUtility.get_sample_times(
+                trace.stats.starttime, trace.stats.delta, start, end
+            )
+            times = np.char.add(np.datetime_as_string(times, unit="ms"), "Z")
+            yield _format_chunk(start, times.tolist())
+        yield b'],"values":['
+        for i, c in enumerate(channels):
+            trace = timeseries.select(channel=c)[0]
+            value_dict = self._format_value_metadata(trace, c, stats)
+            value_dict["values"] = []
+            # remove closing "]}" so values can be appended
+            yield ((i > 0 and "," or "") + _dumps(value_dict)[:-2]).encode("utf8")
+            series = self._get_series(trace, c)
+            for start in range(0, len(series), chunk_size):
+                yield _format_chunk(start, series[start : start + chunk_size].tolist())
+            yield b"]}"
+        yield b"]}"
 
-    def _format_data(self, timeseries, channels, stats):
-        """Format all data lines.
+    def _format_value_metadata(self, trace, c, stats):
+        """Format id and metadata of one channel.
 
         Parameters
         ----------
-        timeseries : obspy.core.Stream
-            stream containing traces with channel listed in channels
-        channels : sequence
-            list and order of channel values to output.
+        trace : obspy.core.Trace
+            trace for channel
+        c : str
+            channel name
         stats: obspy.core.trace.stats
-            holds the observatory metadata
+            holds the observatory metadata,
+            location is set from data_type when empty.
 
         Returns
         -------
-        array_like
-            an array containing dictionaries of data.
+        dictionary
+            a dictionary containing id and metadata.
         """
-        values = []
-        for c in channels:
-            value_dict = OrderedDict()
-            trace = timeseries.select(channel=c)[0]
-            value_dict["id"] = c
-            value_dict["metadata"] = OrderedDict()
-            metadata = value_dict["metadata"]
-            metadata["element"] = c
-            metadata["network"] = stats.network
-            metadata["station"] = stats.station
-            edge_channel = trace.stats.channel
-            metadata["channel"] = edge_channel
-            if stats.location == "":
-                if stats.data_type == "variation" or stats.data_type == "reported":
-                    stats.location = "R0"
-                elif stats.data_type == "adjusted" or stats.data_type == "provisional":
-                    stats.location = "A0"
-                elif stats.data_type == "quasi-definitive":
-                    stats.location = "Q0"
-                elif stats.data_type == "definitive":
-                    stats.location = "D0"
-            metadata["location"] = stats.location
-            values += [value_dict]
-            series = np.copy(trace.data)
-            if c == "D":
-                series = ChannelConverter.get_minutes_from_radians(series)
-            # Converting numpy array to list required for JSON serialization
-            series = series.tolist()
-            series = [None if str(x) == "nan" else x for x in series]
-            value_dict["values"] = series
-            # TODO: Add flag metadata
-        return values
+        value_dict = OrderedDict()
+        value_dict["id"] = c
+        value_dict["metadata"] = OrderedDict()
+        metadata = value_dict["metadata"]
+        metadata["element"] = c
+        metadata["network"] = stats.network
+        metadata["station"] = stats.station
+        edge_channel = trace.stats.channel
+        metadata["channel"] = edge_channel
+        if stats.location == "":
+            if stats.data_type == "variation" or stats.data_type == "reported":
+                stats.location = "R0"
+            elif stats.data_type == "adjusted" or stats.data_type == "provisional":
+                stats.location = "A0"
+            elif stats.data_type == "quasi-definitive":
+                stats.location = "Q0"
+            elif stats.data_type == "definitive":
+                stats.location = "D0"
+        metadata["location"] = stats.location
+        return value_dict
+
+    def _get_series(self, trace, c):
+        """Get a copy of trace data, with D converted to minutes."""
+        series = np.copy(trace.data)
+        if c == "D":
+            series = ChannelConverter.get_minutes_from_radians(series)
+        return series
 
     def _format_metadata(self, stats, channels):
         """Format metadata for json file and update dictionary
@@ -157,58 +220,34 @@ class IMFJSONWriter(object):
         metadata_dict["generated"] = generated.strftime("%Y-%m-%dT%H:%M:%SZ")
         return metadata_dict
 
-    def _format_times(self, timeseries, channels):
-        """Format times for json file and update dictionary
+    @classmethod
+    def format(self, timeseries, channels, url=None):
+        """Get a json formatted string.
+
+        Calls write() with a BytesIO, and returns the output.
 
         Parameters
         ----------
         timeseries : obspy.core.Stream
             stream containing traces with channel listed in channels
         channels: array_like
-            channels to be reported.
-
-        Returns
-        -------
-        array_like
-            an array containing formatted strings of time data.
-        """
-        times = []
-        traces = [timeseries.select(channel=c)[0] for c in channels]
-        starttime = float(traces[0].stats.starttime)
-        delta = traces[0].stats.delta
-        for i in range(len(traces[0].data)):
-            times.append(
-                self._format_time_string(
-                    datetime.utcfromtimestamp(starttime + i * delta)
-                )
-            )
-        return times
-
-    def _format_time_string(self, time):
-        """Format one datetime object.
-
-        Parameters
-        ----------
-        time : datetime
-            timestamp for values
+            channels to be written from timeseries
+        url: str
+            string with the requested url
 
         Returns
         -------
         unicode
-            formatted time.
+         json formatted string.
         """
-        tt = time.timetuple()
-        return (
-            "{0.tm_year:0>4d}-{0.tm_mon:0>2d}-{0.tm_mday:0>2d}T"
-            "{0.tm_hour:0>2d}:{0.tm_min:0>2d}:{0.tm_sec:0>2d}.{1:0>3d}Z"
-            "".format(tt, int(time.microsecond / 1000))
-        )
+        out = BytesIO()
+        writer = IMFJSONWriter()
+        writer.write(out, timeseries, channels, url=url)
+        return out.getvalue()
 
     @classmethod
-    def format(self, timeseries, channels, url=None):
-        """Get a json formatted string.
-
-        Calls write() with a BytesIO, and returns the output.
+    def format_chunks(self, timeseries, channels, url=None):
+        """Get a json formatted string in chunks.
 
         Parameters
         ----------
@@ -221,10 +260,32 @@ class IMFJSONWriter(object):
 
         Returns
         -------
-        unicode
-         json formatted string.
+        generator
+         yields json formatted bytes, the same as format() when joined.
         """
-        out = BytesIO()
-        writer = IMFJSONWriter()
-        writer.write(out, timeseries, channels, url=url)
-        return out.getvalue()
+        return IMFJSONWriter()._format_chunks(timeseries, channels, url=url)
+
+
+def _dumps(value):
+    """Serialize value as compact json."""
+    return json.dumps(value, ensure_ascii=True, separators=(",", ":"))
+
+
+def _format_chunk(start, values):
+    """Serialize a chunk of a json list, without brackets.
+
+    Parameters
+    ----------
+    start : int
+        index of first value in chunk,
+        chunks after the first are prefixed with a comma.
+    values : list
+        values to serialize, nan values are serialized as null.
+
+    Returns
+    -------
+    bytes
+        utf8 encoded chunk.
+    """
+    chunk = _dumps(values)[1:-1].replace("NaN", "null")
+    return ((start > 0 and "," or "") + chunk).encode("utf8")
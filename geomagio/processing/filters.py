@@ -7,7 +7,9 @@ from ..algorithm import Algorithm, FilterAlgorithm
 from ..Controller import Controller, get_realtime_interval
 from ..geomag_types import DataInterval
 from ..TimeseriesFactory import TimeseriesFactory
+from ..TimeseriesUtility import get_delta_from_interval
 from .factory import get_edge_factory, get_miniseed_factory
+from .pipeline import Pipeline, PipelineDataset
 
 
 class DataFormat(str, Enum):
@@ -124,82 +126,172 @@ def realtime_command(
     realtime_interval: int = Option(600, help="length of update window (in seconds)"),
     update_limit: int = Option(10, help="number of update windows"),
 ):
+    starttime, endtime = get_realtime_interval(realtime_interval)
+    pipeline = get_realtime_pipeline(
+        data_format=data_format, input_host=input_host, output_host=output_host
+    )
+    pipeline.run(
+        observatory=observatory,
+        starttime=starttime,
+        endtime=endtime,
+        realtime=realtime_interval,
+        update_limit=update_limit,
+    )
+
+
+def get_realtime_pipeline(
+    data_format: DataFormat = DataFormat.PCDCP,
+    input_host: str = "127.0.0.1",
+    output_host: str = "127.0.0.1",
+) -> Pipeline:
+    """Pipeline for realtime_command.
+
+    Data written by one stage and used by another is passed in memory,
+    instead of being read back from the output host.
+
+    Parameters:
+    -----------
+    data_format: DataFormat
+        data acquisition system
+    input_host: str
+        host to request data from
+    output_host: str
+        host to write data to
+    """
+    pipeline = Pipeline()
+    miniseed_second = PipelineDataset(
+        get_miniseed_factory(host=output_host), interval="second", sink=True
+    )
+    miniseed_minute = PipelineDataset(
+        get_miniseed_factory(host=output_host), interval="minute", sink=True
+    )
     if data_format == DataFormat.OBSRIO:
-        second_filter(
-            observatory=observatory,
-            input_factory=get_miniseed_factory(
-                host=input_host, convert_channels=("U", "V", "W")
-            ),
-            output_factory=get_miniseed_factory(host=output_host),
-            realtime_interval=realtime_interval,
-            update_limit=update_limit,
+        miniseed_tenhertz = PipelineDataset(
+            get_miniseed_factory(host=input_host, convert_channels=("U", "V", "W")),
+            interval="tenhertz",
         )
-        _copy_channels(
-            observatory=observatory,
-            channels=(
-                ("U", "H"),
-                ("V", "E"),
-                ("W", "Z"),
-                ("F", "F"),
-            ),
-            interval="second",
-            input_factory=get_miniseed_factory(host=input_host),
-            output_factory=get_edge_factory(host=output_host),
-            realtime_interval=realtime_interval,
-            update_limit=update_limit,
+        miniseed_second_input = PipelineDataset(
+            get_miniseed_factory(host=input_host), interval="second"
         )
-        temperature_filter(
-            observatory=observatory,
-            channels=(
-                ("LK1", "UK1"),
-                ("LK2", "UK2"),
-                ("LK3", "UK3"),
-                ("LK4", "UK4"),
-            ),
-            input_factory=get_miniseed_factory(host=input_host),
-            input_interval="second",
-            output_factory=get_edge_factory(host=output_host),
-            output_interval="minute",
-            realtime_interval=realtime_interval,
-            update_limit=update_limit,
+        edge_second = PipelineDataset(
+            get_edge_factory(host=output_host), interval="second", sink=True
+        )
+        edge_minute = PipelineDataset(
+            get_edge_factory(host=output_host), interval="minute", sink=True
+        )
+        _add_filter_stages(
+            pipeline=pipeline,
+            channels=(("U", "U"), ("V", "V"), ("W", "W")),
+            input=miniseed_tenhertz,
+            output=miniseed_second,
+        )
+        _add_copy_stages(
+            pipeline=pipeline,
+            channels=(("U", "H"), ("V", "E"), ("W", "Z")),
+            input=miniseed_second,
+            output=edge_second,
+        )
+        _add_copy_stages(
+            pipeline=pipeline,
+            channels=(("F", "F"),),
+            input=miniseed_second_input,
+            output=edge_second,
+        )
+        _add_filter_stages(
+            pipeline=pipeline,
+            channels=(("LK1", "UK1"), ("LK2", "UK2"), ("LK3", "UK3"), ("LK4", "UK4")),
+            input=miniseed_second_input,
+            output=edge_minute,
+        )
+        _add_filter_stages(
+            pipeline=pipeline,
+            channels=(("U", "U"), ("V", "V"), ("W", "W")),
+            input=miniseed_second,
+            output=miniseed_minute,
+        )
+        _add_filter_stages(
+            pipeline=pipeline,
+            channels=(("F", "F"),),
+            input=miniseed_second_input,
+            output=miniseed_minute,
+        )
+        _add_copy_stages(
+            pipeline=pipeline,
+            channels=(("U", "H"), ("V", "E"), ("W", "Z"), ("F", "F")),
+            input=miniseed_minute,
+            output=edge_minute,
         )
     else:
-        _copy_channels(
-            observatory=observatory,
-            channels=(
-                ("H", "U"),
-                ("E", "V"),
-                ("Z", "W"),
-                ("F", "F"),
+        _add_copy_stages(
+            pipeline=pipeline,
+            channels=(("H", "U"), ("E", "V"), ("Z", "W"), ("F", "F")),
+            input=PipelineDataset(get_edge_factory(host=input_host), interval="second"),
+            output=miniseed_second,
+        )
+        _add_filter_stages(
+            pipeline=pipeline,
+            channels=(("U", "U"), ("V", "V"), ("W", "W"), ("F", "F")),
+            input=miniseed_second,
+            output=miniseed_minute,
+        )
+    return pipeline
+
+
+def _add_filter_stages(
+    pipeline: Pipeline,
+    channels: List[List[str]],
+    input: PipelineDataset,
+    output: PipelineDataset,
+):
+    """Add a stage to filter each channel from input to output interval.
+
+    Parameters:
+    -----------
+    channels: array
+        list of channel conversions
+        format: ((input_channel_1, output_channel_1), ...)
+    """
+    for input_channel, output_channel in channels:
+        pipeline.add_stage(
+            algorithm=FilterAlgorithm(
+                input_sample_period=get_delta_from_interval(input.interval),
+                output_sample_period=get_delta_from_interval(output.interval),
+                inchannels=(input_channel,),
+                outchannels=(output_channel,),
             ),
-            interval="second",
-            input_factory=get_edge_factory(host=input_host),
-            output_factory=get_miniseed_factory(host=output_host),
-            realtime_interval=realtime_interval,
-            update_limit=update_limit,
+            input=input,
+            output=output,
+            input_channels=(input_channel,),
+            output_channels=(output_channel,),
+            rename_output_channel=((input_channel, output_channel),),
         )
-    minute_filter(
-        observatory=observatory,
-        channels=("U", "V", "W", "F"),
-        input_factory=get_miniseed_factory(host=input_host),
-        output_factory=get_miniseed_factory(host=output_host),
-        realtime_interval=realtime_interval,
-        update_limit=update_limit,
-    )
-    if data_format == DataFormat.OBSRIO:
-        _copy_channels(
-            observatory=observatory,
-            channels=(
-                ("U", "H"),
-                ("V", "E"),
-                ("W", "Z"),
-                ("F", "F"),
+
+
+def _add_copy_stages(
+    pipeline: Pipeline,
+    channels: List[List[str]],
+    input: PipelineDataset,
+    output: PipelineDataset,
+):
+    """Add a stage to copy each channel from input to output.
+
+    Parameters:
+    -----------
+    channels: array
+        list of channel conversions
+        format: ((input_channel_1, output_channel_1), ...)
+    """
+    for input_channel, output_channel in channels:
+        pipeline.add_stage(
+            algorithm=Algorithm(
+                inchannels=(input_channel,),
+                outchannels=(output_channel,),
             ),
-            interval="minute",
-            input_factory=get_miniseed_factory(host=input_host),
-            output_factory=get_edge_factory(host=output_host),
-            realtime_interval=realtime_interval,
-            update_limit=update_limit,
+            input=input,
+            output=output,
+            input_channels=(input_channel,),
+            output_channels=(output_channel,),
+            rename_output_channel=((input_channel, output_channel),),
         )
 
 
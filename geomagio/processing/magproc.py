@@ -99,9 +99,10 @@ def write_pcdcp_file(
     template: str = PCDCP_FILE_PATTERN,
     temperatures=False,
 ):
-    PCDCPFactory(
+    factory = PCDCPFactory(
         urlInterval=86400, urlTemplate=template, temperatures=temperatures
-    ).put_timeseries(
+    )
+    factory.put_timeseries(
         timeseries=timeseries,
         starttime=starttime,
         endtime=endtime,
@@ -109,6 +110,8 @@ def write_pcdcp_file(
         interval=interval,
         type="variation",
     )
+    # factories may write in the background, wait so errors are reported
+    factory.flush()
 
 
 def write_temperature_data(
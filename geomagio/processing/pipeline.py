@@ -0,0 +1,351 @@
+"""Run several processing stages, passing timeseries between them in memory."""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy
+from obspy import Stream, UTCDateTime
+
+from .. import IntervalUtility, TimeseriesUtility
+from ..algorithm import Algorithm
+from ..Controller import Controller, UNLIMITED_UPDATE_BLOCK, get_update_windows
+from ..geomag_types import DataInterval
+from ..TimeseriesFactory import TimeseriesFactory
+
+
+class PipelineDataset(TimeseriesFactory):
+    """Timeseries shared by pipeline stages.
+
+    Data read from factory, or written by stages, is kept in memory,
+    so later stages do not read it again.
+    Reads from factory cover the whole range, and all channels,
+    needed by the pipeline, so usually one read is made per run.
+
+    Parameters
+    ----------
+    factory: factory to read data, and write data when sink is True.
+        When None, data only exists in memory.
+    interval: data interval
+    sink: whether data written by stages is also written to factory
+
+    Attributes
+    ----------
+    reads: number of reads from factory
+    """
+
+    def __init__(
+        self,
+        factory: Optional[TimeseriesFactory] = None,
+        interval: DataInterval = "second",
+        sink: bool = False,
+    ):
+        super().__init__(
+            interval=interval, type=factory.type if factory else "variation"
+        )
+        self.factory = factory
+        self.sink = sink
+        self.reads = 0
+        self.clear()
+
+    def clear(self):
+        """Discard data in memory, and the range and channels to read."""
+        self._channels: List[str] = []
+        self._coverage: Dict[Tuple[str, str], numpy.ndarray] = {}
+        self._demand: Optional[Tuple[UTCDateTime, UTCDateTime]] = None
+        self._timeseries = Stream()
+
+    def flush(self):
+        """Wait until data written to factory is written."""
+        if self.sink:
+            self.factory.flush()
+
+    def add_demand(
+        self, starttime: UTCDateTime, endtime: UTCDateTime, channels: List[str]
+    ):
+        """Add a range and channels that stages will read or write."""
+        if self._demand is not None:
+            starttime = min(starttime, self._demand[0])
+            endtime = max(endtime, self._demand[1])
+        self._demand = (starttime, endtime)
+        self._channels.extend(c for c in channels if c not in self._channels)
+
+    def get_timeseries(
+        self,
+        starttime: UTCDateTime,
+        endtime: UTCDateTime,
+        observatory: Optional[str] = None,
+        channels: Optional[List[str]] = None,
+        type: Optional[str] = None,
+        interval: Optional[str] = None,
+        add_empty_channels: bool = True,
+    ) -> Stream:
+        """Get timeseries from memory, reading channels from factory once."""
+        interval = interval or self.interval
+        missing = [
+            channel
+            for channel in channels
+            if not self._is_covered(observatory, channel, starttime, endtime)
+        ]
+        if missing and self.factory is not None:
+            read_start, read_end = starttime, endtime
+            if self._demand is not None:
+                read_start = min(read_start, self._demand[0])
+                read_end = max(read_end, self._demand[1])
+            # read other channels stages need at the same time
+            missing += [
+                channel
+                for channel in self._channels
+                if channel not in missing
+                and not self._is_covered(observatory, channel, read_start, read_end)
+            ]
+            timeseries = self.factory.get_timeseries(
+                starttime=read_start,
+                endtime=read_end,
+                observatory=observatory,
+                channels=missing,
+                type=type,
+                interval=interval,
+            )
+            self.reads += 1
+            self._merge(timeseries)
+            delta = TimeseriesUtility.get_delta_from_interval(interval)
+            for channel in missing:
+                key = (observatory, channel)
+                self._coverage[key] = IntervalUtility.union(
+                    self._coverage.get(key, _EMPTY_INTERVALS),
+                    IntervalUtility.create_intervals(
+                        starts=[read_start.ns],
+                        ends=[read_end.ns],
+                        nexts=[(read_end + delta).ns],
+                    ),
+                )
+        timeseries = Stream()
+        for channel in channels:
+            traces = self._timeseries.select(station=observatory, channel=channel)
+            if len(traces) == 0:
+                if not add_empty_channels:
+                    continue
+                traces = Stream(
+                    TimeseriesUtility.create_empty_trace(
+                        starttime=starttime,
+                        endtime=endtime,
+                        observatory=observatory,
+                        channel=channel,
+                        type=type or self.type,
+                        interval=interval,
+                        network="NT",
+                        station=observatory,
+                        location="",
+                    )
+                )
+            timeseries += traces.slice(starttime, endtime, nearest_sample=False)
+        timeseries.trim(
+            starttime=starttime,
+            endtime=endtime,
+            nearest_sample=False,
+            pad=True,
+            fill_value=numpy.nan,
+        )
+        return timeseries
+
+    def _is_covered(
+        self,
+        observatory: str,
+        channel: str,
+        starttime: UTCDateTime,
+        endtime: UTCDateTime,
+    ) -> bool:
+        """Whether a channel was read from factory for a range."""
+        return IntervalUtility.is_covered(
+            self._coverage.get((observatory, channel), _EMPTY_INTERVALS),
+            starttime,
+            endtime,
+        )
+
+    def put_timeseries(
+        self,
+        timeseries: Stream,
+        starttime: Optional[UTCDateTime] = None,
+        endtime: Optional[UTCDateTime] = None,
+        channels: Optional[List[str]] = None,
+        type: Optional[str] = None,
+        interval: Optional[str] = None,
+    ):
+        """Keep timeseries in memory, and write to factory when sink."""
+        if channels is not None:
+            timeseries = Stream([t for t in timeseries if t.stats.channel in channels])
+        self._merge(timeseries)
+        if self.sink:
+            self.factory.put_timeseries(
+                timeseries=timeseries,
+                starttime=starttime,
+                endtime=endtime,
+                channels=channels,
+                type=type,
+                interval=interval,
+            )
+
+    def _merge(self, timeseries: Stream):
+        """Merge timeseries into memory, samples in timeseries replace gaps."""
+        merged = Stream()
+        for trace in timeseries:
+            existing = self._timeseries.select(
+                station=trace.stats.station, channel=trace.stats.channel
+            )
+            trace = trace.copy()
+            if len(existing) > 0:
+                # stages may set different stats than factory
+                for key in ("network", "location"):
+                    trace.stats[key] = existing[0].stats[key]
+            if trace.data.dtype != numpy.float64:
+                trace.data = trace.data.astype(numpy.float64)
+            merged += trace
+        self._timeseries = TimeseriesUtility.merge_streams(self._timeseries, merged)
+
+
+# intervals array with no intervals
+_EMPTY_INTERVALS = IntervalUtility.create_intervals()
+
+
+class PipelineStage(object):
+    """One step of a pipeline.
+
+    Parameters
+    ----------
+    algorithm: algorithm to run
+    input: dataset to read
+    output: dataset to write
+    input_channels: channels to read
+    output_channels: channels to write
+    rename_output_channel: list of output channel renames
+    """
+
+    def __init__(
+        self,
+        algorithm: Algorithm,
+        input: PipelineDataset,
+        output: PipelineDataset,
+        input_channels: List[str],
+        output_channels: List[str],
+        rename_output_channel: Optional[List[List[str]]] = None,
+    ):
+        self.algorithm = algorithm
+        self.input = input
+        self.output = output
+        self.input_channels = input_channels
+        self.output_channels = output_channels
+        self.rename_output_channel = rename_output_channel
+
+
+class Pipeline(object):
+    """Update outputs of several stages, sharing data in memory.
+
+    Stages run in dependency order, a stage runs after every stage
+    that writes its input dataset.
+    Each stage fills gaps in its output like Controller.run_as_update.
+    Only sink datasets are written to their factories,
+    and each dataset reads all channels stages need from its factory at once.
+    """
+
+    def __init__(self):
+        self.stages: List[PipelineStage] = []
+
+    def add_stage(self, **kwargs) -> PipelineStage:
+        """Add a stage, see PipelineStage for parameters."""
+        stage = PipelineStage(**kwargs)
+        self.stages.append(stage)
+        return stage
+
+    def get_datasets(self) -> List[PipelineDataset]:
+        """Datasets read or written by stages."""
+        datasets = []
+        for stage in self.stages:
+            for dataset in (stage.input, stage.output):
+                if dataset not in datasets:
+                    datasets.append(dataset)
+        return datasets
+
+    def get_ordered_stages(self) -> List[PipelineStage]:
+        """Sort stages so each stage runs after stages that write its input.
+
+        Raises
+        ------
+        ValueError
+            if stages depend on each other.
+        """
+        ordered = []
+        pending = list(self.stages)
+        while pending:
+            ready = [
+                stage
+                for stage in pending
+                if not any(
+                    other.output is stage.input
+                    for other in pending
+                    if other is not stage
+                )
+            ]
+            if not ready:
+                raise ValueError("Pipeline stages depend on each other")
+            ordered.extend(ready)
+            pending = [stage for stage in pending if stage not in ready]
+        return ordered
+
+    def run(
+        self,
+        observatory: str,
+        starttime: UTCDateTime,
+        endtime: UTCDateTime,
+        realtime: int = 600,
+        update_limit: int = 10,
+    ):
+        """Run stages for an observatory.
+
+        Parameters
+        ----------
+        observatory: observatory id
+        starttime: start of newest update window
+        endtime: end of newest update window
+        realtime: number of seconds in realtime interval
+        update_limit: number of update windows
+        """
+        stages = self.get_ordered_stages()
+        datasets = self.get_datasets()
+        for dataset in datasets:
+            dataset.clear()
+        # ranges each dataset is read or written, so reads cover all stages
+        windows = get_update_windows(
+            starttime, endtime, update_limit or UNLIMITED_UPDATE_BLOCK
+        )
+        for stage in stages:
+            stage.output.add_demand(windows[-1][0], endtime, stage.output_channels)
+            input_start, input_end = stage.algorithm.get_input_interval(
+                start=windows[-1][0],
+                end=endtime,
+                observatory=observatory,
+                channels=stage.input_channels,
+            )
+            if input_start is not None and input_end is not None:
+                stage.input.add_demand(input_start, input_end, stage.input_channels)
+        for stage in stages:
+            controller = Controller(
+                inputFactory=stage.input,
+                inputInterval=stage.input.interval,
+                outputFactory=stage.output,
+                outputInterval=stage.output.interval,
+            )
+            controller.run_as_update(
+                algorithm=stage.algorithm,
+                observatory=(observatory,),
+                output_observatory=(observatory,),
+                starttime=starttime,
+                endtime=endtime,
+                input_channels=stage.input_channels,
+                output_channels=stage.output_channels,
+                realtime=realtime,
+                rename_output_channel=stage.rename_output_channel,
+                update_limit=update_limit,
+            )
+        # data is not kept between runs
+        for dataset in datasets:
+            dataset.flush()
+            dataset.clear()
@@ -95,29 +95,17 @@ class Reading(BaseModel):
         data: source of data.
         default_existing: keep existing values if data not found.
         """
-        for measurement in self.measurements:
-            if not measurement.time:
-                continue
-            measurement.h = TimeseriesUtility.get_trace_value(
-                traces=data.select(channel="H"),
-                time=measurement.time,
-                default=default_existing and measurement.h or None,
-            )
-            measurement.e = TimeseriesUtility.get_trace_value(
-                traces=data.select(channel="E"),
-                time=measurement.time,
-                default=default_existing and measurement.e or None,
-            )
-            measurement.z = TimeseriesUtility.get_trace_value(
-                traces=data.select(channel="Z"),
-                time=measurement.time,
-                default=default_existing and measurement.z or None,
-            )
-            measurement.f = TimeseriesUtility.get_trace_value(
-                traces=data.select(channel="F"),
-                time=measurement.time,
-                default=default_existing and measurement.f or None,
+        measurements = [m for m in self.measurements if m.time]
+        times = [m.time for m in measurements]
+        for channel in ("H", "E", "Z", "F"):
+            name = channel.lower()
+            values = TimeseriesUtility.get_trace_values(
+                traces=data.select(channel=channel), times=times
             )
+            for measurement, value in zip(measurements, values.tolist()):
+                if np.isnan(value):
+                    value = default_existing and getattr(measurement, name) or None
+                setattr(measurement, name, value)
 
     @property
     def time(self) -> Optional[UTCDateTime]:
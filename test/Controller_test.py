@@ -1,21 +1,46 @@
 #! /usr/bin/env python
 from geomagio import Controller, TimeseriesFactory
-from geomagio.algorithm import Algorithm
+from geomagio.algorithm import Algorithm, FilterAlgorithm
+from geomagio.edge import EdgeFactory
 
 # needed to read outputs generated by Controller and test data
 from geomagio.iaga2002 import IAGA2002Factory
 
 # needed to emulate geomag.py script
-from geomagio.Controller import _main, parse_args
+from geomagio.Controller import (
+    _main,
+    ControllerTarget,
+    get_daemon_interval,
+    get_input_factory,
+    get_run_chunks,
+    get_targets,
+    main,
+    parse_args,
+    run_pipeline,
+)
 
 # needed to copy SqDistAlgorithm statefile
 from shutil import copy
 
+# needed to patch Controller module, which has the same name as Controller class
+import importlib
+
+# needed to simulate slow reads
+import time
+
+# needed to stop daemon
+import threading
+
+# needed to write worker output
+import sys
+
 # needed to determine a valid (and writable) temp folder
 from tempfile import gettempdir
 
+import numpy
 from numpy.testing import assert_allclose, assert_equal
-from obspy.core import UTCDateTime
+from obspy.core import Stream, Trace, UTCDateTime
+import pytest
 
 
 def test_controller():
@@ -211,3 +236,785 @@ def test_controller_update_sqdist():
     )
     expected = expected_factory.get_timeseries(starttime=starttime1, endtime=endtime6)
     assert_allclose(actual, expected)
+
+
+def test_main_observatory_foreach(tmp_path, capsys, monkeypatch):
+    """Controller_test.test_main_observatory_foreach()
+
+    Exceptions for one observatory are reported, in order,
+    without stopping processing of other observatories.
+    """
+    fake_argv = [
+        "--input",
+        "iaga2002",
+        "--input-url",
+        "file://etc/controller/{obs}{date:%Y%m%d}_XYZF_{t}{i}.{i}",
+        "--observatory",
+        "BOU",
+        "BRW",
+        "--observatory-foreach",
+        "--inchannels",
+        "X",
+        "Y",
+        "--interval",
+        "minute",
+        "--type",
+        "variation",
+        "--starttime",
+        "2018-10-24T00:00:00Z",
+        "--endtime",
+        "2018-10-24T00:09:00Z",
+        "--output",
+        "iaga2002",
+        "--output-url",
+        "file://" + str(tmp_path) + "/{obs}{date:%Y%m%d}_{t}{i}.{i}",
+    ]
+    # run in separate processes
+    main(parse_args(fake_argv + ["--jobs", "2"]))
+    output = IAGA2002Factory().parse_string(
+        (tmp_path / "bou20181024_vmin.min").read_text()
+    )
+    x = output.select(channel="X")[0]
+    assert_equal(numpy.count_nonzero(~numpy.isnan(x.data)), 10)
+    # worker output is labeled
+    err = capsys.readouterr().err
+    assert "BRW: Error reading url" in err
+
+    # errors are isolated
+    def fail_brw(args):
+        if args.observatory == ("BRW",):
+            raise ValueError("brw failed")
+
+    monkeypatch.setattr(
+        importlib.import_module("geomagio.Controller"), "_main", fail_brw
+    )
+    args = parse_args(fake_argv + ["--observatory", "BRW", "BOU", "CMO"])
+    with pytest.raises(SystemExit) as exit:
+        main(args)
+    assert_equal(exit.value.code, 1)
+    assert_equal(
+        capsys.readouterr().err,
+        "Exception processing observatory BRW brw failed\n"
+        + "Exceptions occurred during processing\n",
+    )
+    # args are not modified
+    assert_equal(args.observatory, ("BRW", "BOU", "CMO"))
+
+
+def test_main_observatory_foreach_output(capsys, monkeypatch):
+    """Controller_test.test_main_observatory_foreach_output()
+
+    Output from worker processes is labeled, and written in observatory order.
+    """
+
+    def log(args):
+        (observatory,) = args.observatory
+        print("start", file=sys.stderr)
+        # first observatory finishes last
+        time.sleep(observatory == "BOU" and 0.2 or 0)
+        print("end", file=sys.stderr)
+        if observatory == "BRW":
+            raise ValueError("brw failed")
+
+    monkeypatch.setattr(importlib.import_module("geomagio.Controller"), "_main", log)
+    args = parse_args(
+        [
+            "--input",
+            "iaga2002",
+            "--observatory",
+            "BOU",
+            "BRW",
+            "CMO",
+            "--observatory-foreach",
+            "--jobs",
+            "3",
+            "--output",
+            "iaga2002",
+        ]
+    )
+    with pytest.raises(SystemExit):
+        main(args)
+    assert_equal(
+        capsys.readouterr().err,
+        "BOU: start\nBOU: end\n"
+        + "BRW: start\nBRW: end\n"
+        + "Exception processing observatory BRW brw failed\n"
+        + "CMO: start\nCMO: end\n"
+        + "Exceptions occurred during processing\n",
+    )
+
+
+class SlowFactory(TimeseriesFactory):
+    """Factory that takes longer to read earlier observatories."""
+
+    def __init__(self, delays, errors=()):
+        super().__init__()
+        self.delays = delays
+        self.errors = errors
+
+    def get_timeseries(self, starttime, endtime, observatory, channels, **kwargs):
+        time.sleep(self.delays[observatory])
+        if observatory in self.errors:
+            raise ValueError(observatory + " failed")
+        return Stream(
+            Trace(
+                numpy.ones(3),
+                {
+                    "station": observatory,
+                    "channel": channels[0],
+                    "starttime": starttime,
+                },
+            )
+        )
+
+
+def test_get_input_timeseries_concurrent(capsys):
+    """Controller_test.test_get_input_timeseries_concurrent()
+
+    Observatories are read at once, and traces are in observatory order.
+    """
+    delays = {"BOU": 0.3, "BRW": 0.2, "CMO": 0.1}
+    controller = Controller(SlowFactory(delays), None, Algorithm(), fetchWorkers=3)
+    start = time.perf_counter()
+    timeseries = controller._get_input_timeseries(
+        observatory=("BOU", "BRW", "CMO"),
+        channels=("H",),
+        starttime=UTCDateTime("2020-01-01T00:00:00Z"),
+        endtime=UTCDateTime("2020-01-01T00:02:00Z"),
+    )
+    assert time.perf_counter() - start < 0.5
+    assert_equal([t.stats.station for t in timeseries], ["BOU", "BRW", "CMO"])
+    # first error is raised once all observatories complete, others reported
+    controller._inputFactory = SlowFactory(delays, errors=("BRW", "CMO"))
+    with pytest.raises(ValueError, match="BRW failed"):
+        controller._get_input_timeseries(
+            observatory=("BOU", "BRW", "CMO"),
+            channels=("H",),
+            starttime=UTCDateTime("2020-01-01T00:00:00Z"),
+            endtime=UTCDateTime("2020-01-01T00:02:00Z"),
+        )
+    assert_equal(
+        capsys.readouterr().err, "Exception getting observatory CMO CMO failed\n"
+    )
+
+
+def test_get_input_factory_concurrent_reads():
+    """Controller_test.test_get_input_factory_concurrent_reads()
+
+    Channels are read serially unless concurrent reads are requested.
+    """
+    args = ["--input", "miniseed", "--output", "edge", "--observatory", "BOU"]
+    factory = get_input_factory(parse_args(args))
+    assert_equal(factory.max_concurrent_reads, 1)
+    factory = get_input_factory(parse_args(args + ["--input-concurrent-reads", "4"]))
+    assert_equal(factory.max_concurrent_reads, 4)
+    assert_equal(EdgeFactory().max_concurrent_reads, 1)
+
+
+class MemoryFactory(TimeseriesFactory):
+    """Factory that reads from and writes to a stream, recording calls."""
+
+    def __init__(self, stream=None):
+        super().__init__()
+        self.stream = stream or Stream()
+        self.reads = []
+        self.writes = []
+        # number of writes when flush was called
+        self.flushes = []
+
+    def flush(self):
+        self.flushes.append(len(self.writes))
+
+    def get_timeseries(self, starttime, endtime, observatory, channels, **kwargs):
+        self.reads.append((starttime, endtime))
+        timeseries = Stream(
+            [t for t in self.stream if t.stats.channel in channels]
+        ).slice(starttime, endtime)
+        # pad missing data, like edge and file factories
+        timeseries.trim(starttime, endtime, pad=True, fill_value=numpy.nan)
+        return timeseries.copy()
+
+    def put_timeseries(self, timeseries, starttime=None, endtime=None, **kwargs):
+        self.writes.append((starttime, endtime))
+
+
+def _create_minute_stream(starttime, data):
+    return Stream(
+        Trace(
+            numpy.array(data, dtype=numpy.float64),
+            {"station": "BOU", "channel": "H", "delta": 60, "starttime": starttime},
+        )
+    )
+
+
+def test_run_as_update_plan():
+    """Controller_test.test_run_as_update_plan()
+
+    Output and input are read once, and gaps are filled oldest first.
+    """
+    start = UTCDateTime("2020-01-01T00:00:00Z")
+    # output is missing until 00:52, and after 00:54
+    output_data = numpy.ones(55)
+    output_data[:53] = numpy.nan
+    input_factory = MemoryFactory(_create_minute_stream(start, numpy.ones(60)))
+    output_factory = MemoryFactory(_create_minute_stream(start, output_data))
+    controller = Controller(input_factory, output_factory, Algorithm())
+    controller.run_as_update(
+        observatory=("BOU",),
+        output_observatory=("BOU",),
+        starttime=start + 50 * 60,
+        endtime=start + 59 * 60,
+        input_channels=("H",),
+        output_channels=("H",),
+        input_interval="minute",
+        output_interval="minute",
+        update_limit=3,
+    )
+    # three windows of 9 minutes, oldest starting at 00:32
+    assert_equal(output_factory.reads, [(start + 32 * 60, start + 59 * 60)])
+    assert_equal(input_factory.reads, [(start + 32 * 60, start + 59 * 60)])
+    assert_equal(
+        output_factory.writes,
+        [(start + 32 * 60, start + 52 * 60), (start + 55 * 60, start + 59 * 60)],
+    )
+
+
+def test_run_as_update_old_gap():
+    """Controller_test.test_run_as_update_old_gap()
+
+    Input is only read for gaps in windows that are checked.
+    """
+    start = UTCDateTime("2020-01-01T00:00:00Z")
+    # old gap at 00:35 that cannot be filled, and new gap after 00:56
+    output_data = numpy.ones(60)
+    output_data[35] = numpy.nan
+    output_data[57:] = numpy.nan
+    input_data = numpy.ones(60)
+    input_data[35] = numpy.nan
+    input_factory = MemoryFactory(_create_minute_stream(start, input_data))
+    output_factory = MemoryFactory(_create_minute_stream(start, output_data))
+    controller = Controller(input_factory, output_factory, Algorithm())
+    controller.run_as_update(
+        observatory=("BOU",),
+        output_observatory=("BOU",),
+        starttime=start + 50 * 60,
+        endtime=start + 59 * 60,
+        input_channels=("H",),
+        output_channels=("H",),
+        input_interval="minute",
+        output_interval="minute",
+        update_limit=3,
+    )
+    assert_equal(output_factory.reads, [(start + 32 * 60, start + 59 * 60)])
+    # newest window does not start with a gap, older windows are not checked
+    assert_equal(input_factory.reads, [(start + 57 * 60, start + 59 * 60)])
+    assert_equal(output_factory.writes, [(start + 57 * 60, start + 59 * 60)])
+
+
+def test_run_flush():
+    """Controller_test.test_run_flush()
+
+    Output is flushed once before run and run_as_update return,
+    after writing all chunks or gaps.
+    """
+    start = UTCDateTime("2020-01-01T00:00:00Z")
+    output_data = numpy.ones(60)
+    output_data[10:20] = numpy.nan
+    output_data[30:40] = numpy.nan
+    input_factory = MemoryFactory(_create_minute_stream(start, numpy.ones(60)))
+    output_factory = MemoryFactory(_create_minute_stream(start, output_data))
+    controller = Controller(input_factory, output_factory, Algorithm())
+    kwargs = dict(
+        observatory=("BOU",),
+        starttime=start,
+        endtime=start + 59 * 60,
+        input_channels=("H",),
+        output_channels=("H",),
+        input_interval="minute",
+        output_interval="minute",
+    )
+    controller.run(**kwargs)
+    assert_equal(output_factory.flushes, [1])
+    controller.run(chunk_size=1200, **kwargs)
+    assert_equal(output_factory.flushes, [1, 4])
+    output_factory.writes = []
+    output_factory.flushes = []
+    controller.run_as_update(output_observatory=("BOU",), **kwargs)
+    assert_equal(len(output_factory.writes), 2)
+    assert_equal(output_factory.flushes, [2])
+
+
+class WideAlgorithm(Algorithm):
+    """Algorithm that needs input before and after each output sample."""
+
+    def get_input_interval(self, start, end, observatory=None, channels=None):
+        return start - 5 * 60, end + 5 * 60
+
+
+def test_run_as_update_prefetch():
+    """Controller_test.test_run_as_update_prefetch()
+
+    Input for all gaps is read once, and sliced without copying data.
+    """
+    start = UTCDateTime("2020-01-01T00:00:00Z")
+    # every third output sample is missing
+    output_data = numpy.ones(60)
+    output_data[::3] = numpy.nan
+    input_factory = MemoryFactory(_create_minute_stream(start, numpy.ones(60)))
+    output_factory = MemoryFactory(_create_minute_stream(start, output_data))
+    controller = Controller(input_factory, output_factory, WideAlgorithm())
+    runs, more = controller._get_update_runs(
+        algorithm=controller._algorithm,
+        observatory=("BOU",),
+        output_observatory=("BOU",),
+        windows=[(start + 10 * 60, start + 49 * 60)],
+        input_channels=("H",),
+        output_channels=("H",),
+        input_interval="minute",
+        output_interval="minute",
+    )
+    assert_equal(more, False)
+    assert_equal([run[0] for run in runs], [start + i * 60 for i in range(12, 49, 3)])
+    assert_equal(input_factory.reads, [(start + 7 * 60, start + 53 * 60)])
+    first = runs[0][2][0]
+    assert_equal(first.stats.starttime, start + 7 * 60)
+    assert_equal(first.stats.endtime, start + 17 * 60)
+    # slices share data, but not stats
+    second = runs[1][2][0]
+    assert numpy.shares_memory(first.data, second.data)
+    first.stats.channel = "X"
+    assert_equal(second.stats.channel, "H")
+
+
+def test_run_as_update_pipelined():
+    """Controller_test.test_run_as_update_pipelined()
+
+    Pipelined updates write the same gaps, in the same order.
+    """
+    start = UTCDateTime("2020-01-01T00:00:00Z")
+    output_data = numpy.ones(60)
+    output_data[::3] = numpy.nan
+    writes = []
+    for depth in (0, 2):
+        input_factory = MemoryFactory(_create_minute_stream(start, numpy.ones(60)))
+        output_factory = MemoryFactory(_create_minute_stream(start, output_data))
+        controller = Controller(
+            input_factory, output_factory, WideAlgorithm(), pipelineDepth=depth
+        )
+        controller.run_as_update(
+            observatory=("BOU",),
+            output_observatory=("BOU",),
+            starttime=start,
+            endtime=start + 59 * 60,
+            input_channels=("H",),
+            output_channels=("H",),
+            input_interval="minute",
+            output_interval="minute",
+        )
+        writes.append(output_factory.writes)
+    assert_equal(len(writes[0]), 20)
+    assert_equal(writes[1], writes[0])
+
+
+def test_run_pipeline():
+    """Controller_test.test_run_pipeline()
+
+    Stages overlap, results are in order, and errors stop the pipeline.
+    """
+
+    def read(i):
+        time.sleep(0.1)
+        return i
+
+    def process(i):
+        time.sleep(0.1)
+        return i * 2
+
+    start = time.perf_counter()
+    assert_equal(
+        run_pipeline(range(5), [read, process, read], depth=1), [0, 2, 4, 6, 8]
+    )
+    # 7 steps of 0.1 seconds, instead of 15 one at a time
+    assert time.perf_counter() - start < 1.2
+    processed = []
+
+    def fail(i):
+        if i == 2:
+            raise ValueError("failed")
+        processed.append(i)
+        return i
+
+    with pytest.raises(ValueError, match="failed"):
+        run_pipeline(range(100), [read, fail, read], depth=1)
+    assert_equal(processed, [0, 1])
+
+
+class CountingAlgorithm(Algorithm):
+    """Stateful algorithm that processes from its next starttime."""
+
+    def __init__(self, next_starttime):
+        super().__init__()
+        self.next_starttime = next_starttime
+
+    def get_next_starttime(self):
+        return self.next_starttime
+
+    def process(self, stream):
+        processed = stream.copy()
+        self.next_starttime = processed[0].stats.endtime + processed[0].stats.delta
+        return processed
+
+
+def test_get_run_chunks():
+    """Controller_test.test_get_run_chunks()"""
+    start = UTCDateTime("2020-01-01T00:00:00Z")
+    assert_equal(
+        get_run_chunks(start + 30 * 60, start + 150 * 60, 3600, 60),
+        [
+            (start + 30 * 60, start + 59 * 60),
+            (start + 60 * 60, start + 119 * 60),
+            (start + 120 * 60, start + 150 * 60),
+        ],
+    )
+    # end aligned to chunk is part of last chunk
+    assert_equal(
+        get_run_chunks(start, start + 7200, 3600, 60),
+        [(start, start + 3540), (start + 3600, start + 7200)],
+    )
+
+
+def test_run_chunks():
+    """Controller_test.test_run_chunks()
+
+    Each chunk reads its own input, with padding, and state carries over.
+    """
+    start = UTCDateTime("2020-01-01T00:00:00Z")
+    input_factory = MemoryFactory(_create_minute_stream(start, numpy.ones(60)))
+    output_factory = MemoryFactory()
+    controller = Controller(input_factory, output_factory, WideAlgorithm())
+    controller.run(
+        observatory=("BOU",),
+        starttime=start + 5 * 60,
+        endtime=start + 49 * 60,
+        input_channels=("H",),
+        output_channels=("H",),
+        input_interval="minute",
+        output_interval="minute",
+        chunk_size=1200,
+    )
+    assert_equal(
+        input_factory.reads,
+        [
+            (start, start + 24 * 60),
+            (start + 15 * 60, start + 44 * 60),
+            (start + 35 * 60, start + 54 * 60),
+        ],
+    )
+    assert_equal(
+        output_factory.writes,
+        [
+            (start + 5 * 60, start + 19 * 60),
+            (start + 20 * 60, start + 39 * 60),
+            (start + 40 * 60, start + 49 * 60),
+        ],
+    )
+    # stateful algorithm skips chunks before next starttime
+    input_factory.reads, output_factory.writes = [], []
+    controller._algorithm = CountingAlgorithm(start + 25 * 60)
+    controller.run(
+        observatory=("BOU",),
+        starttime=start,
+        endtime=start + 59 * 60,
+        input_channels=("H",),
+        output_channels=("H",),
+        input_interval="minute",
+        output_interval="minute",
+        chunk_size=1200,
+    )
+    assert_equal(
+        output_factory.writes,
+        [(start + 25 * 60, start + 39 * 60), (start + 40 * 60, start + 59 * 60)],
+    )
+    assert_equal(controller._algorithm.next_starttime, start + 60 * 60)
+
+
+def test_get_daemon_interval():
+    """Controller_test.test_get_daemon_interval()"""
+    now = UTCDateTime("2020-01-01T01:00:30.5Z")
+    end = UTCDateTime("2020-01-01T01:00:00Z")
+    # first run uses realtime interval
+    assert_equal(get_daemon_interval(now, 60, 3600, 60), (end - 3600, end))
+    # later runs only new samples, and catch up after a stall
+    assert_equal(
+        get_daemon_interval(now, 60, 3600, 60, last_endtime=end - 60),
+        (end, end),
+    )
+    assert_equal(
+        get_daemon_interval(now, 60, 3600, 60, last_endtime=end - 7200),
+        (end - 7140, end),
+    )
+    # no new samples
+    start, end = get_daemon_interval(now, 60, 3600, 60, last_endtime=end)
+    assert start > end
+    # update runs check realtime interval
+    assert_equal(
+        get_daemon_interval(now, 60, 3600, 60, last_endtime=end - 60, update=True),
+        (end - 3600, end),
+    )
+
+
+def test_run_daemon():
+    """Controller_test.test_run_daemon()
+
+    Daemon runs new samples until stopped, retrying after errors.
+    """
+    stop = threading.Event()
+
+    class DaemonFactory(MemoryFactory):
+        def get_timeseries(self, starttime, endtime, observatory, channels, **kwargs):
+            self.reads.append((starttime, endtime))
+            if len(self.reads) == 1:
+                raise ValueError("read failed")
+            npts = int(endtime - starttime) + 1
+            return _create_minute_stream(starttime, numpy.ones(npts))
+
+        def put_timeseries(self, timeseries, starttime=None, endtime=None, **kwargs):
+            super().put_timeseries(timeseries, starttime, endtime)
+            if len(self.writes) == 2:
+                stop.set()
+
+    class SavingAlgorithm(Algorithm):
+        saves = 0
+
+        def save_state(self):
+            self.saves += 1
+
+    input_factory = DaemonFactory()
+    output_factory = DaemonFactory()
+    algorithm = SavingAlgorithm()
+    controller = Controller(input_factory, output_factory, algorithm)
+    controller.run_daemon(
+        observatory=("BOU",),
+        output_observatory=("BOU",),
+        realtime=10,
+        cadence=1,
+        input_channels=("H",),
+        output_channels=("H",),
+        input_interval="second",
+        output_interval="second",
+        save_interval=0,
+        stop=stop,
+    )
+    first, retry, second = input_factory.reads
+    # failed interval is run again, then only new samples
+    assert_equal(retry[1] - retry[0], 10)
+    assert first[0] <= retry[0]
+    assert_equal(second[0], retry[1] + 1)
+    assert_equal(output_factory.writes, [retry, second])
+    # saved after each run, and when stopped
+    assert_equal(algorithm.saves, 4)
+
+
+def test_run_daemon_filter(tmp_path):
+    """Controller_test.test_run_daemon_filter()
+
+    Saving state does not stop the daemon, or change filter coefficients.
+    """
+    stop = threading.Event()
+    coeff_filename = tmp_path / "coeffs.json"
+    copy("etc/filter/coeffs.json", coeff_filename)
+    coefficients = coeff_filename.read_text()
+
+    class DaemonFactory(MemoryFactory):
+        def get_timeseries(self, starttime, endtime, observatory, channels, **kwargs):
+            self.reads.append((starttime, endtime))
+            stop.set()
+            npts = int((endtime - starttime) * 10) + 1
+            return Stream(
+                Trace(
+                    numpy.ones(npts),
+                    {
+                        "station": "BOU",
+                        "channel": "H",
+                        "delta": 0.1,
+                        "starttime": starttime,
+                    },
+                )
+            )
+
+    input_factory = DaemonFactory()
+    output_factory = MemoryFactory()
+    algorithm = FilterAlgorithm(
+        coeff_filename=str(coeff_filename),
+        input_sample_period=0.1,
+        output_sample_period=1.0,
+        inchannels=("H",),
+        outchannels=("H",),
+    )
+    controller = Controller(input_factory, output_factory, algorithm)
+    controller.run_daemon(
+        observatory=("BOU",),
+        output_observatory=("BOU",),
+        realtime=10,
+        cadence=1,
+        input_channels=("H",),
+        output_channels=("H",),
+        input_interval="tenhertz",
+        output_interval="second",
+        save_interval=0,
+        stop=stop,
+    )
+    assert_equal(len(input_factory.reads), 1)
+    assert_equal(len(output_factory.writes), 1)
+    assert_equal(coeff_filename.read_text(), coefficients)
+
+
+def test_run_targets():
+    """Controller_test.test_run_targets()
+
+    Input is read once for all targets.
+    """
+    start = UTCDateTime("2020-01-01T00:00:00Z")
+    output_data = numpy.ones(60)
+    output_data[50:] = numpy.nan
+    for update, workers in ((False, 1), (True, 2)):
+        input_factory = MemoryFactory(_create_minute_stream(start, numpy.ones(60)))
+        outputs = [
+            MemoryFactory(_create_minute_stream(start, output_data)) for i in range(2)
+        ]
+        controller = Controller(input_factory, None, Algorithm())
+        controller.run_targets(
+            targets=[
+                ControllerTarget(
+                    Algorithm(inchannels=("H",), outchannels=("H",)), outputs[0]
+                ),
+                ControllerTarget(
+                    WideAlgorithm(inchannels=("H",), outchannels=("H",)), outputs[1]
+                ),
+            ],
+            observatory=("BOU",),
+            output_observatory=("BOU",),
+            starttime=start + 50 * 60,
+            endtime=start + 54 * 60,
+            input_interval="minute",
+            update=update,
+            workers=workers,
+        )
+        # union of input intervals
+        assert_equal(input_factory.reads, [(start + 45 * 60, start + 59 * 60)])
+        for output in outputs:
+            assert_equal(output.writes, [(start + 50 * 60, start + 54 * 60)])
+
+
+def test_get_targets(tmp_path):
+    """Controller_test.test_get_targets()"""
+    targets_file = tmp_path / "targets.json"
+    targets_file.write_text(
+        '[{"algorithm": "xyz", "xyz-to": "geo", "outchannels": ["X", "Y"]},'
+        ' {"algorithm": "dbdt", "output": "iaga2002", "output-stdout": true}]'
+    )
+    args = parse_args(
+        [
+            "--input",
+            "miniseed",
+            "--output",
+            "edge",
+            "--observatory",
+            "BOU",
+            "--targets",
+            str(targets_file),
+        ]
+    )
+    xyz, dbdt = get_targets(args)
+    assert_equal(xyz.name, "xyz")
+    assert_equal(xyz.output_channels, ["X", "Y"])
+    assert_equal(xyz.output_factory.__class__.__name__, "EdgeFactory")
+    assert_equal(dbdt.algorithm.__class__.__name__, "DbDtAlgorithm")
+    assert_equal(dbdt.output_factory.__class__.__name__, "StreamTimeseriesFactory")
+    # command line arguments are not modified
+    assert_equal(args.algorithm, "identity")
+    targets_file.write_text('[{"not-an-option": 1}]')
+    with pytest.raises(ValueError):
+        get_targets(args)
+
+
+def test_get_targets_values(tmp_path):
+    """Controller_test.test_get_targets_values()
+
+    target values are converted and checked like command line values.
+    """
+    targets_file = tmp_path / "targets.json"
+    args = parse_args(
+        [
+            "--input",
+            "miniseed",
+            "--output",
+            "edge",
+            "--observatory",
+            "BOU",
+            "--targets",
+            str(targets_file),
+        ]
+    )
+    targets_file.write_text(
+        '[{"output-port": "7981", "output-host": "host", "no-trim": true,'
+        ' "rename-output-channel": [["X", "H"]]}]'
+    )
+    (target,) = get_targets(args)
+    assert_equal(target.output_factory.write_port, 7981)
+    for config in [
+        '{"output-port": "port"}',
+        '{"algorithm": "nope"}',
+        '{"output": "nope"}',
+        '{"no-trim": "yes"}',
+        '{"outchannels": "X"}',
+        '{"rename-output-channel": [["X"]]}',
+        '{"output-port": 7981, "ouptut-host": "host"}',
+    ]:
+        targets_file.write_text(f"[{config}]")
+        with pytest.raises(ValueError):
+            get_targets(args)
+
+
+def test_main_plan(capsys):
+    """Controller_test.test_main_plan()
+
+    --plan prints reads and writes without reading or writing data.
+    """
+    args = parse_args(
+        [
+            "--input",
+            "miniseed",
+            "--output",
+            "edge",
+            "--observatory",
+            "BOU",
+            "--inchannels",
+            "H",
+            "Z",
+            "--interval",
+            "minute",
+            "--starttime",
+            "2020-01-01T00:00:00Z",
+            "--endtime",
+            "2020-01-01T00:09:00Z",
+            "--update",
+            "--update-limit",
+            "2",
+            "--plan",
+        ]
+    )
+    main(args)
+    out = capsys.readouterr().out.splitlines()
+    assert_equal(
+        out,
+        [
+            "update plan, assuming all output is missing",
+            "read output BOU H,Z minute 2019-12-31T23:51:00.000000Z"
+            + " 2020-01-01T00:09:00.000000Z 38 samples",
+            "read input BOU H,Z minute 2019-12-31T23:51:00.000000Z"
+            + " 2020-01-01T00:09:00.000000Z 38 samples",
+            "write output BOU H,Z minute 2019-12-31T23:51:00.000000Z"
+            + " 2020-01-01T00:09:00.000000Z 38 samples",
+        ],
+    )
@@ -0,0 +1,77 @@
+#! /usr/bin/env python
+from numpy.testing import assert_array_equal, assert_equal
+from obspy.core import UTCDateTime
+
+from geomagio import IntervalUtility
+
+
+def _intervals(*gaps):
+    """Create intervals from [start, end, next] second offsets."""
+    return IntervalUtility.create_intervals(
+        starts=[int(gap[0] * 1e9) for gap in gaps],
+        ends=[int(gap[1] * 1e9) for gap in gaps],
+        nexts=[int(gap[2] * 1e9) for gap in gaps],
+    )
+
+
+def test_from_to_gaps():
+    """IntervalUtility_test.test_from_to_gaps()"""
+    gaps = [
+        [
+            UTCDateTime("2015-01-01T00:00:00Z"),
+            UTCDateTime("2015-01-01T00:00:03Z"),
+            UTCDateTime("2015-01-01T00:00:04Z"),
+        ]
+    ]
+    intervals = IntervalUtility.from_gaps(gaps)
+    assert_equal(intervals.shape, (1, 3))
+    assert_equal(intervals[0, 0], UTCDateTime("2015-01-01T00:00:00Z").ns)
+    assert_equal(IntervalUtility.to_gaps(intervals), gaps)
+    assert_equal(IntervalUtility.from_gaps([]).shape, (0, 3))
+
+
+def test_union():
+    """IntervalUtility_test.test_union()"""
+    merged = IntervalUtility.union(
+        _intervals([1, 3, 4]),
+        _intervals([0, 0, 1], [5, 7, 8], [6, 6, 7]),
+    )
+    assert_array_equal(merged, _intervals([0, 3, 4], [5, 7, 8]))
+    assert_equal(IntervalUtility.union().shape, (0, 3))
+
+
+def test_intersection():
+    """IntervalUtility_test.test_intersection()"""
+    a = _intervals([0, 4, 5], [10, 19, 20])
+    b = _intervals([2, 11, 12], [15, 15, 16], [30, 31, 32])
+    assert_array_equal(
+        IntervalUtility.intersection(a, b),
+        _intervals([2, 4, 5], [10, 11, 12], [15, 15, 16]),
+    )
+    assert_equal(IntervalUtility.intersection(a, _intervals()).shape, (0, 3))
+
+
+def test_get_coverage():
+    """IntervalUtility_test.test_get_coverage()"""
+    intervals = _intervals([0, 4, 5], [10, 19, 20])
+    coverage = IntervalUtility.get_coverage(
+        intervals, UTCDateTime(ns=int(3e9)), UTCDateTime(ns=int(12e9))
+    )
+    assert_equal(coverage, int(4e9))
+
+
+def test_is_covered():
+    """IntervalUtility_test.test_is_covered()"""
+    intervals = _intervals([0, 4, 5], [10, 19, 20])
+    assert_equal(
+        IntervalUtility.is_covered(
+            intervals, UTCDateTime(ns=int(11e9)), UTCDateTime(ns=int(19e9))
+        ),
+        True,
+    )
+    assert_equal(
+        IntervalUtility.is_covered(
+            intervals, UTCDateTime(ns=int(4e9)), UTCDateTime(ns=int(10e9))
+        ),
+        False,
+    )
@@ -0,0 +1,38 @@
+#! /usr/bin/env python
+import subprocess
+import sys
+
+from numpy.testing import assert_equal
+import pytest
+
+from geomagio.LazyRegistry import LazyRegistry
+from geomagio.pcdcp import PCDCPFactory
+
+
+def test_get_item():
+    """LazyRegistry_test.test_get_item()"""
+    registry = LazyRegistry({"pcdcp": "geomagio.pcdcp:PCDCPFactory"})
+    assert_equal(list(registry), ["pcdcp"])
+    assert_equal(len(registry), 1)
+    assert "pcdcp" in registry
+    assert registry["pcdcp"] is PCDCPFactory
+    with pytest.raises(KeyError):
+        registry["other"]
+
+
+def test_controller_imports():
+    """LazyRegistry_test.test_controller_imports()"""
+    # factory packages and slow algorithm dependencies load when used
+    modules = ["geomagio.edge", "geomagio.adjusted", "scipy.signal"]
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; import geomagio.Controller; "
+            + f"print([m for m in {modules!r} if m in sys.modules])",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    assert_equal(result.stdout.strip(), "[]")
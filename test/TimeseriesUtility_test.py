@@ -171,6 +171,37 @@ def test_get_trace_gaps():
     assert_equal(gap[1], UTCDateTime("2015-01-01T00:03:00Z"))
 
 
+def test_get_trace_gap_indices():
+    """TimeseriesUtility_test.test_get_trace_gap_indices()
+
+    confirm that gaps are found as sample index ranges
+    """
+    nan = numpy.nan
+    trace = __create_trace("H", [nan, 1, nan, nan, 0, 1, nan])
+    gaps = TimeseriesUtility.get_trace_gap_indices(trace)
+    assert_equal(gaps.dtype, numpy.int64)
+    assert_array_equal(gaps, [[0, 0], [2, 3], [6, 6]])
+    # no gaps
+    trace = __create_trace("H", [1, 1, 0, 1])
+    assert_equal(TimeseriesUtility.get_trace_gap_indices(trace).shape, (0, 2))
+    # all gap
+    trace = __create_trace("H", [nan, nan, nan])
+    assert_array_equal(TimeseriesUtility.get_trace_gap_indices(trace), [[0, 2]])
+    trace.stats.starttime = UTCDateTime("2015-01-01T00:00:00Z")
+    trace.stats.delta = 0.1
+    gaps = TimeseriesUtility.get_trace_gaps(trace)
+    assert_equal(
+        gaps,
+        [
+            [
+                UTCDateTime("2015-01-01T00:00:00Z"),
+                UTCDateTime("2015-01-01T00:00:00.2Z"),
+                UTCDateTime("2015-01-01T00:00:00.3Z"),
+            ]
+        ],
+    )
+
+
 def test_get_merged_gaps():
     """TimeseriesUtility_test.test_get_merged_gaps()
 
@@ -251,6 +282,27 @@ def test_get_trace_values():
         ),
         4,
     )
+    # many values at once
+    assert_array_equal(
+        TimeseriesUtility.get_trace_values(
+            traces=stream.select(channel="H"),
+            times=[
+                UTCDateTime("2015-01-01T00:00:01Z"),
+                UTCDateTime("2015-01-01T00:00:03Z"),
+                # between samples
+                UTCDateTime("2015-01-01T00:00:01.5Z"),
+                # after end of trace
+                UTCDateTime("2015-01-01T00:00:10Z"),
+            ],
+        ),
+        [1, numpy.nan, numpy.nan, numpy.nan],
+    )
+    # first trace with a sample at each time is used
+    values = TimeseriesUtility.get_trace_values(
+        traces=[stream[1], stream[0]],
+        times=[UTCDateTime("2015-01-01T00:00:01Z")],
+    )
+    assert_array_equal(values, [0])
 
 
 def test_has_all_channels():
@@ -313,6 +365,20 @@ def test_has_any_channels():
     assert_equal(
         TimeseriesUtility.has_any_channels(stream, ["E"], starttime, endtime), False
     )
+    # range inside one of several gaps
+    stream = Stream([__create_trace("H", [nan, 1, nan, nan, nan, 1])])
+    for trace in stream:
+        trace.stats.starttime = UTCDateTime("2015-01-01T00:00:00Z")
+        trace.stats.delta = 1
+    assert_equal(
+        TimeseriesUtility.has_any_channels(
+            stream,
+            ["H"],
+            UTCDateTime("2015-01-01T00:00:02Z"),
+            UTCDateTime("2015-01-01T00:00:04Z"),
+        ),
+        False,
+    )
 
 
 def test_merge_streams():
@@ -376,6 +442,44 @@ def test_merge_streams():
     assert_almost_equal(merged4.select(channel="H")[0].data, [1, 2, 2, 2, 1, 1])
 
 
+def test_merge_streams_unaligned():
+    """TimeseriesUtility_test.test_merge_streams_unaligned()
+
+    confirm merge streams handles aligned and unaligned traces
+    """
+    trace1 = _create_trace([1, numpy.nan, 1], "H", UTCDateTime("2018-01-01"))
+    trace2 = _create_trace([2, 2], "H", UTCDateTime("2018-01-01T00:04:00Z"))
+    merged = TimeseriesUtility.merge_streams(Stream([trace1, trace2]))
+    assert_equal(len(merged), 1)
+    assert_equal(merged[0].stats.starttime, UTCDateTime("2018-01-01"))
+    assert_almost_equal(merged[0].data, [1, numpy.nan, 1, numpy.nan, 2, 2])
+    # input data is not changed
+    assert_almost_equal(trace1.data, [1, numpy.nan, 1])
+    # unaligned traces are merged by obspy, which rounds to nearest sample
+    trace3 = _create_trace([3, 3], "H", UTCDateTime("2018-01-01T00:00:30Z"))
+    merged = TimeseriesUtility.merge_streams(Stream([trace1, trace3]))
+    assert_equal(len(merged), 1)
+    assert_almost_equal(merged[0].data, [1, 3, 3])
+
+
+def test_merge_streams_trim():
+    """TimeseriesUtility_test.test_merge_streams_trim()
+
+    confirm missing samples at start and end are trimmed, like obspy merge
+    """
+    trace1 = _create_trace([numpy.nan, 1], "H", UTCDateTime("2018-01-01"))
+    trace2 = _create_trace(
+        [numpy.nan, numpy.nan, numpy.nan], "H", UTCDateTime("2018-01-01T00:02:00Z")
+    )
+    for merged in (
+        TimeseriesUtility.merge_streams(Stream([trace1, trace2])),
+        TimeseriesUtility._merge_traces(Stream([trace1, trace2])),
+    ):
+        assert_equal(len(merged), 1)
+        assert_equal(merged[0].stats.starttime, UTCDateTime("2018-01-01T00:01:00Z"))
+        assert_almost_equal(merged[0].data, [1])
+
+
 def test_pad_timeseries():
     """TimeseriesUtility_test.test_pad_timeseries()"""
     trace1 = _create_trace([1, 1, 1, 1, 1], "H", UTCDateTime("2018-01-01"))
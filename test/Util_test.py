@@ -1,7 +1,11 @@
 #! /usr/bin/env python
 import os.path
 import shutil
+import sys
+import threading
+import time
 from numpy.testing import assert_equal
+import pytest
 from geomagio import Util
 from obspy.core import UTCDateTime
 
@@ -69,3 +73,58 @@ def test_get_interval__trim():
     endtime = UTCDateTime("2015-01-02T00:00:00Z")
     intervals = Util.get_intervals(starttime, endtime, trim=True)
     assert_equal(intervals[0]["start"], starttime)
+
+
+def test_map_concurrent():
+    """Util_test.test_map_concurrent()"""
+    running = []
+    most_running = []
+    lock = threading.Lock()
+
+    def square(item):
+        with lock:
+            running.append(item)
+            most_running.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(item)
+        if item == 3:
+            raise ValueError("three")
+        return item * item
+
+    assert_equal(
+        Util.map_concurrent(square, [0, 1, 2, 4], max_workers=2), [0, 1, 4, 16]
+    )
+    assert_equal(max(most_running), 2)
+    with pytest.raises(ValueError):
+        Util.map_concurrent(square, range(5), max_workers=5)
+
+
+def test_stdout_to_stderr(capsys):
+    """Util_test.test_stdout_to_stderr()"""
+    inside = threading.Event()
+    done = threading.Event()
+
+    def redirected():
+        with Util.stdout_to_stderr():
+            inside.set()
+            print("redirected")
+            done.wait(5)
+
+    thread = threading.Thread(target=redirected)
+    thread.start()
+    inside.wait(5)
+    # other threads still write to stdout
+    print("not redirected")
+    done.set()
+    thread.join()
+    captured = capsys.readouterr()
+    assert_equal(captured.out, "not redirected\n")
+    assert_equal(captured.err, "redirected\n")
+    # stdout is restored when no thread redirects
+    stdout = sys.stdout
+    with Util.stdout_to_stderr():
+        with Util.stdout_to_stderr():
+            assert sys.stdout is not stdout
+        assert sys.stdout is not stdout
+    assert sys.stdout is stdout
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from numpy.testing import assert_equal
+import pytest
+
+from geomagio.api.ws import app, data
+from geomagio.api.ws.BoundedExecutor import (
+    BoundedExecutor,
+    ServiceUnavailable,
+    get_bounded_executor,
+)
+from geomagio.api.ws.cache import ResponseCache, get_response_cache
+
+
+def test_run():
+    """test.api_test.ws_test.BoundedExecutor_test.test_run()"""
+    executor = BoundedExecutor(max_concurrent=2)
+
+    async def run():
+        return await executor.run(
+            lambda a, b=0: (threading.current_thread(), a + b), 1, b=2
+        )
+
+    thread, result = asyncio.run(run())
+    assert_equal(result, 3)
+    assert thread is not threading.current_thread()
+
+
+def test_run_error():
+    """test.api_test.ws_test.BoundedExecutor_test.test_run_error()"""
+    executor = BoundedExecutor(max_concurrent=1)
+
+    def fail():
+        raise ValueError("backend error")
+
+    with pytest.raises(ValueError):
+        asyncio.run(executor.run(fail))
+
+
+def test_run_rejected():
+    """test.api_test.ws_test.BoundedExecutor_test.test_run_rejected()"""
+    executor = BoundedExecutor(max_concurrent=1, queue_timeout=0.05, retry_after=3)
+
+    async def run():
+        return await asyncio.gather(
+            executor.run(time.sleep, 0.2),
+            executor.run(time.sleep, 0.2),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert_equal(results[0], None)
+    assert isinstance(results[1], ServiceUnavailable)
+    assert_equal(results[1].retry_after, 3)
+
+
+def test_run_timeout():
+    """test.api_test.ws_test.BoundedExecutor_test.test_run_timeout()"""
+    executor = BoundedExecutor(max_concurrent=1, queue_timeout=0.05, timeout=0.05)
+
+    async def run():
+        with pytest.raises(ServiceUnavailable):
+            await executor.run(time.sleep, 0.2)
+        # slot is held until call completes
+        with pytest.raises(ServiceUnavailable):
+            await executor.run(time.sleep, 0)
+        await asyncio.sleep(0.2)
+        return await executor.run(lambda: "done")
+
+    assert_equal(asyncio.run(run()), "done")
+
+
+def test_get_data_timeout(monkeypatch):
+    """test.api_test.ws_test.BoundedExecutor_test.test_get_data_timeout()"""
+
+    def fetch_timeseries(data_factory, query):
+        time.sleep(0.2)
+
+    monkeypatch.setattr(data, "get_data_factory", lambda query: None)
+    monkeypatch.setattr(data, "fetch_timeseries", fetch_timeseries)
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache()
+    app.dependency_overrides[get_bounded_executor] = lambda: BoundedExecutor(
+        timeout=0.05, retry_after=7
+    )
+    try:
+        response = TestClient(app).get("/data/?id=BOU&format=json")
+    finally:
+        app.dependency_overrides.pop(get_response_cache)
+        app.dependency_overrides.pop(get_bounded_executor)
+    assert_equal(response.status_code, 503)
+    assert_equal(response.headers["Retry-After"], "7")
+    assert_equal(response.json()["metadata"]["status"], 503)
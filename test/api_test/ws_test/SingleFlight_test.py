@@ -0,0 +1,199 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from anyio import to_thread
+import numpy
+from numpy.testing import assert_equal
+from obspy import Stream, Trace, UTCDateTime
+import pytest
+from starlette.concurrency import run_in_threadpool
+
+from geomagio.api.ws import data
+from geomagio.api.ws.BoundedExecutor import BoundedExecutor, ServiceUnavailable
+from geomagio.api.ws.DataApiQuery import DataApiQuery
+from geomagio.api.ws.SingleFlight import SingleFlight
+
+STARTTIME = UTCDateTime("2020-01-01T00:00:00Z")
+
+
+def _create_query(**kwargs) -> DataApiQuery:
+    params = {
+        "id": "BOU",
+        "starttime": STARTTIME,
+        "endtime": STARTTIME + 600,
+        "elements": ["H", "E", "Z", "F"],
+    }
+    params.update(kwargs)
+    return DataApiQuery(**params)
+
+
+def _fetch(query: DataApiQuery) -> Stream:
+    timeseries = Stream()
+    npts = int((query.endtime - query.starttime) / 60) + 1
+    for element in query.elements:
+        timeseries += Trace(
+            numpy.arange(npts, dtype=numpy.float64),
+            {"channel": element, "delta": 60, "starttime": query.starttime},
+        )
+    return timeseries
+
+
+def _run_concurrent(single_flight, queries, fetch):
+    """Start leader, then send other queries while it is in flight."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def blocking_fetch(query):
+        calls.append(query)
+        started.set()
+        release.wait(5)
+        return fetch(query)
+
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        leader = executor.submit(
+            single_flight.get_timeseries, queries[0], blocking_fetch
+        )
+        started.wait(5)
+        others = [
+            executor.submit(single_flight.get_timeseries, query, blocking_fetch)
+            for query in queries[1:]
+        ]
+        # wait for others to find the flight
+        while single_flight.coalesced + single_flight.fetched < len(queries):
+            time.sleep(0.01)
+        release.set()
+        futures = [leader] + others
+        return calls, [future.exception() or future.result() for future in futures]
+
+
+def test_get_timeseries_coalesced():
+    """test.api_test.ws_test.SingleFlight_test.test_get_timeseries_coalesced()"""
+    single_flight = SingleFlight()
+    queries = [
+        _create_query(),
+        _create_query(),
+        # contained
+        _create_query(
+            starttime=STARTTIME + 120, endtime=STARTTIME + 240, elements=["Z"]
+        ),
+        # not contained
+        _create_query(data_type="adjusted"),
+    ]
+    calls, results = _run_concurrent(single_flight, queries, _fetch)
+    assert_equal(len(calls), 2)
+    assert_equal(
+        single_flight.get_metrics(), {"coalesced": 2, "fetched": 2, "in_flight": 0}
+    )
+    assert_equal(results[0][0].data, results[1][0].data)
+    # stats are not shared
+    results[0][0].stats.location = "R0"
+    assert_equal(results[1][0].stats.location, "")
+    contained = results[2]
+    assert_equal(len(contained), 1)
+    assert_equal(contained[0].stats.channel, "Z")
+    assert_equal(contained[0].stats.starttime, STARTTIME + 120)
+    assert_equal(contained[0].data, [2, 3, 4])
+
+
+def test_get_timeseries_error():
+    """test.api_test.ws_test.SingleFlight_test.test_get_timeseries_error()"""
+
+    def fetch(query):
+        raise ValueError("backend error")
+
+    single_flight = SingleFlight()
+    calls, results = _run_concurrent(
+        single_flight, [_create_query(), _create_query()], fetch
+    )
+    assert_equal(len(calls), 1)
+    assert_equal([str(result) for result in results], ["backend error"] * 2)
+    # failed flights are not reused
+    with pytest.raises(ValueError):
+        single_flight.get_timeseries(_create_query(), fetch)
+    assert_equal(single_flight.fetched, 2)
+
+
+def _get_data_concurrent(monkeypatch, executor, delay, count=3):
+    """Call data.get_timeseries count times at once, with a slow fetch."""
+    calls = []
+
+    def fetch_timeseries(data_factory, query):
+        calls.append(query)
+        time.sleep(delay)
+        return _fetch(query)
+
+    single_flight = SingleFlight()
+    monkeypatch.setattr(data, "fetch_timeseries", fetch_timeseries)
+    monkeypatch.setattr(data, "single_flight", single_flight)
+
+    async def run():
+        return await asyncio.gather(
+            *[
+                data.get_timeseries(None, _create_query(), executor)
+                for _ in range(count)
+            ],
+            return_exceptions=True,
+        )
+
+    return calls, asyncio.run(run()), single_flight
+
+
+def test_get_data_shared_fetch(monkeypatch):
+    """test.api_test.ws_test.SingleFlight_test.test_get_data_shared_fetch()"""
+    # requests sharing the fetch do not wait for an executor slot
+    executor = BoundedExecutor(max_concurrent=1, queue_timeout=0.05, timeout=5)
+    calls, results, single_flight = _get_data_concurrent(monkeypatch, executor, 0.2)
+    assert_equal(len(calls), 1)
+    assert_equal(single_flight.coalesced, 2)
+    for result in results:
+        assert_equal(result[0].data, results[0][0].data)
+
+
+def test_get_data_shared_timeout(monkeypatch):
+    """test.api_test.ws_test.SingleFlight_test.test_get_data_shared_timeout()"""
+    executor = BoundedExecutor(max_concurrent=1, queue_timeout=0.05, timeout=0.05)
+    calls, results, single_flight = _get_data_concurrent(monkeypatch, executor, 0.3)
+    assert_equal(len(calls), 1)
+    for result in results:
+        assert isinstance(result, ServiceUnavailable)
+    # failed flight is not reused, while the slow fetch completes
+    assert_equal(single_flight.get_metrics()["in_flight"], 0)
+
+
+def test_get_data_waiters_use_no_threads(monkeypatch):
+    """test.api_test.ws_test.SingleFlight_test.test_get_data_waiters_use_no_threads()"""
+    release = threading.Event()
+    calls = []
+
+    def fetch_timeseries(data_factory, query):
+        calls.append(query)
+        release.wait(5)
+        return _fetch(query)
+
+    monkeypatch.setattr(data, "fetch_timeseries", fetch_timeseries)
+    monkeypatch.setattr(data, "single_flight", SingleFlight())
+    executor = BoundedExecutor(max_concurrent=1, queue_timeout=0.05, timeout=5)
+
+    async def run():
+        # more waiting requests than threadpool threads
+        count = to_thread.current_default_thread_limiter().total_tokens + 10
+        requests = [
+            asyncio.ensure_future(data.get_timeseries(None, _create_query(), executor))
+            for _ in range(count)
+        ]
+        await asyncio.sleep(0.1)
+        try:
+            # threadpool is still available while requests wait
+            free = await asyncio.wait_for(run_in_threadpool(lambda: "free"), 1)
+        finally:
+            release.set()
+        return free, await asyncio.gather(*requests)
+
+    free, results = asyncio.run(run())
+    assert_equal(free, "free")
+    assert_equal(len(calls), 1)
+    for result in results:
+        assert_equal(result[0].data, results[0][0].data)
@@ -0,0 +1,231 @@
+from email.utils import formatdate
+import os
+import time
+
+from fastapi.testclient import TestClient
+import numpy
+from numpy.testing import assert_equal
+from obspy import Stream, Trace, UTCDateTime
+import pytest
+
+from geomagio.api.ws import app, data
+from geomagio.api.ws.cache import (
+    IMMUTABLE_MAX_AGE,
+    RECENT_MAX_AGE,
+    CacheEntry,
+    FileResponseCache,
+    MemoryResponseCache,
+    get_cache_key,
+    get_max_age,
+    get_response_cache,
+)
+from geomagio.api.ws.DataApiQuery import DataApiQuery
+
+
+def _create_entry(body: bytes, max_age: int = 60) -> CacheEntry:
+    return CacheEntry(
+        etag="etag",
+        last_modified=time.time(),
+        max_age=max_age,
+        media_type="text/plain",
+        body=body,
+    )
+
+
+def _create_timeseries(starttime: UTCDateTime, values) -> Stream:
+    timeseries = Stream()
+    for channel in ["X", "Y", "Z", "F"]:
+        timeseries += Trace(
+            numpy.array(values, dtype=numpy.float64),
+            {
+                "channel": channel,
+                "delta": 60,
+                "network": "NT",
+                "starttime": starttime,
+                "station": "BOU",
+            },
+        )
+    return timeseries
+
+
+def test_memory_response_cache():
+    """test.api_test.ws_test.cache_test.test_memory_response_cache()"""
+    cache = MemoryResponseCache(max_bytes=10)
+    cache.set("a", _create_entry(b"aaaa"))
+    cache.set("b", _create_entry(b"bbbb"))
+    # use a, so b is least recently used
+    assert_equal(cache.get("a").body, b"aaaa")
+    cache.set("c", _create_entry(b"cccc"))
+    assert_equal(cache.get("b"), None)
+    assert_equal(cache.get("c").body, b"cccc")
+    assert_equal(cache.size, 8)
+    # too large to cache
+    cache.set("d", _create_entry(b"d" * 11))
+    assert_equal(cache.get("d"), None)
+    # expired
+    cache.set("e", _create_entry(b"e", max_age=0))
+    assert_equal(cache.get("e"), None)
+
+
+def test_file_response_cache(tmp_path):
+    """test.api_test.ws_test.cache_test.test_file_response_cache()"""
+    cache = FileResponseCache(directory=str(tmp_path), max_bytes=1024 * 1024)
+    cache.set("a", _create_entry(b"line1\nline2\n"))
+    entry = cache.get("a")
+    assert_equal(entry.body, b"line1\nline2\n")
+    assert_equal(entry.media_type, "text/plain")
+    # shared with other processes
+    assert_equal(
+        FileResponseCache(directory=str(tmp_path), max_bytes=1024 * 1024).get("a").etag,
+        "etag",
+    )
+    # expired entries are removed
+    cache.set("b", _create_entry(b"b", max_age=0))
+    assert_equal(cache.get("b"), None)
+    assert_equal(len(list(tmp_path.iterdir())), 1)
+
+
+def test_file_response_cache_evict(tmp_path):
+    """test.api_test.ws_test.cache_test.test_file_response_cache_evict()"""
+    # entries are about 600 bytes, so two fit
+    cache = FileResponseCache(directory=str(tmp_path), max_bytes=1400)
+    cache.set("a", _create_entry(b"a" * 500))
+    cache.set("b", _create_entry(b"b" * 500))
+    # "a" is least recently used, until it is read
+    os.utime(cache._get_path("a"), (1000, 1000))
+    os.utime(cache._get_path("b"), (2000, 2000))
+    assert_equal(cache.get("a").body, b"a" * 500)
+    cache.set("c", _create_entry(b"c" * 500))
+    assert_equal(cache.get("b"), None)
+    assert_equal(cache.get("a").body, b"a" * 500)
+    assert_equal(cache.get("c").body, b"c" * 500)
+    assert cache.size <= 1400
+    # size of existing files is included
+    assert_equal(FileResponseCache(str(tmp_path), max_bytes=1400).size, cache.size)
+    # too large to cache
+    cache.set("d", _create_entry(b"d" * 1400))
+    assert_equal(cache.get("d"), None)
+
+
+def test_cache_entry_is_not_modified():
+    """test.api_test.ws_test.cache_test.test_cache_entry_is_not_modified()"""
+    entry = _create_entry(b"", max_age=60)
+    headers = entry.get_headers()
+    assert_equal(headers["Cache-Control"], "max-age=60")
+    assert_equal(entry.is_not_modified({"if-none-match": '"etag"'}), True)
+    assert_equal(entry.is_not_modified({"if-none-match": '"other"'}), False)
+    assert_equal(
+        entry.is_not_modified({"if-modified-since": headers["Last-Modified"]}), True
+    )
+    assert_equal(
+        entry.is_not_modified({"if-modified-since": "Thu, 01 Jan 1970 00:00:00 GMT"}),
+        False,
+    )
+
+
+def test_get_max_age():
+    """test.api_test.ws_test.cache_test.test_get_max_age()"""
+    now = UTCDateTime("2020-06-01T00:00:00Z")
+    starttime = UTCDateTime("2019-01-01T00:00:00Z")
+    complete = _create_timeseries(starttime, [1, 2, 3])
+    gaps = _create_timeseries(starttime, [1, numpy.nan, 3])
+
+    def query(starttime, data_type):
+        return DataApiQuery(
+            id="BOU",
+            starttime=starttime,
+            endtime=starttime + 120,
+            data_type=data_type,
+        )
+
+    # recent data
+    assert_equal(get_max_age(query(now, "definitive"), complete, now), RECENT_MAX_AGE)
+    # older data
+    assert_equal(get_max_age(query(now - 7 * 86400, "variation"), complete, now), 3600)
+    assert_equal(get_max_age(query(starttime, "variation"), complete, now), 86400)
+    # older complete definitive data
+    assert_equal(
+        get_max_age(query(starttime, "definitive"), complete, now), IMMUTABLE_MAX_AGE
+    )
+    assert_equal(get_max_age(query(starttime, "Q0"), complete, now), IMMUTABLE_MAX_AGE)
+    assert_equal(get_max_age(query(starttime, "definitive"), gaps, now), 86400)
+
+
+def test_get_cache_key():
+    """test.api_test.ws_test.cache_test.test_get_cache_key()"""
+    starttime = UTCDateTime("2020-01-01T00:00:00Z")
+    key = get_cache_key(DataApiQuery(id="BOU", starttime=starttime, elements=["X,Y"]))
+    assert_equal(
+        key,
+        get_cache_key(DataApiQuery(id="BOU", starttime=starttime, elements=["X", "Y"])),
+    )
+    assert key != get_cache_key(
+        DataApiQuery(id="BOU", starttime=starttime, elements=["X", "Y"], format="json")
+    )
+
+
+@pytest.fixture()
+def cached_client(monkeypatch):
+    calls = []
+
+    def fetch_timeseries(data_factory, query):
+        calls.append(query)
+        return _create_timeseries(query.starttime, [1, 2, 3])
+
+    monkeypatch.setattr(data, "get_data_factory", lambda query: None)
+    monkeypatch.setattr(data, "fetch_timeseries", fetch_timeseries)
+    cache = MemoryResponseCache(max_bytes=1024 * 1024)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    yield TestClient(app), calls
+    app.dependency_overrides.pop(get_response_cache)
+
+
+def test_get_data_cached(cached_client):
+    """test.api_test.ws_test.cache_test.test_get_data_cached()"""
+    client, calls = cached_client
+    url = "/data/?id=BOU&starttime=2019-01-01T00:00:00Z&endtime=2019-01-01T00:02:00Z"
+    response = client.get(url)
+    assert_equal(response.status_code, 200)
+    assert_equal(response.headers["Cache-Control"], "max-age=86400")
+    etag = response.headers["ETag"]
+    # served from cache
+    cached = client.get(url)
+    assert_equal(cached.content, response.content)
+    assert_equal(cached.headers["ETag"], etag)
+    assert_equal(len(calls), 1)
+    # conditional request
+    not_modified = client.get(url, headers={"If-None-Match": etag})
+    assert_equal(not_modified.status_code, 304)
+    assert_equal(not_modified.content, b"")
+    assert_equal(len(calls), 1)
+
+
+def test_get_data_expired_not_modified(monkeypatch):
+    """test.api_test.ws_test.cache_test.test_get_data_expired_not_modified()"""
+    calls = []
+
+    def fetch_timeseries(data_factory, query):
+        calls.append(query)
+        return _create_timeseries(query.starttime, [1, 2, 3])
+
+    monkeypatch.setattr(data, "get_data_factory", lambda query: None)
+    monkeypatch.setattr(data, "fetch_timeseries", fetch_timeseries)
+    cache = MemoryResponseCache(max_bytes=1024 * 1024)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+    try:
+        client = TestClient(app)
+        url = "/data/?id=BOU&starttime=2019-01-01T00:00:00Z"
+        response = client.get(url)
+        # fetched two days ago, and expired
+        (entry,) = cache._entries.values()
+        entry.last_modified -= 2 * 86400
+        entry.created -= 2 * 86400
+        last_modified = formatdate(entry.last_modified, usegmt=True)
+        not_modified = client.get(url, headers={"If-Modified-Since": last_modified})
+    finally:
+        app.dependency_overrides.pop(get_response_cache)
+    # fetched again, with the same content
+    assert_equal(len(calls), 2)
+    assert_equal(not_modified.status_code, 304)
+    assert_equal(not_modified.headers["Last-Modified"], last_modified)
+    assert_equal(not_modified.headers["ETag"], response.headers["ETag"])
@@ -1,5 +1,8 @@
 """Tests for MiniSeedFactory.py"""
+import importlib
 import io
+import threading
+import time
 from typing import List
 
 import numpy
@@ -16,11 +19,15 @@ from .mseed_test_clients import MockMiniSeedClient, MisalignedMiniSeedClient
 class MockMiniSeedInputClient(object):
     def __init__(self):
         self.close_called = False
+        self.flush_called = False
         self.last_sent = None
 
     def close(self):
         self.close_called = True
 
+    def flush(self, timeout=None):
+        self.flush_called = True
+
     def send(self, stream):
         self.last_sent = stream
 
@@ -131,8 +138,11 @@ def test__put_timeseries():
     factory = MiniSeedFactory()
     factory.write_client = client
     factory.put_timeseries(Stream(trace1), channels=("H"))
-    # put timeseries should call close when done
-    assert_equal(client.close_called, True)
+    # put timeseries returns once queued, client stays open
+    assert_equal(client.close_called, False)
+    assert_equal(client.flush_called, False)
+    factory.flush()
+    assert_equal(client.flush_called, True)
     # trace should be split in 2 blocks at gap
     sent = client.last_sent
     assert_equal(len(sent), 2)
@@ -314,3 +324,99 @@ def _get_expected_calulated(channel_metadata: List[dict], npts: int) -> numpy.ar
     volts = (numpy.ones(npts) * volt_metadata["scale"]) + volt_metadata["offset"]
     bins = (numpy.ones(npts) * bin_metadata["scale"]) + bin_metadata["offset"]
     return volts + bins
+
+
+def test_get_timeseries_concurrent():
+    """test.edge_test.MiniSeedFactory_test.test_get_timeseries_concurrent()"""
+
+    class SlowMiniSeedClient(MockMiniSeedClient):
+        def __init__(self):
+            super().__init__()
+            self.lock = threading.Lock()
+            self.running = 0
+            self.most_running = 0
+
+        def get_waveforms(self, *args):
+            with self.lock:
+                self.running += 1
+                self.most_running = max(self.most_running, self.running)
+            time.sleep(0.05)
+            with self.lock:
+                self.running -= 1
+            return super().get_waveforms(*args)
+
+    channels = ["H", "E", "Z", "F", "UK1", "UK2"]
+    timeseries = []
+    for max_concurrent_reads in [1, 3]:
+        factory = MiniSeedFactory(max_concurrent_reads=max_concurrent_reads)
+        factory.client = SlowMiniSeedClient()
+        timeseries.append(
+            factory.get_timeseries(
+                UTCDateTime(2015, 3, 1, 0, 0, 0),
+                UTCDateTime(2015, 3, 1, 1, 0, 0),
+                "BOU",
+                channels,
+                "variation",
+                "minute",
+            )
+        )
+        assert_equal(factory.client.most_running, max_concurrent_reads)
+    serial, concurrent = timeseries
+    # same order and stats as serial reads
+    assert_equal([trace.stats.channel for trace in concurrent], channels)
+    for serial_trace, concurrent_trace in zip(serial, concurrent):
+        assert_equal(concurrent_trace.stats, serial_trace.stats)
+        assert_array_equal(concurrent_trace.data, serial_trace.data)
+
+
+def test_get_timeseries_convert_channels(monkeypatch):
+    """test.edge_test.MiniSeedFactory_test.test_get_timeseries_convert_channels()"""
+
+    class CountingMiniSeedClient(MockMiniSeedClient):
+        def __init__(self):
+            super().__init__()
+            self.requests = []
+
+        def get_waveforms(self, network, station, location, channel, *args):
+            self.requests.append(channel)
+            return super().get_waveforms(network, station, location, channel, *args)
+
+    starttime = UTCDateTime("2021-09-07")
+    endtime = UTCDateTime("2021-09-07T00:10:00Z")
+    # configuration changes during request
+    metadata = get_instrument(observatory="SHU")
+    change = starttime + 300
+    epochs = [
+        {**metadata[0], "end_time": change},
+        {**metadata[0], "start_time": change},
+    ]
+    monkeypatch.setattr(
+        importlib.import_module("geomagio.edge.MiniSeedFactory"),
+        "get_instrument",
+        lambda observatory, start, end: get_instrument(observatory, start, end, epochs),
+    )
+    factory = MiniSeedFactory(convert_channels=("U", "V", "W"))
+    factory.client = CountingMiniSeedClient()
+    timeseries = factory.get_timeseries(
+        starttime=starttime,
+        endtime=endtime,
+        observatory="SHU",
+        channels=("U", "V", "W"),
+        type="variation",
+        interval="tenhertz",
+    )
+    # each component is read once, for both configurations
+    assert_equal(len(factory.client.requests), 6)
+    assert_equal(len(set(factory.client.requests)), 6)
+    # one trace for each channel and configuration
+    assert_equal(
+        [trace.stats.channel for trace in timeseries], ["U", "U", "V", "V", "W", "W"]
+    )
+    for trace in timeseries:
+        # each trace is padded to request, 5 minutes of 10Hz data in each
+        data = trace.data[~numpy.isnan(trace.data)]
+        expected = _get_expected_calulated(
+            channel_metadata=metadata[0]["instrument"]["channels"][trace.stats.channel],
+            npts=3001,
+        )
+        assert_array_equal(data, expected)
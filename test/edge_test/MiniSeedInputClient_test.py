@@ -0,0 +1,128 @@
+"""Tests for MiniSeedInputClient.py"""
+import io
+import socket
+import subprocess
+import sys
+import time
+
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import read, Stream, Trace, UTCDateTime
+import pytest
+
+from geomagio.edge import MiniSeedInputClient
+from geomagio.TimeseriesFactoryException import TimeseriesFactoryException
+
+from .recording_server import RecordingServer, wait_for
+
+
+def _create_stream(channels, npts=86400 * 2 + 1):
+    stream = Stream()
+    for channel in channels:
+        stream += Trace(
+            numpy.arange(npts, dtype=numpy.float64),
+            {
+                "channel": channel,
+                "delta": 1,
+                "network": "NT",
+                "starttime": UTCDateTime("2020-01-01T00:00:00Z"),
+                "station": "BOU",
+            },
+        )
+    return stream
+
+
+def _unused_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_send_batches():
+    """edge_test.MiniSeedInputClient_test.test_send_batches()"""
+    stream = _create_stream(["LFH", "LFE"])
+    expected = io.BytesIO()
+    with RecordingServer() as server:
+        client = MiniSeedInputClient("127.0.0.1", server.port, batch_bytes=64 * 512)
+        client._format_miniseed(stream=stream, buf=expected)
+        client.send(stream)
+        client.flush()
+        metrics = client.get_metrics()
+        # 758 records per channel per day, records from both channels combined
+        assert_equal(metrics["queue_bytes"], 0)
+        assert_equal(metrics["sent_records"], 3032)
+        assert_equal(metrics["sent_batches"], 48)
+        assert metrics["latency"] is not None
+        client.close()
+        wait_for(lambda: len(b"".join(server.received)) == 3032 * 512)
+    received = b"".join(server.received)
+    assert_equal(received, expected.getvalue())
+    received = read(io.BytesIO(received))
+    assert_equal(sorted(trace.stats.channel for trace in received), ["LFE", "LFH"])
+
+
+def test_send_reconnect():
+    """edge_test.MiniSeedInputClient_test.test_send_reconnect()"""
+    with RecordingServer() as server:
+        client = MiniSeedInputClient("127.0.0.1", server.port)
+        client.send(_create_stream(["LFH"], npts=10))
+        client.flush()
+        wait_for(lambda: len(server.connections) == 1)
+        # server closes socket between sends
+        server.close_connections()
+        time.sleep(0.05)
+        client.send(_create_stream(["LFE"], npts=10))
+        client.flush()
+        wait_for(lambda: len(server.connections) == 2)
+        assert_equal(len(server.connections), 2)
+        client.close()
+        wait_for(lambda: len(b"".join(server.received)) == 2 * 512)
+    received = read(io.BytesIO(b"".join(server.received)))
+    assert_equal([trace.stats.channel for trace in received], ["LFH", "LFE"])
+
+
+def test_send_error():
+    """edge_test.MiniSeedInputClient_test.test_send_error()"""
+    client = MiniSeedInputClient(
+        "127.0.0.1", _unused_port(), max_queue_bytes=512, retries=2, backoff=0.01
+    )
+    # queued, without waiting for send
+    client.send(_create_stream(["LFH"], npts=10))
+    # queue is full, raises after retries fail
+    with pytest.raises(TimeseriesFactoryException):
+        client.send(_create_stream(["LFE"], npts=10))
+    with pytest.raises(TimeseriesFactoryException):
+        client.flush()
+    # records are kept to send again
+    metrics = client.get_metrics()
+    assert_equal(metrics["queue_records"], 1)
+    assert_equal(metrics["sent_records"], 0)
+    assert metrics["reconnects"] >= 4
+    # close discards records that cannot be sent
+    with pytest.raises(TimeseriesFactoryException):
+        client.close()
+    assert_equal(client.get_metrics()["queue_records"], 0)
+
+
+def test_send_exit():
+    """edge_test.MiniSeedInputClient_test.test_send_exit()"""
+    expected = io.BytesIO()
+    MiniSeedInputClient(host=None)._format_miniseed(
+        stream=_create_stream(["LFH"], npts=86400 * 5), buf=expected
+    )
+    with RecordingServer() as server:
+        # queued records are sent before the process exits, without flush
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "from test.edge_test.MiniSeedInputClient_test import _create_stream; "
+                + "from geomagio.edge import MiniSeedFactory; "
+                + f"factory = MiniSeedFactory(host='127.0.0.1', write_port={server.port}); "
+                + "factory.put_timeseries(_create_stream(['H'], npts=86400 * 5), "
+                + "channels=['H'], type='variation', interval='second')",
+            ],
+            check=True,
+        )
+        wait_for(lambda: len(b"".join(server.received)) >= len(expected.getvalue()))
+    assert_equal(len(b"".join(server.received)), len(expected.getvalue()))
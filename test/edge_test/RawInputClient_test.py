@@ -3,9 +3,14 @@
 import numpy
 from datetime import datetime
 import logging
+import socket
+import struct
+import threading
 from obspy.core import Stats, Trace, UTCDateTime
 from geomagio.edge import EdgeFactory, RawInputClient
+from geomagio.TimeseriesFactoryException import TimeseriesFactoryException
 from numpy.testing import assert_equal
+import pytest
 
 
 class MockRawInputClient(RawInputClient):
@@ -134,3 +139,65 @@ def test__get_time_values(caplog):
     assert_equal(usecs, 232000)
     # assert if previous test does not generate a warning message
     assert_equal(len(caplog.messages), 0)
+
+
+def test__get_data():
+    """edge_test.RawInputClient_test.test__get_data()"""
+    client = RawInputClient(
+        tag="tag", station="BOU", channel="MVH", location="R0", network="NT"
+    )
+    samples = numpy.array([-2, -1, 0, 1, 2, 2**31 - 1], dtype=numpy.int64)
+    header, data = client._get_data(samples, UTCDateTime("2019-12-01"), 1.0 / 60)
+    # same packet as packing header and samples with struct
+    expected = struct.pack(
+        "!1H1h12s4h4B3i6i",
+        0xA1B2,
+        len(samples),
+        b"NTBOU  MVHR0",
+        2019,
+        335,
+        -60,
+        1,
+        0,
+        0,
+        0,
+        0,
+        0,
+        0,
+        0,
+        *samples,
+    )
+    assert_equal(header + data.tobytes(), expected)
+
+
+def test__get_data_invalid():
+    """edge_test.RawInputClient_test.test__get_data_invalid()"""
+    client = RawInputClient(
+        tag="tag", station="BOU", channel="MVH", location="R0", network="NT"
+    )
+    time = UTCDateTime("2019-12-01")
+    # outside int32 range, instead of wrapping
+    for samples in ([0, 2**31 + 5], [-(2**31) - 1, 0]):
+        with pytest.raises(TimeseriesFactoryException):
+            client._get_data(numpy.array(samples, dtype=numpy.int64), time, 1.0)
+    # floats are not truncated
+    with pytest.raises(TimeseriesFactoryException):
+        client._get_data(numpy.array([1.5, 2.0]), time, 1.0)
+
+
+def test__sendall():
+    """edge_test.RawInputClient_test.test__sendall()"""
+    client = RawInputClient(tag="tag")
+    client.socket, receiver = socket.socketpair()
+    # larger than socket buffers, so sendmsg sends part of the packet
+    data = numpy.arange(1_000_000, dtype=">i4")
+    received = []
+    thread = threading.Thread(
+        target=lambda: received.extend(iter(lambda: receiver.recv(65536), b""))
+    )
+    thread.start()
+    client._sendall([b"header", data])
+    client.close()
+    thread.join()
+    receiver.close()
+    assert_equal(b"".join(received), b"header" + data.tobytes())
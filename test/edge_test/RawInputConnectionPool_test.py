@@ -0,0 +1,75 @@
+"""Tests for RawInputConnectionPool.py"""
+import socket
+import time
+
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import Stream, Trace, UTCDateTime
+import pytest
+
+from geomagio.edge import EdgeFactory, RawInputConnectionPool
+from geomagio.TimeseriesFactoryException import TimeseriesFactoryException
+
+from .recording_server import RecordingServer, wait_for
+
+
+def _create_timeseries(channels):
+    timeseries = Stream()
+    for channel in channels:
+        timeseries += Trace(
+            numpy.arange(10, dtype=numpy.float64),
+            {
+                "channel": channel,
+                "delta": 60,
+                "starttime": UTCDateTime("2020-01-01T00:00:00Z"),
+                "station": "BOU",
+            },
+        )
+    return timeseries
+
+
+def test_put_timeseries():
+    """edge_test.RawInputConnectionPool_test.test_put_timeseries()"""
+    channels = ["H", "E", "Z", "F"]
+    with RecordingServer() as server:
+        factory = EdgeFactory(
+            host="127.0.0.1",
+            write_port=server.port,
+            tag="test",
+            forceout=True,
+            type="variation",
+            interval="minute",
+        )
+        for _ in range(3):
+            factory.put_timeseries(_create_timeseries(channels), channels=channels)
+        # one socket is used for all channels and calls
+        wait_for(lambda: len(b"".join(server.received)) >= 40 + 3 * 4 * 120)
+        assert_equal(factory.write_pool.connects, 1)
+        assert_equal(len(server.connections), 1)
+        # tag packet, then a data and forceout packet per channel per call
+        received = b"".join(server.received)
+        assert_equal(received[4:8], b"test")
+        assert_equal(len(received), 40 + 3 * 4 * (80 + 40))
+        # reconnects after server closes socket
+        server.close_connections()
+        time.sleep(0.05)
+        factory.put_timeseries(_create_timeseries(channels), channels=channels)
+        assert_equal(factory.write_pool.connects, 2)
+        wait_for(lambda: len(server.connections) == 2)
+        assert_equal(len(server.connections), 2)
+        factory.write_pool.close()
+
+
+def test_acquire_backoff():
+    """edge_test.RawInputConnectionPool_test.test_acquire_backoff()"""
+    # find a port with no server
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    pool = RawInputConnectionPool(retries=3, backoff=0.05)
+    start = time.monotonic()
+    with pytest.raises(TimeseriesFactoryException):
+        pool.acquire("127.0.0.1", port, b"tag")
+    # waits 0.05 then 0.1 seconds between attempts
+    assert time.monotonic() - start >= 0.15
+    assert_equal(pool.connects, 0)
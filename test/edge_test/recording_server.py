@@ -0,0 +1,56 @@
+import socket
+import socketserver
+import threading
+import time
+
+
+class RecordingServer(socketserver.ThreadingTCPServer):
+    """Server on localhost that records connections and bytes received.
+
+    Use as a context manager to serve in a background thread.
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), RecordingHandler)
+        self.port = self.server_address[1]
+        self.connections = []
+        self.received = []
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
+
+    def close_connections(self):
+        """Close open connections, to simulate a server disconnect."""
+        for connection in self.connections:
+            connection.shutdown(socket.SHUT_RDWR)
+            connection.close()
+
+
+class RecordingHandler(socketserver.BaseRequestHandler):
+    """Record each connection and the bytes it receives until closed."""
+
+    def handle(self):
+        self.server.connections.append(self.request)
+        while True:
+            try:
+                data = self.request.recv(65536)
+            except OSError:
+                return
+            if not data:
+                return
+            self.server.received.append(data)
+
+
+def wait_for(condition, timeout=1):
+    """Wait until condition() is true, or timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
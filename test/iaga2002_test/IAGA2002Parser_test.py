@@ -1,6 +1,8 @@
 """Tests for the IAGA2002 Parser class."""
 
+import numpy
 from numpy.testing import assert_equal
+import pytest
 from geomagio.iaga2002 import IAGA2002Parser
 
 
@@ -110,3 +112,45 @@ def test_parse_decbas():
     parser = IAGA2002Parser()
     parser.parse(IAGA2002_EXAMPLE)
     assert_equal(parser.metadata["declination_base"], 5527)
+
+
+def test_parse_data_block():
+    """iaga2002_test.IAGA2002Parser_test.test_parse_data_block()
+
+    Call the parse method with fixed width data lines,
+    and with a data line that is not fixed width.
+    Verify both produce the same times and values.
+    """
+    parser = IAGA2002Parser()
+    parser.parse(IAGA2002_EXAMPLE)
+    assert_equal(parser.times.dtype, numpy.dtype("datetime64[ms]"))
+    assert_equal(parser.times[1], numpy.datetime64("2013-09-01T00:01:00.000"))
+    assert_equal(parser.data["D"][2], -29.14)
+    # trailing whitespace on one line, parsed line by line
+    lines = IAGA2002_EXAMPLE.splitlines()
+    lines[-1] = lines[-1] + " "
+    line_parser = IAGA2002Parser()
+    line_parser.parse("\n".join(lines))
+    assert_equal(line_parser.times, parser.times)
+    for channel in ("H", "D", "Z", "F"):
+        assert_equal(line_parser.data[channel], parser.data[channel])
+    # missing values
+    lines = IAGA2002_EXAMPLE.splitlines()
+    lines[-1] = lines[-1][:61] + " 88888.00"
+    missing_parser = IAGA2002Parser()
+    missing_parser.parse("\n".join(lines))
+    assert_equal(numpy.isnan(missing_parser.data["F"][-1]), True)
+
+
+def test_parse_data_block_invalid_time():
+    """iaga2002_test.IAGA2002Parser_test.test_parse_data_block_invalid_time()
+
+    Call the parse method with fixed width data lines with invalid times.
+    Verify times are rejected, instead of shifted into the next day or hour.
+    """
+    for time in ["25:61:00.000", "25:00:00.000", "00:61:00.000", "00:00:60.000"]:
+        lines = IAGA2002_EXAMPLE.splitlines()
+        lines[-1] = lines[-1][:11] + time + lines[-1][23:]
+        parser = IAGA2002Parser()
+        with pytest.raises(ValueError):
+            parser.parse("\n".join(lines))
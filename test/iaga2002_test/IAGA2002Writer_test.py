@@ -0,0 +1,96 @@
+"""Tests for the IAGA2002 Writer class."""
+
+from os import linesep
+
+import numpy
+from numpy.testing import assert_equal
+from obspy.core import Stream, Trace, UTCDateTime
+
+from geomagio import ChannelConverter
+from geomagio.iaga2002 import IAGA2002Writer
+
+
+def _create_stream(starttime, delta, values):
+    stream = Stream()
+    for channel, data in values.items():
+        stream += Trace(
+            numpy.array(data, dtype=numpy.float64),
+            {
+                "channel": channel,
+                "delta": delta,
+                "network": "NT",
+                "starttime": starttime,
+                "station": "BOU",
+            },
+        )
+    return stream
+
+
+def test_format_data():
+    """iaga2002_test.IAGA2002Writer_test.test_format_data()
+
+    Call the _format_data method with a stream that has missing values,
+    and verify lines are formatted and D is not modified.
+    """
+    d_radians = ChannelConverter.get_radians_from_minutes(numpy.array([-29.03, 1]))
+    stream = _create_stream(
+        UTCDateTime("2013-12-31T23:59:59.5Z"),
+        0.5,
+        {
+            "H": [21516.28, numpy.nan],
+            "D": d_radians,
+            "Z": [47809.92, 1],
+            "F": [52533.39, 2],
+        },
+    )
+    data = IAGA2002Writer()._format_data(stream, ["H", "D", "Z", "F"])
+    assert_equal(
+        data,
+        "2013-12-31 23:59:59.500 365     21516.28    -29.03  47809.92  52533.39"
+        + linesep
+        + "2014-01-01 00:00:00.000 001     99999.00      1.00      1.00      2.00"
+        + linesep,
+    )
+    assert_equal(stream.select(channel="D")[0].data, d_radians)
+
+
+def test_format_data_chunks():
+    """iaga2002_test.IAGA2002Writer_test.test_format_data_chunks()
+
+    Verify chunks contain at most chunk_size lines,
+    and join to the same output as _format_data.
+    """
+    values = numpy.arange(10, dtype=numpy.float64)
+    stream = _create_stream(
+        UTCDateTime("2020-01-01T00:00:00Z"),
+        60,
+        {"H": values, "E": values, "Z": values, "F": values},
+    )
+    writer = IAGA2002Writer()
+    chunks = list(
+        writer._format_data_chunks(stream, ["H", "E", "Z", "F"], chunk_size=4)
+    )
+    assert_equal(len(chunks), 3)
+    assert_equal(chunks[-1].count(linesep.encode()), 2)
+    assert_equal(
+        b"".join(chunks).decode(),
+        writer._format_data(stream, ["H", "E", "Z", "F"]),
+    )
+
+
+def test_format_chunks():
+    """iaga2002_test.IAGA2002Writer_test.test_format_chunks()
+
+    Verify the first chunk contains headers,
+    and chunks join to the same output as format.
+    """
+    values = numpy.arange(10, dtype=numpy.float64)
+    stream = _create_stream(
+        UTCDateTime("2020-01-01T00:00:00Z"),
+        60,
+        {"H": values, "E": values, "Z": values, "F": values},
+    )
+    chunks = list(IAGA2002Writer.format_chunks(stream, ["H", "E", "Z", "F"]))
+    assert_equal(chunks[0].startswith(b" Format"), True)
+    assert_equal(chunks[0].endswith(b"|" + linesep.encode()), True)
+    assert_equal(b"".join(chunks), IAGA2002Writer.format(stream, ["H", "E", "Z", "F"]))
@@ -1,6 +1,9 @@
 """Tests for the IMFJSON Writer class."""
 
+import json
 from numpy.testing import assert_equal
+from obspy import Stream, Trace, UTCDateTime
+from geomagio import ChannelConverter
 from geomagio.iaga2002 import IAGA2002Factory
 from geomagio.imfjson import IMFJSONWriter
 import numpy as np
@@ -39,15 +42,19 @@ def test_metadata():
     assert_equal(imo["coordinates"], [254.764, 40.137, 1682])
 
 
+def _format_example():
+    """Format example data, and parse the json document."""
+    return json.loads(IMFJSONWriter.format(EXAMPLE_DATA.copy(), EXAMPLE_CHANNELS))
+
+
 def test_times():
     """imfjson.IMFJSONWriter_test.test_times()
 
-    Call the _format_times method with the test
+    Call the format method with the test
     data and channels.
     Verify, the times are the correct value and string format.
     """
-    writer = IMFJSONWriter()
-    times = writer._format_times(EXAMPLE_DATA, EXAMPLE_CHANNELS)
+    times = _format_example()["times"]
     # load times to test against
     test_day, test_time = np.genfromtxt(
         EXAMPLE_FILE, skip_header=25, usecols=(0, 1), unpack=True, dtype=str
@@ -61,13 +68,12 @@ def test_times():
 def test_values():
     """imfjson.IMFJSONWriter_test.test_values()
 
-    Call the _format_data method with the test
-    data, channels, and stats.
+    Call the format method with the test
+    data and channels.
     Verify, the values and associated metadata
     are the correct value and format.
     """
-    writer = IMFJSONWriter()
-    values = writer._format_data(EXAMPLE_DATA, EXAMPLE_CHANNELS, EXAMPLE_STATS)
+    values = _format_example()["values"]
     test_val_keys = ["id", "metadata", "values"]
     for val in values:
         for key, test in zip(val, test_val_keys):
@@ -97,3 +103,93 @@ def test_values():
     #  tolist required to prevent ValueError in comparison
     assert_equal(vals_H.tolist(), test_val_H.tolist())
     assert_equal(vals_D.tolist(), test_val_D.tolist())
+
+
+def test_format_chunks():
+    """imfjson.IMFJSONWriter_test.test_format_chunks()
+
+    Verify format, and chunks joined, are the expected json document.
+    """
+    timeseries = Stream()
+    for channel, data in [
+        ("H", [20000.5, np.nan, 20001.25]),
+        # D is output in minutes
+        ("D", ChannelConverter.get_radians_from_minutes(np.array([60.0, -30, 0]))),
+    ]:
+        timeseries += Trace(
+            np.array(data, dtype=np.float64),
+            {
+                "channel": channel,
+                "data_type": "variation",
+                "delta": 60,
+                "geodetic_latitude": 40.137,
+                "geodetic_longitude": 254.764,
+                "elevation": 1682,
+                "network": "NT",
+                "starttime": UTCDateTime("2020-01-01T00:00:00Z"),
+                "station": "BOU",
+                "station_name": "Boulder",
+            },
+        )
+    expected = b"""{
+        "type": "Timeseries",
+        "metadata": {
+            "intermagnet": {
+                "imo": {
+                    "iaga_code": "BOU",
+                    "name": "Boulder",
+                    "coordinates": [254.764, 40.137, 1682.0]
+                },
+                "reported_orientation": "HD",
+                "data_type": "variation",
+                "sampling_period": 60
+            },
+            "status": 200,
+            "url": "url"
+        },
+        "times": [
+            "2020-01-01T00:00:00.000Z",
+            "2020-01-01T00:01:00.000Z",
+            "2020-01-01T00:02:00.000Z"
+        ],
+        "values": [
+            {
+                "id": "H",
+                "metadata": {
+                    "element": "H",
+                    "network": "NT",
+                    "station": "BOU",
+                    "channel": "H",
+                    "location": "R0"
+                },
+                "values": [20000.5, null, 20001.25]
+            },
+            {
+                "id": "D",
+                "metadata": {
+                    "element": "D",
+                    "network": "NT",
+                    "station": "BOU",
+                    "channel": "D",
+                    "location": "R0"
+                },
+                "values": [60.0, -30.0, 0.0]
+            }
+        ]
+    }"""
+    # compact, in key order
+    expected = json.dumps(json.loads(expected), separators=(",", ":"))
+    for output in [
+        IMFJSONWriter.format(timeseries.copy(), ["H", "D"], url="url"),
+        b"".join(IMFJSONWriter.format_chunks(timeseries.copy(), ["H", "D"], url="url")),
+        # chunk boundaries within times and values
+        b"".join(
+            IMFJSONWriter()._format_chunks(
+                timeseries.copy(), ["H", "D"], url="url", chunk_size=2
+            )
+        ),
+    ]:
+        # generated time differs
+        formatted = json.loads(output)
+        assert formatted["metadata"].pop("generated")
+        assert_equal(json.dumps(formatted, separators=(",", ":")), expected)
@@ -0,0 +1,114 @@
+import numpy
+from numpy.testing import assert_equal
+from obspy import Stream, Trace, UTCDateTime
+import pytest
+
+from geomagio.algorithm import Algorithm, FilterAlgorithm
+from geomagio.processing.pipeline import Pipeline, PipelineDataset
+from geomagio.TimeseriesFactory import TimeseriesFactory
+from geomagio.TimeseriesUtility import get_delta_from_interval
+
+
+class CountingFactory(TimeseriesFactory):
+    """Factory with constant data in a time range, that counts reads."""
+
+    def __init__(self, interval, starttime=None, endtime=None):
+        super().__init__(interval=interval)
+        self.starttime = starttime
+        self.endtime = endtime
+        self.reads = []
+        self.written = Stream()
+
+    def get_timeseries(self, starttime, endtime, observatory, channels, **kwargs):
+        self.reads.append((tuple(channels), starttime, endtime))
+        delta = get_delta_from_interval(self.interval)
+        timeseries = Stream()
+        for channel in channels:
+            data = numpy.full(int((endtime - starttime) / delta) + 1, numpy.nan)
+            if self.starttime is not None:
+                first = max(0, int((self.starttime - starttime) / delta))
+                last = int((self.endtime - starttime) / delta)
+                data[first : last + 1] = 1.0
+            timeseries += Trace(
+                data,
+                {
+                    "station": observatory,
+                    "channel": channel,
+                    "delta": delta,
+                    "starttime": starttime,
+                },
+            )
+        return timeseries
+
+    def put_timeseries(self, timeseries, starttime=None, endtime=None, **kwargs):
+        self.written += timeseries
+
+
+def test_pipeline_run():
+    """pipeline_test.test_pipeline_run()
+
+    Data written by one stage is read from memory by the next.
+    """
+    endtime = UTCDateTime("2020-01-01T00:09:00Z")
+    starttime = endtime - 540
+    second = CountingFactory("second", starttime - 3600, endtime + 59)
+    minute = CountingFactory("minute")
+    copy = CountingFactory("minute")
+    second_dataset = PipelineDataset(second, interval="second")
+    minute_dataset = PipelineDataset(minute, interval="minute", sink=True)
+    copy_dataset = PipelineDataset(copy, interval="minute", sink=True)
+    pipeline = Pipeline()
+    # stages run in dependency order, not the order added
+    pipeline.add_stage(
+        algorithm=Algorithm(inchannels=("U",), outchannels=("H",)),
+        input=minute_dataset,
+        output=copy_dataset,
+        input_channels=("U",),
+        output_channels=("H",),
+        rename_output_channel=(("U", "H"),),
+    )
+    pipeline.add_stage(
+        algorithm=FilterAlgorithm(
+            input_sample_period=1,
+            output_sample_period=60,
+            inchannels=("U",),
+            outchannels=("U",),
+        ),
+        input=second_dataset,
+        output=minute_dataset,
+        input_channels=("U",),
+        output_channels=("U",),
+    )
+    pipeline.run(
+        observatory="BOU",
+        starttime=starttime,
+        endtime=endtime,
+        realtime=600,
+        update_limit=2,
+    )
+    # each dataset is read once
+    assert_equal([len(factory.reads) for factory in (second, minute, copy)], [1, 1, 1])
+    # minute read covers range needed by copy stage
+    assert_equal(minute.reads[0], (("U",), starttime - 540, endtime))
+    assert_equal(len(minute.written), 1)
+    assert_equal(minute.written[0].stats.npts, 19)
+    assert_equal(copy.written[0].stats.channel, "H")
+    assert_equal(copy.written[0].data, minute.written[0].data)
+    assert_equal(second_dataset.reads + minute_dataset.reads, 2)
+
+
+def test_pipeline_cycle():
+    """pipeline_test.test_pipeline_cycle()"""
+    first = PipelineDataset(interval="minute")
+    second = PipelineDataset(interval="minute")
+    pipeline = Pipeline()
+    for input, output in ((first, second), (second, first)):
+        pipeline.add_stage(
+            algorithm=Algorithm(),
+            input=input,
+            output=output,
+            input_channels=("H",),
+            output_channels=("H",),
+        )
+    with pytest.raises(ValueError):
+        pipeline.get_ordered_stages()